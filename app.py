@@ -9,6 +9,7 @@ from utils.supabase_client import (
     get_supabase_client,
     upload_file_to_storage
 )
+from utils.file_handler import validate_file, get_upload_mime_type
 from database import (
     init_database,
     insert_temple,
@@ -90,19 +91,29 @@ def main():
                 image_url = None
                 audio_url = None
 
-                if image_file:
+                # Sniff both files before any bytes go to storage
+                image_format = validate_file(image_file, "Photo/Image") if image_file else None
+                audio_format = validate_file(audio_file, "Audio Recording") if audio_file else None
+                files_valid = (
+                    (not image_file or image_format is not None) and
+                    (not audio_file or audio_format is not None)
+                )
+
+                if files_valid and image_file:
                     file_path = f"images/{image_file.name}"
                     image_url = upload_file_to_storage(
-                        image_file.read(), file_path, image_file.type
+                        image_file, file_path, get_upload_mime_type(image_file, image_format)
                     )
 
-                if audio_file:
+                if files_valid and audio_file:
                     audio_path = f"audio/{audio_file.name}"
                     audio_url = upload_file_to_storage(
-                        audio_file.read(), audio_path, audio_file.type
+                        audio_file, audio_path, get_upload_mime_type(audio_file, audio_format)
                     )
 
-                if insert_temple_data(name, description, location, image_url, audio_url):
+                if not files_valid:
+                    st.error("❌ Failed to upload temple.")
+                elif insert_temple_data(name, description, location, image_url, audio_url):
                     st.success("🎉 Temple uploaded successfully!")
                     st.balloons()
                 else:
@@ -114,7 +125,10 @@ def main():
     try:
         temples_df = get_all_temples()
         if not temples_df.empty:
-            for _, temple in temples_df.head(5).iterrows():
+            # Typed columns hold NA for missing values; turn them back into None for the checks below
+            recent = temples_df.head(5)
+            recent = recent.astype(object).where(recent.notna(), None)
+            for _, temple in recent.iterrows():
                 with st.expander(f"🛕 {temple['name']} - {temple.get('location', 'No location')}"):
                     if temple.get('description'):
                         st.write(temple['description'])
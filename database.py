@@ -1,10 +1,18 @@
 import pandas as pd
 from datetime import datetime
 import os
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine
 from utils.supabase_client import get_supabase_client
+from utils.geo_grid import GRID_ZOOMS, tile_bounds, tile_ranges
+from utils.frames import TABLE_SCHEMAS, frame_from_result
+from utils.query_cache import cached_query, invalidate_tables
+from utils.replicas import get_read_client, remember_write
+from utils.snapshots import get_snapshot
+from utils.statements import cached_statement, statement
 import uuid
 
+_INIT_DATABASE_SQL = statement("init_database", "SELECT 1 FROM temples LIMIT 1")
+
 def init_database():
     """Initialize the database connection"""
     try:
@@ -14,53 +22,79 @@ def init_database():
         
         # Test connection by querying existing tables
         with engine.connect() as conn:
-            conn.execute(text("SELECT 1 FROM temples LIMIT 1"))
+            conn.execute(_INIT_DATABASE_SQL)
         
         return True
     except Exception as e:
         print(f"Database initialization error: {e}")
         return False
 
-def get_temple_count():
-    """Get total number of temples"""
+# Tables with a row in table_counters (migrations/007_table_counters.sql)
+COUNTED_TABLES = ("temples", "content_contributions", "historical_events", "media_uploads")
+
+_APPROXIMATE_COUNT_SQL = statement("get_table_count_approximate", """
+    SELECT GREATEST(reltuples, 0)::bigint FROM pg_class
+    WHERE oid = to_regclass(:table_name)
+""")
+
+# COALESCE only evaluates the scan when the counter row is missing
+_TABLE_COUNT_SQL = {
+    table_name: statement("get_table_count", f"""
+        SELECT COALESCE(
+            (SELECT row_count FROM table_counters WHERE table_name = :table_name),
+            (SELECT COUNT(*) FROM {table_name})
+        )
+    """)
+    for table_name in COUNTED_TABLES
+}
+
+def get_table_count(table_name, approximate=False):
+    """
+    Get the row count of a table in constant time.
+    Exact counts come from the trigger-maintained table_counters row (falling back to
+    COUNT(*) if the table has no counter yet); approximate counts come from the
+    planner's pg_class.reltuples estimate, refreshed by autovacuum/ANALYZE.
+    """
+    if table_name not in COUNTED_TABLES:
+        raise ValueError(f"Unknown counted table: {table_name}")
     try:
-        engine = get_supabase_client()
+        engine = get_read_client()
         if not engine:
             return 0
         
+        query = _APPROXIMATE_COUNT_SQL if approximate else _TABLE_COUNT_SQL[table_name]
+        
         with engine.connect() as conn:
-            result = conn.execute(text("SELECT COUNT(*) FROM temples")).fetchone()
-            return result[0] if result else 0
-    except:
+            result = conn.execute(query, {"table_name": table_name}).fetchone()
+            return int(result[0]) if result and result[0] is not None else 0
+    except Exception as e:
+        print(f"Error counting {table_name}: {e}")
         return 0
 
-def get_contribution_count():
+def get_temple_count(approximate=False):
+    """Get total number of temples"""
+    return get_table_count("temples", approximate=approximate)
+
+def get_contribution_count(approximate=False):
     """Get total number of contributions"""
-    try:
-        engine = get_supabase_client()
-        if not engine:
-            return 0
-        
-        with engine.connect() as conn:
-            result = conn.execute(text("SELECT COUNT(*) FROM content_contributions")).fetchone()
-            return result[0] if result else 0
-    except:
-        return 0
+    return get_table_count("content_contributions", approximate=approximate)
+
+_RECENT_CONTRIBUTIONS_SQL = statement("get_recent_contributions", """
+SELECT title, content_type, description, location_address, 
+       contributor_name, created_at
+FROM content_contributions 
+ORDER BY created_at DESC 
+LIMIT :limit
+""")
 
 def get_recent_contributions(limit=5):
     """Get recent contributions"""
     try:
-        engine = get_supabase_client()
+        engine = get_read_client()
         if not engine:
             return pd.DataFrame()
         
-        query = text("""
-            SELECT title, content_type, description, location_address, 
-                   contributor_name, created_at
-            FROM content_contributions 
-            ORDER BY created_at DESC 
-            LIMIT :limit
-        """)
+        query = _RECENT_CONTRIBUTIONS_SQL
         
         with engine.connect() as conn:
             result = conn.execute(query, {"limit": limit})
@@ -69,19 +103,38 @@ def get_recent_contributions(limit=5):
         print(f"Error fetching recent contributions: {e}")
         return pd.DataFrame()
 
-def insert_temple(name, description=None, location=None, image_url=None, audio_url=None, contributor_name=None):
-    """Insert a new temple using the actual temples table schema"""
+# Insert statements shared with database_async; the sync inserts append RETURNING id
+INSERT_TEMPLE_SQL = """
+    INSERT INTO temples (id, name, description, location, image_url, audio_url,
+                         contributor_name, deity, architectural_style, built_year,
+                         history, latitude, longitude, created_at)
+    VALUES (:id, :name, :description, :location, :image_url, :audio_url,
+            :contributor_name, :deity, :architectural_style, :built_year,
+            :history, :latitude, :longitude, NOW())
+"""
+
+INSERT_CONTRIBUTION_SQL = """
+    INSERT INTO content_contributions (title, content_type, description,
+                                       file_url, latitude, longitude,
+                                       location_address, contributor_name, created_at)
+    VALUES (:title, :content_type, :description, :file_url,
+            :latitude, :longitude, :location_address, :contributor_name, NOW())
+"""
+
+_INSERT_TEMPLE_RETURNING_SQL = statement("insert_temple", INSERT_TEMPLE_SQL + "RETURNING id")
+_INSERT_CONTRIBUTION_RETURNING_SQL = statement("insert_content_contribution", INSERT_CONTRIBUTION_SQL + "RETURNING id")
+
+def insert_temple(name, description=None, location=None, image_url=None, audio_url=None, contributor_name=None,
+                  deity=None, architectural_style=None, built_year=None, history=None,
+                  latitude=None, longitude=None):
+    """Insert a new temple, filling the structured attribute columns"""
     try:
         engine = get_supabase_client()
         if not engine:
             return None
         
         with engine.connect() as conn:
-            query = text("""
-                INSERT INTO temples (id, name, description, location, image_url, audio_url, created_at)
-                VALUES (:id, :name, :description, :location, :image_url, :audio_url, NOW())
-                RETURNING id
-            """)
+            query = _INSERT_TEMPLE_RETURNING_SQL
             
             temple_id = str(uuid.uuid4())
             result = conn.execute(query, {
@@ -90,9 +143,18 @@ def insert_temple(name, description=None, location=None, image_url=None, audio_u
                 "description": description,
                 "location": location,
                 "image_url": image_url,
-                "audio_url": audio_url
+                "audio_url": audio_url,
+                "contributor_name": contributor_name,
+                "deity": deity or None,
+                "architectural_style": architectural_style,
+                "built_year": int(built_year) if built_year else None,
+                "history": history or None,
+                "latitude": latitude,
+                "longitude": longitude
             })
             conn.commit()
+            invalidate_tables("temples")
+            remember_write(conn, "temples")
             return temple_id
     except Exception as e:
         print(f"Error inserting temple: {e}")
@@ -107,14 +169,7 @@ def insert_content_contribution(title, content_type, description, file_url,
             return None
         
         with engine.connect() as conn:
-            query = text("""
-                INSERT INTO content_contributions (title, content_type, description, 
-                                                 file_url, latitude, longitude, 
-                                                 location_address, contributor_name, created_at)
-                VALUES (:title, :content_type, :description, :file_url,
-                        :latitude, :longitude, :location_address, :contributor_name, NOW())
-                RETURNING id
-            """)
+            query = _INSERT_CONTRIBUTION_RETURNING_SQL
             
             result = conn.execute(query, {
                 "title": title,
@@ -127,11 +182,22 @@ def insert_content_contribution(title, content_type, description, file_url,
                 "contributor_name": contributor_name
             })
             conn.commit()
+            invalidate_tables("content_contributions")
+            remember_write(conn, "content_contributions")
             return result.fetchone()[0]
     except Exception as e:
         print(f"Error inserting contribution: {e}")
         return None
 
+_INSERT_HISTORICAL_EVENT_SQL = statement("insert_historical_event", """
+INSERT INTO historical_events (temple_id, event_date, event_title, 
+                             event_description, latitude, longitude, 
+                             contributor_name, created_at)
+VALUES (:temple_id, :event_date, :event_title, :event_description,
+        :latitude, :longitude, :contributor_name, NOW())
+RETURNING id
+""")
+
 def insert_historical_event(temple_id, event_date, event_title, event_description,
                            latitude, longitude, contributor_name):
     """Insert a new historical event using the actual historical_events table schema"""
@@ -141,14 +207,7 @@ def insert_historical_event(temple_id, event_date, event_title, event_descriptio
             return None
         
         with engine.connect() as conn:
-            query = text("""
-                INSERT INTO historical_events (temple_id, event_date, event_title, 
-                                             event_description, latitude, longitude, 
-                                             contributor_name, created_at)
-                VALUES (:temple_id, :event_date, :event_title, :event_description,
-                        :latitude, :longitude, :contributor_name, NOW())
-                RETURNING id
-            """)
+            query = _INSERT_HISTORICAL_EVENT_SQL
             
             result = conn.execute(query, {
                 "temple_id": temple_id,
@@ -160,11 +219,19 @@ def insert_historical_event(temple_id, event_date, event_title, event_descriptio
                 "contributor_name": contributor_name
             })
             conn.commit()
+            invalidate_tables("historical_events")
+            remember_write(conn, "historical_events")
             return result.fetchone()[0]
     except Exception as e:
         print(f"Error inserting historical event: {e}")
         return None
 
+_INSERT_MEDIA_UPLOAD_SQL = statement("insert_media_upload", """
+    INSERT INTO media_uploads (id, temple_id, uploaded_by, file_type, file_url, uploaded_at)
+    VALUES (:id, :temple_id, :uploaded_by, :file_type, :file_url, NOW())
+    RETURNING id
+""")
+
 def insert_media_upload(temple_id, uploaded_by, file_type, file_url):
     """Insert a new media upload using the actual media_uploads table schema"""
     try:
@@ -173,11 +240,7 @@ def insert_media_upload(temple_id, uploaded_by, file_type, file_url):
             return None
         
         with engine.connect() as conn:
-            query = text("""
-                INSERT INTO media_uploads (id, temple_id, uploaded_by, file_type, file_url, uploaded_at)
-                VALUES (:id, :temple_id, :uploaded_by, :file_type, :file_url, NOW())
-                RETURNING id
-            """)
+            query = _INSERT_MEDIA_UPLOAD_SQL
             
             media_id = str(uuid.uuid4())
             result = conn.execute(query, {
@@ -188,90 +251,690 @@ def insert_media_upload(temple_id, uploaded_by, file_type, file_url):
                 "file_url": file_url
             })
             conn.commit()
+            invalidate_tables("media_uploads")
+            remember_write(conn, "media_uploads")
             return media_id
     except Exception as e:
         print(f"Error inserting media upload: {e}")
         return None
 
 def get_all_temples():
-    """Get all temples"""
+    """Get all temples (newest first) from the process-wide snapshot, synced incrementally"""
+    return get_snapshot("temples").frame()
+
+def get_all_contributions():
+    """Get all content contributions (newest first) from the process-wide snapshot, synced incrementally"""
+    return get_snapshot("content_contributions").frame()
+
+# Keyset sort specs: (column, value substituted for NULL) pairs ending in a unique column
+CONTRIBUTION_SORTS = {
+    "Newest First": {"keys": [("created_at", None), ("id", None)], "descending": True},
+    "Oldest First": {"keys": [("created_at", None), ("id", None)], "descending": False},
+    "Alphabetical": {"keys": [("title", None), ("id", None)], "descending": False}
+}
+
+def _sort_clauses(sort_spec, after, params):
+    """Build the ORDER BY clause and, for a keyset cursor, the row-comparison condition"""
+    direction = "DESC" if sort_spec["descending"] else "ASC"
+    expressions = [column if null_value is None else f"COALESCE({column}, {null_value})"
+                   for column, null_value in sort_spec["keys"]]
+    order_clause = ", ".join(f"{expression} {direction}" for expression in expressions)
+    
+    if after is None:
+        return order_clause, None
+    
+    placeholders = []
+    for i, value in enumerate(after):
+        params[f"after_{i}"] = value
+        placeholders.append(f":after_{i}")
+    comparison = "<" if sort_spec["descending"] else ">"
+    condition = f"({', '.join(expressions)}) {comparison} ({', '.join(placeholders)})"
+    return order_clause, condition
+
+def page_cursor(row, sort_spec):
+    """Keyset cursor for the row a page ended on, to pass back as `after`"""
+    cursor = []
+    for column, null_value in sort_spec["keys"]:
+        value = row[column]
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            value = null_value
+        elif isinstance(value, pd.Timestamp):
+            value = value.to_pydatetime()
+        elif hasattr(value, "item"):
+            value = value.item()
+        cursor.append(value)
+    return tuple(cursor)
+
+def _contribution_filters(content_type=None, contributor_name=None, anonymous=False, since=None):
+    conditions = []
+    params = {}
+    if content_type:
+        conditions.append("content_type = :content_type")
+        params["content_type"] = content_type
+    if anonymous:
+        conditions.append("contributor_name IS NULL")
+    elif contributor_name:
+        conditions.append("contributor_name = :contributor_name")
+        params["contributor_name"] = contributor_name
+    if since:
+        conditions.append("created_at >= :since")
+        params["since"] = since
+    return conditions, params
+
+def contribution_page_query(content_type=None, contributor_name=None, anonymous=False,
+                            since=None, sort_by="Newest First", limit=None, after=None):
+    """
+    SQL and parameters for one keyset page of contributions (shared with database_async)
+    Returns: (statement, params dict)
+    """
+    conditions, params = _contribution_filters(content_type, contributor_name, anonymous, since)
+    sort_spec = CONTRIBUTION_SORTS.get(sort_by, CONTRIBUTION_SORTS["Newest First"])
+    order_clause, keyset_condition = _sort_clauses(sort_spec, after, params)
+    if keyset_condition:
+        conditions.append(keyset_condition)
+    
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    limit_clause = "LIMIT :limit" if limit else ""
+    if limit:
+        params["limit"] = limit
+    
+    query = cached_statement("contribution_page_query", f"""
+        SELECT * FROM content_contributions
+        {where_clause}
+        ORDER BY {order_clause}
+        {limit_clause}
+    """)
+    return query, params
+
+def query_contributions(content_type=None, contributor_name=None, anonymous=False,
+                        since=None, sort_by="Newest First", limit=None, after=None):
+    """
+    Filter and sort content contributions in SQL.
+    Pass a page_cursor() from the previous page as `after` to fetch the next keyset page.
+    """
     try:
-        engine = get_supabase_client()
+        engine = get_read_client()
         if not engine:
             return pd.DataFrame()
         
-        query = text("SELECT * FROM temples ORDER BY created_at DESC")
+        query, params = contribution_page_query(content_type, contributor_name, anonymous,
+                                                since, sort_by, limit, after)
         
         with engine.connect() as conn:
-            result = conn.execute(query)
+            result = conn.execute(query, params)
             return pd.DataFrame(result.fetchall(), columns=result.keys())
     except Exception as e:
-        print(f"Error fetching temples: {e}")
+        print(f"Error querying contributions: {e}")
         return pd.DataFrame()
 
-def get_all_contributions():
-    """Get all content contributions"""
+def count_contributions(content_type=None, contributor_name=None, anonymous=False, since=None):
+    """Count contributions matching the filters"""
     try:
-        engine = get_supabase_client()
+        engine = get_read_client()
         if not engine:
-            return pd.DataFrame()
+            return 0
         
-        query = text("SELECT * FROM content_contributions ORDER BY created_at DESC")
+        conditions, params = _contribution_filters(content_type, contributor_name, anonymous, since)
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
         
         with engine.connect() as conn:
-            result = conn.execute(query)
-            return pd.DataFrame(result.fetchall(), columns=result.keys())
+            query = cached_statement("count_contributions", f"SELECT COUNT(*) FROM content_contributions {where_clause}")
+            return conn.execute(query, params).scalar() or 0
     except Exception as e:
-        print(f"Error fetching contributions: {e}")
-        return pd.DataFrame()
+        print(f"Error counting contributions: {e}")
+        return 0
+
+def _distinct_values(conn, column):
+    """
+    Distinct non-null values of an indexed content_contributions column.
+    The recursive CTE hops from one value to the next through the index
+    instead of scanning every row.
+    """
+    query = cached_statement("distinct_values", f"""
+        WITH RECURSIVE distinct_values AS (
+            (SELECT {column} AS value FROM content_contributions
+             WHERE {column} IS NOT NULL ORDER BY {column} LIMIT 1)
+            UNION ALL
+            SELECT (SELECT c.{column} FROM content_contributions c
+                    WHERE c.{column} > d.value ORDER BY c.{column} LIMIT 1)
+            FROM distinct_values d
+            WHERE d.value IS NOT NULL
+        )
+        SELECT value FROM distinct_values WHERE value IS NOT NULL
+    """)
+    return [row[0] for row in conn.execute(query)]
+
+_HAS_ANONYMOUS_SQL = statement(
+    "get_contribution_filter_options",
+    "SELECT EXISTS (SELECT 1 FROM content_contributions WHERE contributor_name IS NULL)"
+)
+
+@cached_query(tables=("content_contributions",),
+              fallback=lambda: {"content_types": [], "contributors": [], "has_anonymous": False})
+def get_contribution_filter_options():
+    """Get the content types and contributor names used by the contribution filters"""
+    engine = get_read_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    with engine.connect() as conn:
+        has_anonymous = conn.execute(_HAS_ANONYMOUS_SQL).scalar()
+        return {
+            "content_types": _distinct_values(conn, "content_type"),
+            "contributors": _distinct_values(conn, "contributor_name"),
+            "has_anonymous": bool(has_anonymous)
+        }
+
+_CONTRIBUTION_TOTALS_SQL = statement("get_contribution_summary", """
+    SELECT COUNT(*),
+           COUNT(DISTINCT contributor_name)
+               + CASE WHEN bool_or(contributor_name IS NULL) THEN 1 ELSE 0 END,
+           COUNT(*) FILTER (WHERE latitude IS NOT NULL AND longitude IS NOT NULL)
+    FROM content_contributions
+""")
+
+_CONTRIBUTION_TYPE_COUNTS_SQL = statement("get_contribution_summary_types", """
+    SELECT content_type, COUNT(*) AS count
+    FROM content_contributions
+    WHERE content_type IS NOT NULL
+    GROUP BY content_type
+    ORDER BY count DESC
+""")
+
+def _empty_contribution_summary():
+    return {
+        "total": 0,
+        "contributors": 0,
+        "with_location": 0,
+        "content_type_counts": pd.Series(dtype="int64")
+    }
+
+@cached_query(tables=("content_contributions",), fallback=_empty_contribution_summary)
+def get_contribution_summary():
+    """Get aggregate contribution statistics without fetching individual rows"""
+    engine = get_read_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    with engine.connect() as conn:
+        row = conn.execute(_CONTRIBUTION_TOTALS_SQL).fetchone()
+        type_rows = conn.execute(_CONTRIBUTION_TYPE_COUNTS_SQL).fetchall()
+
+    summary = _empty_contribution_summary()
+    summary["total"] = row[0]
+    summary["contributors"] = row[1]
+    summary["with_location"] = row[2]
+    summary["content_type_counts"] = pd.Series(
+        [r[1] for r in type_rows], index=[r[0] for r in type_rows], dtype="int64"
+    )
+    return summary
 
+# Days before the rollup watermark come from the materialized tables (utils/stats_rollup.py);
+# later days, or everything before the first refresh, are aggregated live
+_ROLLUP_WATERMARK = """
+    COALESCE((SELECT watermark FROM stats_rollup_state WHERE rollup = 'contribution_daily'),
+             '-infinity'::date)
+"""
+
+_DAILY_TOTALS_SQL = statement("get_daily_contribution_totals", f"""
+    WITH rolled AS (
+        SELECT day, contribution_count, running_total
+        FROM contribution_daily_totals
+        WHERE day < {_ROLLUP_WATERMARK}
+    ),
+    live AS (
+        SELECT created_at::date AS day, COUNT(*) AS contribution_count
+        FROM content_contributions
+        WHERE created_at >= {_ROLLUP_WATERMARK}
+        GROUP BY 1
+    )
+    SELECT day, contribution_count AS count, running_total FROM rolled
+    UNION ALL
+    SELECT day, contribution_count,
+           COALESCE((SELECT MAX(running_total) FROM rolled), 0)
+           + SUM(contribution_count) OVER (ORDER BY day)
+    FROM live
+    ORDER BY day
+""")
+
+@cached_query(tables=("content_contributions",))
+def get_daily_contribution_totals():
+    """Get per-day contribution counts with a running total, oldest day first"""
+    engine = get_read_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    with engine.connect() as conn:
+        result = conn.execute(_DAILY_TOTALS_SQL)
+        df = pd.DataFrame(result.fetchall(), columns=result.keys())
+    if not df.empty:
+        df['day'] = pd.to_datetime(df['day'])
+        df[['count', 'running_total']] = df[['count', 'running_total']].astype('int64')
+    return df
+
+_BREAKDOWN_SQL = statement("get_contribution_breakdown", f"""
+    SELECT NULLIF(content_type, '') AS content_type,
+           NULLIF(contributor_key, '') AS contributor_name,
+           SUM(contribution_count)::bigint AS count
+    FROM (
+        SELECT content_type, contributor_key, contribution_count
+        FROM contribution_daily_stats
+        WHERE day < {_ROLLUP_WATERMARK}
+        UNION ALL
+        SELECT COALESCE(content_type, ''), COALESCE(contributor_name, ''), COUNT(*)
+        FROM content_contributions
+        WHERE created_at >= {_ROLLUP_WATERMARK}
+        GROUP BY 1, 2
+    ) combined
+    GROUP BY 1, 2
+""")
+
+@cached_query(tables=("content_contributions",))
+def get_contribution_breakdown():
+    """Get contribution counts per (content_type, contributor_name) pair; missing values are None"""
+    engine = get_read_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    with engine.connect() as conn:
+        result = conn.execute(_BREAKDOWN_SQL)
+        return pd.DataFrame(result.fetchall(), columns=result.keys())
+
+_ALL_HISTORICAL_EVENTS_SQL = statement("get_all_historical_events",
+                                       "SELECT * FROM historical_events ORDER BY created_at DESC")
+
+@cached_query(tables=("historical_events",))
 def get_all_historical_events():
     """Get all historical events"""
+    engine = get_read_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    with engine.connect() as conn:
+        result = conn.execute(_ALL_HISTORICAL_EVENTS_SQL)
+        return frame_from_result(result, TABLE_SCHEMAS["historical_events"])
+
+TEMPLE_SORTS = {
+    "Most Recent": {"keys": [("created_at", None), ("id", None)], "descending": True},
+    "Alphabetical": {"keys": [("name", None), ("id", None)], "descending": False},
+    "Built Year": {"keys": [("built_year", 2147483647), ("id", None)], "descending": False}
+}
+
+def _temple_filters(search_term=None, architectural_style=None):
+    conditions = []
+    params = {}
+    if search_term:
+        conditions.append("(name ILIKE :search_term OR deity ILIKE :search_term "
+                          "OR location ILIKE :search_term OR description ILIKE :search_term)")
+        params["search_term"] = f"%{search_term}%"
+    if architectural_style:
+        conditions.append("architectural_style = :architectural_style")
+        params["architectural_style"] = architectural_style
+    return conditions, params
+
+def temple_page_query(search_term=None, architectural_style=None, sort_by="Most Recent", limit=None, after=None):
+    """
+    SQL and parameters for one keyset page of temples (shared with database_async)
+    Returns: (statement, params dict)
+    """
+    conditions, params = _temple_filters(search_term, architectural_style)
+    sort_spec = TEMPLE_SORTS.get(sort_by, TEMPLE_SORTS["Most Recent"])
+    order_clause, keyset_condition = _sort_clauses(sort_spec, after, params)
+    if keyset_condition:
+        conditions.append(keyset_condition)
+    
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    limit_clause = "LIMIT :limit" if limit else ""
+    if limit:
+        params["limit"] = limit
+    
+    query = cached_statement("temple_page_query", f"""
+        SELECT *, location AS location_address FROM temples 
+        {where_clause}
+        ORDER BY {order_clause}
+        {limit_clause}
+    """)
+    return query, params
+
+def search_temples(search_term=None, architectural_style=None, sort_by="Most Recent", limit=None, after=None):
+    """
+    Search, filter and sort temples in SQL using the structured temple columns.
+    Pass a page_cursor() from the previous page as `after` to fetch the next keyset page.
+    """
     try:
-        engine = get_supabase_client()
+        engine = get_read_client()
         if not engine:
             return pd.DataFrame()
         
-        query = text("SELECT * FROM historical_events ORDER BY created_at DESC")
+        query, params = temple_page_query(search_term, architectural_style, sort_by, limit, after)
         
         with engine.connect() as conn:
-            result = conn.execute(query)
-            return pd.DataFrame(result.fetchall(), columns=result.keys())
+            result = conn.execute(query, params)
+            return frame_from_result(result, TABLE_SCHEMAS["temples"])
+    except Exception as e:
+        print(f"Error searching temples: {e}")
+        return pd.DataFrame()
+
+@cached_query(tables=("temples",),
+              fallback=lambda: {"total": 0, "with_coordinates": 0, "avg_built_year": None, "most_common_style": None})
+def get_temple_summary(search_term=None, architectural_style=None):
+    """Get aggregate statistics for temples matching the filters"""
+    engine = get_read_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    conditions, params = _temple_filters(search_term, architectural_style)
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    with engine.connect() as conn:
+        row = conn.execute(cached_statement("get_temple_summary", f"""
+            SELECT COUNT(*),
+                   COUNT(*) FILTER (WHERE latitude IS NOT NULL AND longitude IS NOT NULL),
+                   AVG(built_year),
+                   MODE() WITHIN GROUP (ORDER BY architectural_style)
+            FROM temples
+            {where_clause}
+        """), params).fetchone()
+
+    return {
+        "total": row[0],
+        "with_coordinates": row[1],
+        "avg_built_year": int(row[2]) if row[2] is not None else None,
+        "most_common_style": row[3]
+    }
+
+def _bbox_condition(south, west, north, east, params):
+    """Bounding-box condition on latitude/longitude, handling boxes that cross the antimeridian"""
+    params.update({"south": max(south, -90.0), "north": min(north, 90.0)})
+    if east - west >= 360:
+        return "latitude BETWEEN :south AND :north AND longitude IS NOT NULL"
+    
+    west = (west + 180) % 360 - 180
+    east = (east + 180) % 360 - 180
+    params.update({"west": west, "east": east})
+    if west <= east:
+        return "latitude BETWEEN :south AND :north AND longitude BETWEEN :west AND :east"
+    return "latitude BETWEEN :south AND :north AND (longitude >= :west OR longitude <= :east)"
+
+def get_temple_extent(search_term=None, architectural_style=None):
+    """Get (south, west, north, east) bounds of temples with coordinates, or None"""
+    try:
+        engine = get_read_client()
+        if not engine:
+            return None
+        
+        conditions, params = _temple_filters(search_term, architectural_style)
+        conditions.append("latitude IS NOT NULL AND longitude IS NOT NULL")
+        
+        with engine.connect() as conn:
+            row = conn.execute(cached_statement("get_temple_extent", f"""
+                SELECT MIN(latitude), MIN(longitude), MAX(latitude), MAX(longitude)
+                FROM temples
+                WHERE {' AND '.join(conditions)}
+            """), params).fetchone()
+        
+        if row is None or row[0] is None:
+            return None
+        return tuple(float(value) for value in row)
+    except Exception as e:
+        print(f"Error fetching temple extent: {e}")
+        return None
+
+def get_temples_in_bbox(south, west, north, east, search_term=None, architectural_style=None, limit=5000):
+    """Get map fields for temples inside a bounding box, using the coordinates index"""
+    try:
+        engine = get_read_client()
+        if not engine:
+            return pd.DataFrame()
+        
+        conditions, params = _temple_filters(search_term, architectural_style)
+        conditions.append(_bbox_condition(south, west, north, east, params))
+        params["limit"] = limit
+        
+        query = cached_statement("get_temples_in_bbox", f"""
+            SELECT id, name, deity, architectural_style, built_year, contributor_name,
+                   latitude, longitude
+            FROM temples
+            WHERE {' AND '.join(conditions)}
+            LIMIT :limit
+        """)
+        
+        with engine.connect() as conn:
+            result = conn.execute(query, params)
+            return frame_from_result(result, TABLE_SCHEMAS["temples"])
     except Exception as e:
-        print(f"Error fetching historical events: {e}")
+        print(f"Error fetching temples in bounding box: {e}")
         return pd.DataFrame()
 
-def search_temples(search_term, architectural_style=None):
-    """Search temples by name or other criteria"""
+def get_temple_clusters_in_bbox(south, west, north, east, cell_size, search_term=None, architectural_style=None):
+    """Aggregate temples inside a bounding box into grid cells of `cell_size` degrees"""
     try:
-        engine = get_supabase_client()
+        engine = get_read_client()
         if not engine:
             return pd.DataFrame()
         
-        where_clause = "WHERE name ILIKE :search_term OR description ILIKE :search_term OR location ILIKE :search_term"
-        params = {"search_term": f"%{search_term}%"}
+        conditions, params = _temple_filters(search_term, architectural_style)
+        conditions.append(_bbox_condition(south, west, north, east, params))
+        params["cell_size"] = cell_size
         
-        query = text(f"""
-            SELECT * FROM temples 
-            {where_clause}
-            ORDER BY created_at DESC
+        query = cached_statement("get_temple_clusters_in_bbox", f"""
+            SELECT COUNT(*) AS count,
+                   AVG(latitude)::float AS latitude,
+                   AVG(longitude)::float AS longitude
+            FROM temples
+            WHERE {' AND '.join(conditions)}
+            GROUP BY FLOOR(latitude / :cell_size), FLOOR(longitude / :cell_size)
         """)
         
         with engine.connect() as conn:
             result = conn.execute(query, params)
             return pd.DataFrame(result.fetchall(), columns=result.keys())
     except Exception as e:
-        print(f"Error searching temples: {e}")
+        print(f"Error fetching temple clusters: {e}")
         return pd.DataFrame()
 
+DENSITY_LAYERS = ("temples", "content_contributions")
+
+@cached_query(tables=("temples", "content_contributions"))
+def get_density_cells(zoom, layer="temples", bounds=None):
+    """
+    Get precomputed density grid cells at one grid level (see utils/geo_grid.py).
+    `bounds` is an optional (south, west, north, east) box; cells come back with
+    their point count and the mean position of the points inside them.
+    """
+    engine = get_read_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    conditions = ["layer = :layer", "zoom = :zoom"]
+    params = {"layer": layer, "zoom": zoom}
+    if bounds is not None:
+        min_x, max_x, min_y, max_y = tile_ranges(bounds, zoom)
+        params.update({"min_x": min_x, "max_x": max_x, "min_y": min_y, "max_y": max_y})
+        conditions.append("y BETWEEN :min_y AND :max_y")
+        if min_x <= max_x:
+            conditions.append("x BETWEEN :min_x AND :max_x")
+        else:
+            conditions.append("(x >= :min_x OR x <= :max_x)")
+
+    query = cached_statement("get_density_cells", f"""
+        SELECT x, y, point_count AS count,
+               lat_sum / point_count AS latitude,
+               lon_sum / point_count AS longitude
+        FROM geo_density_cells
+        WHERE {' AND '.join(conditions)} AND point_count > 0
+    """)
+
+    with engine.connect() as conn:
+        result = conn.execute(query, params)
+        return pd.DataFrame(result.fetchall(), columns=result.keys())
+
+_GEO_DISTRIBUTION_SUMMARY_SQL = statement("get_geo_distribution_summary", """
+SELECT layer,
+       SUM(point_count) AS count,
+       SUM(lat_sum) / SUM(point_count) AS center_latitude,
+       SUM(lon_sum) / SUM(point_count) AS center_longitude,
+       MIN(lat_sum / point_count) AS min_latitude,
+       MAX(lat_sum / point_count) AS max_latitude,
+       MIN(lon_sum / point_count) AS min_longitude,
+       MAX(lon_sum / point_count) AS max_longitude
+FROM geo_density_cells
+WHERE zoom = :zoom AND point_count > 0
+GROUP BY layer
+""")
+
+@cached_query(tables=("temples", "content_contributions"))
+def get_geo_distribution_summary():
+    """
+    Per-layer geographic overview from the density grid: located item count,
+    centre, and the extent of the finest-level cell centroids
+    """
+    engine = get_read_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    with engine.connect() as conn:
+        result = conn.execute(_GEO_DISTRIBUTION_SUMMARY_SQL, {"zoom": GRID_ZOOMS[-1]})
+        return pd.DataFrame(result.fetchall(), columns=result.keys())
+
+_REBUILD_DENSITY_GRID_SQL = statement("rebuild_density_grid", "SELECT heritage_rebuild_density_grid()")
+
+def rebuild_density_grid():
+    """Recompute geo_density_cells from the point tables (after bulk edits or deletes)"""
+    engine = get_supabase_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    with engine.begin() as conn:
+        conn.execute(_REBUILD_DENSITY_GRID_SQL)
+
+# Columns shipped with each point in a map tile
+TILE_POINT_COLUMNS = {
+    "temples": ["id", "name", "deity", "architectural_style", "built_year", "contributor_name"],
+    "content_contributions": ["id", "title", "content_type", "contributor_name"]
+}
+
+_CLAIM_DIRTY_TILES_SQL = statement("claim_dirty_tiles", """
+DELETE FROM geo_tile_dirty
+WHERE (layer, zoom, x, y) IN (
+    SELECT layer, zoom, x, y FROM geo_tile_dirty
+    ORDER BY marked_at
+    LIMIT :limit
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING layer, zoom, x, y
+""")
+
+def claim_dirty_tiles(limit=500):
+    """
+    Remove up to `limit` tiles from geo_tile_dirty and return them as (layer, zoom, x, y).
+    Like the other tile-builder helpers this raises on failure. A point committed after
+    the claim marks its tile again, so it is picked up by the next run.
+    """
+    engine = get_supabase_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    query = _CLAIM_DIRTY_TILES_SQL
+
+    with engine.begin() as conn:
+        return [tuple(row) for row in conn.execute(query, {"limit": limit})]
+
+_MARK_TILES_DIRTY_SQL = statement("mark_tiles_dirty", """
+    INSERT INTO geo_tile_dirty (layer, zoom, x, y)
+    VALUES (:layer, :zoom, :x, :y)
+    ON CONFLICT (layer, zoom, x, y) DO NOTHING
+""")
+
+def mark_tiles_dirty(tiles):
+    """Queue (layer, zoom, x, y) tiles for rebuilding, e.g. after a failed build"""
+    if not tiles:
+        return
+    engine = get_supabase_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    query = _MARK_TILES_DIRTY_SQL
+
+    with engine.begin() as conn:
+        conn.execute(query, [{"layer": layer, "zoom": zoom, "x": x, "y": y} for layer, zoom, x, y in tiles])
+
+_MARK_ALL_TILES_DIRTY_SQL = statement("mark_all_tiles_dirty", """
+    INSERT INTO geo_tile_dirty (layer, zoom, x, y)
+    SELECT layer, zoom, x, y FROM geo_density_cells WHERE point_count > 0
+    ON CONFLICT (layer, zoom, x, y) DO NOTHING
+""")
+
+def mark_all_tiles_dirty():
+    """Queue every non-empty tile for rebuilding"""
+    engine = get_supabase_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    with engine.begin() as conn:
+        result = conn.execute(_MARK_ALL_TILES_DIRTY_SQL)
+        return result.rowcount
+
+_TILE_CELLS_SQL = statement("get_tile_cells", """
+SELECT point_count AS count,
+       lat_sum / point_count AS latitude,
+       lon_sum / point_count AS longitude
+FROM geo_density_cells
+WHERE layer = :layer AND zoom = :cell_zoom
+  AND x BETWEEN :min_x AND :max_x AND y BETWEEN :min_y AND :max_y
+  AND point_count > 0
+""")
+
+def get_tile_cells(layer, zoom, x, y, cell_zoom):
+    """Density cells at `cell_zoom` that fall inside tile (zoom, x, y); raises on failure"""
+    engine = get_supabase_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    scale = 1 << (cell_zoom - zoom)
+    query = _TILE_CELLS_SQL
+
+    with engine.connect() as conn:
+        result = conn.execute(query, {
+            "layer": layer, "cell_zoom": cell_zoom,
+            "min_x": x * scale, "max_x": (x + 1) * scale - 1,
+            "min_y": y * scale, "max_y": (y + 1) * scale - 1
+        })
+        return pd.DataFrame(result.fetchall(), columns=result.keys())
+
+def get_tile_points(layer, zoom, x, y):
+    """Points of a layer inside tile (zoom, x, y) with their TILE_POINT_COLUMNS; raises on failure"""
+    engine = get_supabase_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    params = {"zoom": zoom, "x": x, "y": y}
+    # The bounding box uses the coordinates index; the tile functions drop points on a
+    # shared edge so every point lands in exactly one tile
+    bbox = _bbox_condition(*tile_bounds(x, y, zoom), params)
+    columns = ", ".join(TILE_POINT_COLUMNS[layer])
+    query = cached_statement("get_tile_points", f"""
+        SELECT {columns}, latitude, longitude
+        FROM {layer}
+        WHERE {bbox}
+          AND heritage_tile_x(longitude, :zoom) = :x
+          AND heritage_tile_y(latitude, :zoom) = :y
+    """)
+
+    with engine.connect() as conn:
+        result = conn.execute(query, params)
+        return frame_from_result(result, TABLE_SCHEMAS.get(layer))
+
+_TEMPLE_BY_ID_SQL = statement("get_temple_by_id", "SELECT * FROM temples WHERE id = :temple_id")
+
 def get_temple_by_id(temple_id):
     """Get a specific temple by ID"""
     try:
-        engine = get_supabase_client()
+        engine = get_read_client()
         if not engine:
             return None
         
-        query = text("SELECT * FROM temples WHERE id = :temple_id")
+        query = _TEMPLE_BY_ID_SQL
         
         with engine.connect() as conn:
             result = conn.execute(query, {"temple_id": temple_id})
@@ -280,14 +943,17 @@ def get_temple_by_id(temple_id):
         print(f"Error fetching temple: {e}")
         return None
 
+_MEDIA_BY_TEMPLE_ID_SQL = statement("get_media_by_temple_id",
+                                    "SELECT * FROM media_uploads WHERE temple_id = :temple_id ORDER BY uploaded_at DESC")
+
 def get_media_by_temple_id(temple_id):
     """Get all media for a specific temple"""
     try:
-        engine = get_supabase_client()
+        engine = get_read_client()
         if not engine:
             return pd.DataFrame()
         
-        query = text("SELECT * FROM media_uploads WHERE temple_id = :temple_id ORDER BY uploaded_at DESC")
+        query = _MEDIA_BY_TEMPLE_ID_SQL
         
         with engine.connect() as conn:
             result = conn.execute(query, {"temple_id": temple_id})
@@ -295,3 +961,31 @@ def get_media_by_temple_id(temple_id):
     except Exception as e:
         print(f"Error fetching media: {e}")
         return pd.DataFrame()
+
+_ITER_REFERENCED_FILE_URLS_SQL = statement("iter_referenced_file_urls", """
+    SELECT file_url AS url FROM content_contributions WHERE file_url IS NOT NULL
+    UNION ALL
+    SELECT image_url FROM temples WHERE image_url IS NOT NULL
+    UNION ALL
+    SELECT audio_url FROM temples WHERE audio_url IS NOT NULL
+    UNION ALL
+    SELECT file_url FROM media_uploads WHERE file_url IS NOT NULL
+""")
+
+def iter_referenced_file_urls(batch_size=5000):
+    """
+    Stream every storage URL referenced by temples, content_contributions and media_uploads.
+    Unlike the other helpers this raises on failure, so a partial scan is never
+    mistaken for a complete one by the storage garbage collector.
+    """
+    engine = get_supabase_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    query = _ITER_REFERENCED_FILE_URLS_SQL
+
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+        for partition in result.partitions():
+            for row in partition:
+                yield row[0]
@@ -0,0 +1,215 @@
+import asyncio
+import os
+import uuid
+import weakref
+
+import pandas as pd
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database import (
+    INSERT_CONTRIBUTION_SQL,
+    INSERT_TEMPLE_SQL,
+    CONTRIBUTION_SORTS,
+    TEMPLE_SORTS,
+    contribution_page_query,
+    page_cursor,
+    temple_page_query
+)
+from utils.frames import TABLE_SCHEMAS, frame_from_result
+from utils.query_cache import invalidate_tables
+from utils.statements import cached_statement, instrument_engine, statement
+
+# Async counterpart of database.py for maintenance jobs: the same SQL, run on
+# SQLAlchemy's asyncio engine over asyncpg so one event loop can keep many queries
+# in flight. Unlike the page-facing functions in database.py, these raise on failure.
+
+ASYNC_POOL_SIZE = int(os.getenv("ASYNC_POOL_SIZE", "10"))
+# Statements asyncpg and SQLAlchemy keep prepared per connection. A transaction-mode
+# pooler (PgBouncer, or Supabase's pooler on port 6543) runs each transaction on any
+# server connection, where those statements may not exist, so caching must be off.
+# Unset: off for such URLs (port 6543 or ?pgbouncer=true), the drivers' defaults otherwise.
+ASYNC_STATEMENT_CACHE_SIZE = os.getenv("ASYNC_STATEMENT_CACHE_SIZE")
+TRANSACTION_POOLER_PORT = 6543
+
+# asyncpg connections belong to the loop that opened them, so each loop gets its own engine
+_engines = weakref.WeakKeyDictionary()
+
+# ----------------------- ENGINE ------------------------
+
+def _statement_cache_size(url, setting: str = None):
+    """Prepared statement cache size for url, or None to keep the drivers' defaults"""
+    if setting:
+        return int(setting)
+    behind_pooler = url.port == TRANSACTION_POOLER_PORT or \
+        str(url.query.get("pgbouncer", "")).lower() == "true"
+    return 0 if behind_pooler else None
+
+def _async_engine_args(database_url: str, statement_cache_size: str = None):
+    url = make_url(database_url).set(drivername="postgresql+asyncpg")
+    cache_size = _statement_cache_size(url, statement_cache_size or ASYNC_STATEMENT_CACHE_SIZE)
+    # asyncpg takes `ssl` instead of libpq's `sslmode`; `pgbouncer` is a client hint only
+    sslmode = url.query.get("sslmode")
+    url = url.difference_update_query(["sslmode", "pgbouncer"])
+    connect_args = {"ssl": sslmode} if sslmode and sslmode != "disable" else {}
+    if cache_size is not None:
+        # asyncpg's own cache, and the named statements SQLAlchemy's dialect caches
+        connect_args["statement_cache_size"] = cache_size
+        url = url.update_query_dict({"prepared_statement_cache_size": str(cache_size)})
+        if cache_size == 0:
+            # Unique names, so a statement never collides with one left on a pooled server connection
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    return url, connect_args
+
+def get_async_engine():
+    """
+    Async engine for the running event loop, created on first use
+    Returns: AsyncEngine
+    """
+    loop = asyncio.get_running_loop()
+    engine = _engines.get(loop)
+    if engine is None:
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            raise RuntimeError("DATABASE_URL environment variable not set")
+        url, connect_args = _async_engine_args(database_url)
+        # asyncpg prepares each statement server-side and, unless ASYNC_STATEMENT_CACHE_SIZE
+        # turns it off, keeps it per connection (prepared_statement_cache_size, 100 by default)
+        engine = create_async_engine(url, connect_args=connect_args, pool_size=ASYNC_POOL_SIZE,
+                                     max_overflow=0, pool_pre_ping=True)
+        instrument_engine(engine.sync_engine)
+        _engines[loop] = engine
+    return engine
+
+async def dispose_async_engine():
+    """Close the running loop's pooled connections; call before the loop finishes"""
+    engine = _engines.pop(asyncio.get_running_loop(), None)
+    if engine is not None:
+        await engine.dispose()
+
+async def fetch_frame(query, params: dict = None, schema: dict = None) -> pd.DataFrame:
+    """Run a SELECT and return its rows as a DataFrame, typed per schema"""
+    async with get_async_engine().connect() as conn:
+        result = await conn.execute(query, params or {})
+        return frame_from_result(result, schema)
+
+# ----------------------- READS ------------------------
+
+_ALL_TEMPLES_SQL = statement("get_all_temples", "SELECT * FROM temples ORDER BY created_at DESC, id DESC")
+_ALL_CONTRIBUTIONS_SQL = statement("get_all_contributions",
+                                   "SELECT * FROM content_contributions ORDER BY created_at DESC, id DESC")
+
+async def get_all_temples() -> pd.DataFrame:
+    """Get all temples, newest first"""
+    return await fetch_frame(_ALL_TEMPLES_SQL, schema=TABLE_SCHEMAS["temples"])
+
+async def get_all_contributions() -> pd.DataFrame:
+    """Get all content contributions, newest first"""
+    return await fetch_frame(_ALL_CONTRIBUTIONS_SQL, schema=TABLE_SCHEMAS["content_contributions"])
+
+async def query_contributions(content_type=None, contributor_name=None, anonymous=False,
+                              since=None, sort_by="Newest First", limit=None, after=None) -> pd.DataFrame:
+    """One keyset page of contributions; see database.query_contributions"""
+    query, params = contribution_page_query(content_type, contributor_name, anonymous,
+                                            since, sort_by, limit, after)
+    return await fetch_frame(query, params)
+
+async def search_temples(search_term=None, architectural_style=None, sort_by="Most Recent",
+                         limit=None, after=None) -> pd.DataFrame:
+    """One keyset page of temples; see database.search_temples"""
+    query, params = temple_page_query(search_term, architectural_style, sort_by, limit, after)
+    return await fetch_frame(query, params, TABLE_SCHEMAS["temples"])
+
+async def iter_contributions(batch_size: int = 1000, sort_by="Newest First", **filters):
+    """
+    Async iterator over contributions matching the filters, one keyset page
+    (DataFrame of at most batch_size rows) at a time
+    """
+    sort_spec = CONTRIBUTION_SORTS.get(sort_by, CONTRIBUTION_SORTS["Newest First"])
+    after = None
+    while True:
+        page = await query_contributions(sort_by=sort_by, limit=batch_size, after=after, **filters)
+        if page.empty:
+            return
+        yield page
+        if len(page) < batch_size:
+            return
+        after = page_cursor(page.iloc[-1], sort_spec)
+
+async def iter_temples(batch_size: int = 1000, sort_by="Most Recent", **filters):
+    """
+    Async iterator over temples matching the filters, one keyset page
+    (DataFrame of at most batch_size rows) at a time
+    """
+    sort_spec = TEMPLE_SORTS.get(sort_by, TEMPLE_SORTS["Most Recent"])
+    after = None
+    while True:
+        page = await search_temples(sort_by=sort_by, limit=batch_size, after=after, **filters)
+        if page.empty:
+            return
+        yield page
+        if len(page) < batch_size:
+            return
+        after = page_cursor(page.iloc[-1], sort_spec)
+
+# ----------------------- BULK WRITES ------------------------
+
+async def _execute_many(name: str, sql: str, rows: list, table_name: str) -> int:
+    if not rows:
+        return 0
+    async with get_async_engine().begin() as conn:
+        await conn.execute(cached_statement(name, sql), rows)
+    invalidate_tables(table_name)
+    return len(rows)
+
+def _temple_params(row: dict) -> dict:
+    # Same normalization as database.insert_temple
+    built_year = row.get("built_year")
+    return {
+        "id": row.get("id") or str(uuid.uuid4()),
+        "name": row["name"],
+        "description": row.get("description"),
+        "location": row.get("location"),
+        "image_url": row.get("image_url"),
+        "audio_url": row.get("audio_url"),
+        "contributor_name": row.get("contributor_name"),
+        "deity": row.get("deity") or None,
+        "architectural_style": row.get("architectural_style"),
+        "built_year": int(built_year) if built_year else None,
+        "history": row.get("history") or None,
+        "latitude": row.get("latitude"),
+        "longitude": row.get("longitude")
+    }
+
+async def insert_temples(rows: list) -> int:
+    """
+    Insert many temples (dicts with insert_temple's arguments) in one transaction
+    Returns: Number of rows inserted
+    """
+    params = [_temple_params(row) for row in rows]
+    return await _execute_many("insert_temples", INSERT_TEMPLE_SQL, params, "temples")
+
+async def insert_contributions(rows: list) -> int:
+    """
+    Insert many contributions (dicts with insert_content_contribution's arguments) in one transaction
+    Returns: Number of rows inserted
+    """
+    columns = ("title", "content_type", "description", "file_url", "latitude", "longitude",
+               "location_address", "contributor_name")
+    params = [{column: row.get(column) for column in columns} for row in rows]
+    return await _execute_many("insert_contributions", INSERT_CONTRIBUTION_SQL, params, "content_contributions")
+
+async def update_temple_coordinates(updates: list) -> int:
+    """
+    Set latitude/longitude for many temples, e.g. from a geocoding backfill.
+    `updates` holds dicts with id, latitude and longitude. Update triggers (migration
+    010) move each temple between density cells and mark its old and new map tiles
+    dirty in the same transaction; run utils.tile_builder to rebuild those tiles.
+    Returns: Number of updates sent
+    """
+    return await _execute_many(
+        "update_temple_coordinates",
+        "UPDATE temples SET latitude = :latitude, longitude = :longitude WHERE id = :id",
+        [{"id": row["id"], "latitude": row["latitude"], "longitude": row["longitude"]} for row in updates],
+        "temples"
+    )
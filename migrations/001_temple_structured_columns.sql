@@ -0,0 +1,39 @@
+-- Structured temple attributes that the upload form used to pack into description,
+-- plus the coordinates and contributor that Browse Temples filters and sorts on.
+ALTER TABLE temples
+    ADD COLUMN IF NOT EXISTS deity text,
+    ADD COLUMN IF NOT EXISTS architectural_style text,
+    ADD COLUMN IF NOT EXISTS built_year integer,
+    ADD COLUMN IF NOT EXISTS history text,
+    ADD COLUMN IF NOT EXISTS latitude numeric(10, 8),
+    ADD COLUMN IF NOT EXISTS longitude numeric(11, 8),
+    ADD COLUMN IF NOT EXISTS contributor_name character varying(255);
+
+-- Backfill from descriptions written by the old form:
+--   Deity: <deity>
+--   Architectural Style: <style>
+--   Built Year: <year>
+--
+--   History & Significance:
+--   <history>
+UPDATE temples SET
+    deity = COALESCE(deity, NULLIF(btrim(substring(description from '(?n)^Deity:(.*)$')), '')),
+    architectural_style = COALESCE(architectural_style,
+        NULLIF(btrim(substring(description from '(?n)^Architectural Style:(.*)$')), '')),
+    built_year = COALESCE(built_year, substring(description from '(?n)^Built Year:\s*(\d{1,4})\s*$')::integer),
+    history = COALESCE(history, NULLIF(btrim(substring(description from 'History & Significance:\n(.*)$')), ''))
+WHERE description LIKE 'Deity:%';
+
+CREATE INDEX IF NOT EXISTS temples_created_at_idx ON temples (created_at DESC);
+CREATE INDEX IF NOT EXISTS temples_name_idx ON temples (name);
+CREATE INDEX IF NOT EXISTS temples_style_created_at_idx ON temples (architectural_style, created_at DESC);
+CREATE INDEX IF NOT EXISTS temples_built_year_idx ON temples (built_year);
+CREATE INDEX IF NOT EXISTS temples_coordinates_idx ON temples (latitude, longitude)
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
+
+-- Trigram indexes keep the ILIKE search on Browse Temples off sequential scans
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS temples_name_trgm_idx ON temples USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS temples_deity_trgm_idx ON temples USING gin (deity gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS temples_location_trgm_idx ON temples USING gin (location gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS temples_description_trgm_idx ON temples USING gin (description gin_trgm_ops);
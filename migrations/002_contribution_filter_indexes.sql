@@ -0,0 +1,10 @@
+-- Composite indexes behind the Community Contributions filters and sort orders.
+-- Each filter column leads its index so the filtered rows come back already ordered.
+CREATE INDEX IF NOT EXISTS content_contributions_created_at_idx
+    ON content_contributions (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS content_contributions_type_created_at_idx
+    ON content_contributions (content_type, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS content_contributions_contributor_created_at_idx
+    ON content_contributions (contributor_name, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS content_contributions_title_idx
+    ON content_contributions (title, id);
@@ -0,0 +1,9 @@
+-- Keyset pagination indexes for Browse Temples. Each sort order ends in id so
+-- the (sort key, id) row comparison used for "next page" is an index range scan.
+CREATE INDEX IF NOT EXISTS temples_created_at_id_idx ON temples (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS temples_name_id_idx ON temples (name, id);
+CREATE INDEX IF NOT EXISTS temples_built_year_id_idx ON temples ((COALESCE(built_year, 2147483647)), id);
+
+-- Superseded by the (key, id) indexes above
+DROP INDEX IF EXISTS temples_created_at_idx;
+DROP INDEX IF EXISTS temples_name_idx;
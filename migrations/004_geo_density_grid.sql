@@ -0,0 +1,81 @@
+-- Multi-resolution point density grid for temples and contributions.
+-- Cells are Web Mercator tiles (zoom, x, y), the same scheme Leaflet uses, kept
+-- current by insert triggers so geographic overviews never scan the point tables.
+CREATE TABLE IF NOT EXISTS geo_density_cells (
+    layer text NOT NULL,
+    zoom smallint NOT NULL,
+    x integer NOT NULL,
+    y integer NOT NULL,
+    point_count bigint NOT NULL DEFAULT 0,
+    lat_sum double precision NOT NULL DEFAULT 0,
+    lon_sum double precision NOT NULL DEFAULT 0,
+    CONSTRAINT geo_density_cells_pkey PRIMARY KEY (layer, zoom, x, y)
+);
+
+-- Grid levels kept in the table; utils/geo_grid.py GRID_ZOOMS mirrors this list
+CREATE OR REPLACE FUNCTION heritage_density_zooms() RETURNS integer[]
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT ARRAY[2, 4, 6, 8, 10, 12]
+$$;
+
+CREATE OR REPLACE FUNCTION heritage_tile_x(lon double precision, zoom integer) RETURNS integer
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT LEAST(GREATEST(FLOOR((lon + 180.0) / 360.0 * (1 << zoom))::integer, 0), (1 << zoom) - 1)
+$$;
+
+CREATE OR REPLACE FUNCTION heritage_tile_y(lat double precision, zoom integer) RETURNS integer
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT LEAST(GREATEST(
+        FLOOR((1.0 - LN(TAN(RADIANS(c)) + 1.0 / COS(RADIANS(c))) / PI()) / 2.0 * (1 << zoom))::integer,
+        0), (1 << zoom) - 1)
+    FROM (SELECT LEAST(GREATEST(lat, -85.05112878), 85.05112878) AS c) clamped
+$$;
+
+CREATE OR REPLACE FUNCTION heritage_add_density() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL THEN
+        INSERT INTO geo_density_cells AS cells (layer, zoom, x, y, point_count, lat_sum, lon_sum)
+        SELECT TG_TABLE_NAME, z, heritage_tile_x(NEW.longitude, z), heritage_tile_y(NEW.latitude, z),
+               1, NEW.latitude, NEW.longitude
+        FROM unnest(heritage_density_zooms()) AS z
+        ON CONFLICT (layer, zoom, x, y) DO UPDATE SET
+            point_count = cells.point_count + 1,
+            lat_sum = cells.lat_sum + EXCLUDED.lat_sum,
+            lon_sum = cells.lon_sum + EXCLUDED.lon_sum;
+    END IF;
+    RETURN NEW;
+END
+$$;
+
+DROP TRIGGER IF EXISTS temples_density_trigger ON temples;
+CREATE TRIGGER temples_density_trigger AFTER INSERT ON temples
+    FOR EACH ROW EXECUTE FUNCTION heritage_add_density();
+
+DROP TRIGGER IF EXISTS content_contributions_density_trigger ON content_contributions;
+CREATE TRIGGER content_contributions_density_trigger AFTER INSERT ON content_contributions
+    FOR EACH ROW EXECUTE FUNCTION heritage_add_density();
+
+-- Full recompute, for the initial fill and for repairing drift after updates or deletes.
+-- The lock makes concurrent inserts wait, so their increments land after the rebuild.
+CREATE OR REPLACE FUNCTION heritage_rebuild_density_grid() RETURNS void
+LANGUAGE plpgsql AS $$
+BEGIN
+    LOCK TABLE geo_density_cells IN EXCLUSIVE MODE;
+    DELETE FROM geo_density_cells;
+    INSERT INTO geo_density_cells (layer, zoom, x, y, point_count, lat_sum, lon_sum)
+    SELECT layer, z, heritage_tile_x(longitude, z), heritage_tile_y(latitude, z),
+           COUNT(*), SUM(latitude), SUM(longitude)
+    FROM (
+        SELECT 'temples' AS layer, latitude::float8 AS latitude, longitude::float8 AS longitude
+        FROM temples WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+        UNION ALL
+        SELECT 'content_contributions', latitude::float8, longitude::float8
+        FROM content_contributions WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+    ) points
+    CROSS JOIN unnest(heritage_density_zooms()) AS z
+    GROUP BY 1, 2, 3, 4;
+END
+$$;
+
+SELECT heritage_rebuild_density_grid();
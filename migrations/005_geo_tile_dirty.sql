@@ -0,0 +1,42 @@
+-- Map tiles (tiles/{layer}/{z}/{x}/{y}.geojson in file storage) that need regenerating.
+-- Inserts mark every tile containing the new point at each grid level; the tile
+-- builder claims and rebuilds them (python -m utils.tile_builder).
+CREATE TABLE IF NOT EXISTS geo_tile_dirty (
+    layer text NOT NULL,
+    zoom smallint NOT NULL,
+    x integer NOT NULL,
+    y integer NOT NULL,
+    marked_at timestamp with time zone NOT NULL DEFAULT now(),
+    CONSTRAINT geo_tile_dirty_pkey PRIMARY KEY (layer, zoom, x, y)
+);
+
+CREATE OR REPLACE FUNCTION heritage_mark_tiles_dirty() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL THEN
+        INSERT INTO geo_tile_dirty (layer, zoom, x, y)
+        SELECT TG_TABLE_NAME, z, heritage_tile_x(NEW.longitude, z), heritage_tile_y(NEW.latitude, z)
+        FROM unnest(heritage_density_zooms()) AS z
+        ON CONFLICT (layer, zoom, x, y) DO NOTHING;
+    END IF;
+    RETURN NEW;
+END
+$$;
+
+DROP TRIGGER IF EXISTS temples_tile_dirty_trigger ON temples;
+CREATE TRIGGER temples_tile_dirty_trigger AFTER INSERT ON temples
+    FOR EACH ROW EXECUTE FUNCTION heritage_mark_tiles_dirty();
+
+DROP TRIGGER IF EXISTS content_contributions_tile_dirty_trigger ON content_contributions;
+CREATE TRIGGER content_contributions_tile_dirty_trigger AFTER INSERT ON content_contributions
+    FOR EACH ROW EXECUTE FUNCTION heritage_mark_tiles_dirty();
+
+-- Point tiles read contributions by bounding box, like temples_coordinates_idx
+CREATE INDEX IF NOT EXISTS content_contributions_coordinates_idx
+    ON content_contributions (latitude, longitude)
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
+
+-- Every non-empty tile is built on the first run
+INSERT INTO geo_tile_dirty (layer, zoom, x, y)
+SELECT layer, zoom, x, y FROM geo_density_cells WHERE point_count > 0
+ON CONFLICT (layer, zoom, x, y) DO NOTHING;
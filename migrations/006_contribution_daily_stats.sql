@@ -0,0 +1,24 @@
+-- Materialized daily contribution statistics, refreshed by python -m utils.stats_rollup.
+-- Days before the watermark in stats_rollup_state are final; later days are read
+-- live from content_contributions until the next refresh.
+CREATE TABLE IF NOT EXISTS contribution_daily_stats (
+    day date NOT NULL,
+    content_type text NOT NULL DEFAULT '',
+    contributor_key text NOT NULL DEFAULT '',  -- '' for anonymous contributions
+    contribution_count bigint NOT NULL,
+    CONSTRAINT contribution_daily_stats_pkey PRIMARY KEY (day, content_type, contributor_key)
+);
+
+CREATE TABLE IF NOT EXISTS contribution_daily_totals (
+    day date NOT NULL,
+    contribution_count bigint NOT NULL,
+    running_total bigint NOT NULL,
+    CONSTRAINT contribution_daily_totals_pkey PRIMARY KEY (day)
+);
+
+CREATE TABLE IF NOT EXISTS stats_rollup_state (
+    rollup text NOT NULL,
+    watermark date NOT NULL,
+    refreshed_at timestamp with time zone NOT NULL DEFAULT now(),
+    CONSTRAINT stats_rollup_state_pkey PRIMARY KEY (rollup)
+);
@@ -0,0 +1,61 @@
+-- Exact row counts kept by statement-level triggers, so the home page metrics
+-- read one row instead of scanning the table. python -m utils.counters
+-- reconciles them against COUNT(*) and reports any drift.
+CREATE TABLE IF NOT EXISTS table_counters (
+    table_name text NOT NULL,
+    row_count bigint NOT NULL DEFAULT 0,
+    reconciled_at timestamp with time zone,
+    CONSTRAINT table_counters_pkey PRIMARY KEY (table_name)
+);
+
+CREATE OR REPLACE FUNCTION heritage_count_inserts() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE table_counters SET row_count = row_count + (SELECT COUNT(*) FROM new_rows)
+    WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END
+$$;
+
+CREATE OR REPLACE FUNCTION heritage_count_deletes() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE table_counters SET row_count = row_count - (SELECT COUNT(*) FROM old_rows)
+    WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END
+$$;
+
+CREATE OR REPLACE FUNCTION heritage_count_truncate() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE table_counters SET row_count = 0 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END
+$$;
+
+DO $$
+DECLARE
+    counted text;
+BEGIN
+    FOREACH counted IN ARRAY ARRAY['temples', 'content_contributions', 'historical_events', 'media_uploads'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', counted || '_count_insert_trigger', counted);
+        EXECUTE format('CREATE TRIGGER %I AFTER INSERT ON %I REFERENCING NEW TABLE AS new_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION heritage_count_inserts()',
+                       counted || '_count_insert_trigger', counted);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', counted || '_count_delete_trigger', counted);
+        EXECUTE format('CREATE TRIGGER %I AFTER DELETE ON %I REFERENCING OLD TABLE AS old_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION heritage_count_deletes()',
+                       counted || '_count_delete_trigger', counted);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', counted || '_count_truncate_trigger', counted);
+        EXECUTE format('CREATE TRIGGER %I AFTER TRUNCATE ON %I '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION heritage_count_truncate()',
+                       counted || '_count_truncate_trigger', counted);
+        EXECUTE format('INSERT INTO table_counters (table_name, row_count, reconciled_at) '
+                       'SELECT %L, COUNT(*), now() FROM %I '
+                       'ON CONFLICT (table_name) DO UPDATE SET row_count = EXCLUDED.row_count, '
+                       'reconciled_at = EXCLUDED.reconciled_at',
+                       counted, counted);
+    END LOOP;
+END
+$$;
@@ -0,0 +1,32 @@
+-- Per-table data version, bumped by any statement that changes the table.
+-- Caches key their results on these numbers (one primary-key read for all tables)
+-- instead of re-running a query to find out whether anything changed.
+CREATE TABLE IF NOT EXISTS data_versions (
+    table_name text NOT NULL,
+    version bigint NOT NULL DEFAULT 1,
+    changed_at timestamp with time zone NOT NULL DEFAULT now(),
+    CONSTRAINT data_versions_pkey PRIMARY KEY (table_name)
+);
+
+CREATE OR REPLACE FUNCTION heritage_bump_data_version() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = now()
+    WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END
+$$;
+
+DO $$
+DECLARE
+    versioned text;
+BEGIN
+    FOREACH versioned IN ARRAY ARRAY['temples', 'content_contributions', 'historical_events', 'media_uploads'] LOOP
+        INSERT INTO data_versions (table_name) VALUES (versioned) ON CONFLICT (table_name) DO NOTHING;
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', versioned || '_data_version_trigger', versioned);
+        EXECUTE format('CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION heritage_bump_data_version()',
+                       versioned || '_data_version_trigger', versioned);
+    END LOOP;
+END
+$$;
@@ -0,0 +1,17 @@
+-- Announce every data version bump on the heritage_changes channel, so server
+-- processes running utils/change_feed.py drop cached results as soon as the
+-- writing transaction commits instead of polling data_versions.
+CREATE OR REPLACE FUNCTION heritage_bump_data_version() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    new_version bigint;
+BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = now()
+    WHERE table_name = TG_TABLE_NAME
+    RETURNING version INTO new_version;
+    PERFORM pg_notify('heritage_changes', json_build_object(
+        'table', TG_TABLE_NAME, 'op', TG_OP, 'version', new_version
+    )::text);
+    RETURN NULL;
+END
+$$;
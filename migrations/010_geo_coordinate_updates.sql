@@ -0,0 +1,72 @@
+-- Keep the density grid and map tiles current when a point's coordinates change,
+-- e.g. a geocoding backfill through database_async.update_temple_coordinates.
+-- The point leaves its old cells and joins the new ones in the updating transaction,
+-- and the tiles at both positions are marked for the tile builder.
+CREATE OR REPLACE FUNCTION heritage_move_density() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF OLD.latitude IS NOT NULL AND OLD.longitude IS NOT NULL THEN
+        UPDATE geo_density_cells AS cells SET
+            point_count = cells.point_count - 1,
+            lat_sum = cells.lat_sum - OLD.latitude,
+            lon_sum = cells.lon_sum - OLD.longitude
+        FROM unnest(heritage_density_zooms()) AS z
+        WHERE cells.layer = TG_TABLE_NAME AND cells.zoom = z
+          AND cells.x = heritage_tile_x(OLD.longitude, z) AND cells.y = heritage_tile_y(OLD.latitude, z);
+        DELETE FROM geo_density_cells AS cells
+        USING unnest(heritage_density_zooms()) AS z
+        WHERE cells.layer = TG_TABLE_NAME AND cells.zoom = z
+          AND cells.x = heritage_tile_x(OLD.longitude, z) AND cells.y = heritage_tile_y(OLD.latitude, z)
+          AND cells.point_count <= 0;
+    END IF;
+    IF NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL THEN
+        INSERT INTO geo_density_cells AS cells (layer, zoom, x, y, point_count, lat_sum, lon_sum)
+        SELECT TG_TABLE_NAME, z, heritage_tile_x(NEW.longitude, z), heritage_tile_y(NEW.latitude, z),
+               1, NEW.latitude, NEW.longitude
+        FROM unnest(heritage_density_zooms()) AS z
+        ON CONFLICT (layer, zoom, x, y) DO UPDATE SET
+            point_count = cells.point_count + 1,
+            lat_sum = cells.lat_sum + EXCLUDED.lat_sum,
+            lon_sum = cells.lon_sum + EXCLUDED.lon_sum;
+    END IF;
+    RETURN NEW;
+END
+$$;
+
+CREATE OR REPLACE FUNCTION heritage_mark_moved_tiles_dirty() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO geo_tile_dirty (layer, zoom, x, y)
+    SELECT TG_TABLE_NAME, z, heritage_tile_x(point.longitude, z), heritage_tile_y(point.latitude, z)
+    FROM (VALUES (OLD.latitude::float8, OLD.longitude::float8),
+                 (NEW.latitude::float8, NEW.longitude::float8)) AS point (latitude, longitude)
+    CROSS JOIN unnest(heritage_density_zooms()) AS z
+    WHERE point.latitude IS NOT NULL AND point.longitude IS NOT NULL
+    ON CONFLICT (layer, zoom, x, y) DO NOTHING;
+    RETURN NEW;
+END
+$$;
+
+DROP TRIGGER IF EXISTS temples_density_move_trigger ON temples;
+CREATE TRIGGER temples_density_move_trigger AFTER UPDATE OF latitude, longitude ON temples
+    FOR EACH ROW
+    WHEN (OLD.latitude IS DISTINCT FROM NEW.latitude OR OLD.longitude IS DISTINCT FROM NEW.longitude)
+    EXECUTE FUNCTION heritage_move_density();
+
+DROP TRIGGER IF EXISTS content_contributions_density_move_trigger ON content_contributions;
+CREATE TRIGGER content_contributions_density_move_trigger AFTER UPDATE OF latitude, longitude ON content_contributions
+    FOR EACH ROW
+    WHEN (OLD.latitude IS DISTINCT FROM NEW.latitude OR OLD.longitude IS DISTINCT FROM NEW.longitude)
+    EXECUTE FUNCTION heritage_move_density();
+
+DROP TRIGGER IF EXISTS temples_tile_dirty_move_trigger ON temples;
+CREATE TRIGGER temples_tile_dirty_move_trigger AFTER UPDATE OF latitude, longitude ON temples
+    FOR EACH ROW
+    WHEN (OLD.latitude IS DISTINCT FROM NEW.latitude OR OLD.longitude IS DISTINCT FROM NEW.longitude)
+    EXECUTE FUNCTION heritage_mark_moved_tiles_dirty();
+
+DROP TRIGGER IF EXISTS content_contributions_tile_dirty_move_trigger ON content_contributions;
+CREATE TRIGGER content_contributions_tile_dirty_move_trigger AFTER UPDATE OF latitude, longitude ON content_contributions
+    FOR EACH ROW
+    WHEN (OLD.latitude IS DISTINCT FROM NEW.latitude OR OLD.longitude IS DISTINCT FROM NEW.longitude)
+    EXECUTE FUNCTION heritage_mark_moved_tiles_dirty();
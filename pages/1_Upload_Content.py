@@ -161,20 +161,19 @@ elif content_type == "Temple Information":
         if temple_name:
             with st.spinner("Adding temple information..."):
                 try:
-                    # Create description with additional details
-                    full_description = f"Deity: {deity}\nArchitectural Style: {architectural_style}"
-                    if built_year:
-                        full_description += f"\nBuilt Year: {built_year}"
-                    if history:
-                        full_description += f"\n\nHistory & Significance:\n{history}"
-                    
                     temple_id = insert_temple(
                         name=temple_name,
-                        description=full_description,
+                        description=history,
                         location=location_address,
                         image_url=None,
                         audio_url=None,
-                        contributor_name=contributor_name if not anonymous else None
+                        contributor_name=contributor_name if not anonymous else None,
+                        deity=deity,
+                        architectural_style=architectural_style,
+                        built_year=built_year,
+                        history=history,
+                        latitude=latitude,
+                        longitude=longitude
                     )
                     
                     if temple_id:
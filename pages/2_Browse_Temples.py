@@ -1,6 +1,28 @@
 import streamlit as st
 import pandas as pd
-from database import get_all_temples, search_temples
+from database import (
+    search_temples,
+    get_temple_summary,
+    get_temple_extent,
+    get_temples_in_bbox,
+    get_temple_clusters_in_bbox,
+    get_density_cells,
+    page_cursor,
+    TEMPLE_SORTS
+)
+from utils.pagination import windowed_rows
+from utils.data_versions import get_data_version
+from utils.geo_grid import grid_zoom_for
+from utils.map_rendering import (
+    build_feature_collection,
+    GeoJsonMarkerCluster,
+    add_cluster_counts,
+    viewport_from_map_state,
+    estimate_zoom,
+    grid_cell_size,
+    padded_bounds,
+    bounds_contain
+)
 import folium
 from streamlit_folium import st_folium
 
@@ -23,14 +45,9 @@ with col2:
 with col3:
     sort_by = st.selectbox("Sort by", ["Most Recent", "Alphabetical", "Built Year"])
 
-# Get temples data
-if search_term:
-    style_filter = None if selected_style == "All Styles" else selected_style
-    temples_df = search_temples(search_term, style_filter)
-else:
-    temples_df = get_all_temples()
-    if not temples_df.empty and selected_style != "All Styles":
-        temples_df = temples_df[temples_df.get('architectural_style') == selected_style]
+# Search, style filter and sort run in SQL; the result count and statistics are aggregates
+style_filter = None if selected_style == "All Styles" else selected_style
+temple_summary = get_temple_summary(search_term, style_filter)
 
 # Ensure all expected columns exist
 expected_columns = [
@@ -38,27 +55,126 @@ expected_columns = [
     'location_address', 'latitude', 'longitude', 'history', 
     'contributor_name', 'created_at'
 ]
-for col in expected_columns:
-    if col not in temples_df.columns:
-        temples_df[col] = None
-
-# Apply sorting
-if not temples_df.empty:
-    if sort_by == "Alphabetical":
-        temples_df = temples_df.sort_values('name')
-    elif sort_by == "Built Year":
-        temples_df = temples_df.sort_values('built_year', na_position='last')
-    # Most Recent is default (already sorted by created_at DESC)
+
+def with_expected_columns(df):
+    for col in expected_columns:
+        if col not in df.columns:
+            df[col] = None
+    return df
+
+def field(row, column):
+    """A row's value, or None when missing; typed columns hold NULL as NA/NaN, which is truthy"""
+    value = row.get(column)
+    return None if value is None or pd.isna(value) else value
+
+def built_year_text(row, missing=None):
+    """built_year as a whole year (nullable integer columns can still arrive as float)"""
+    year = field(row, 'built_year')
+    return str(int(year)) if year is not None else missing
+
+# Map viewport loading
+MAP_WIDTH, MAP_HEIGHT = 700, 500
+CLUSTER_BELOW_ZOOM = 8
+MAX_MAP_POINTS = 5000
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_map_view(bbox, zoom, search_term, style_filter, data_version):
+    """
+    Temples (or, when zoomed out or too dense, grid clusters) for one padded viewport;
+    data_version only keys the cache, so a new temple invalidates it
+    """
+    if zoom >= CLUSTER_BELOW_ZOOM:
+        points = get_temples_in_bbox(*bbox, search_term=search_term, architectural_style=style_filter,
+                                     limit=MAX_MAP_POINTS + 1)
+        if len(points) <= MAX_MAP_POINTS:
+            return points, None
+    if not search_term and not style_filter:
+        # Unfiltered overviews come straight from the precomputed density grid
+        return None, get_density_cells(grid_zoom_for(zoom, detail=2), layer="temples", bounds=bbox)
+    clusters = get_temple_clusters_in_bbox(*bbox, grid_cell_size(zoom), search_term=search_term,
+                                           architectural_style=style_filter)
+    return None, clusters
+
+def render_viewport_map(search_term, style_filter, selected_style):
+    signature = (search_term, selected_style)
+    # st_folium keeps its last reported view under its key; read it before drawing
+    view_bounds, view_zoom = viewport_from_map_state(st.session_state.get("browse_map"))
+    loaded = st.session_state.get("browse_map_loaded")
+    
+    if loaded is None or loaded['signature'] != signature:
+        extent = get_temple_extent(search_term, style_filter)
+        if extent is None:
+            st.warning("No temples with coordinates found for map display.")
+            return
+        zoom = estimate_zoom(extent, MAP_WIDTH, MAP_HEIGHT)
+        center = [(extent[0] + extent[2]) / 2, (extent[1] + extent[3]) / 2]
+        loaded = {'signature': signature, 'bbox': padded_bounds(extent, zoom), 'zoom': zoom, 'center': center}
+    elif view_bounds and (view_zoom != loaded['zoom'] or not bounds_contain(loaded['bbox'], view_bounds)):
+        # Only a zoom change or a pan past the padded area triggers a new query
+        loaded = {
+            'signature': signature,
+            'bbox': padded_bounds(view_bounds, view_zoom),
+            'zoom': view_zoom,
+            'center': [(view_bounds[0] + view_bounds[2]) / 2, (view_bounds[1] + view_bounds[3]) / 2]
+        }
+    st.session_state["browse_map_loaded"] = loaded
+    
+    points, clusters = load_map_view(loaded['bbox'], loaded['zoom'], search_term, style_filter,
+                                     get_data_version("temples"))
+    
+    # The map is rebuilt only when `loaded` changes, so st_folium keeps the user's view otherwise
+    m = folium.Map(location=loaded['center'], zoom_start=loaded['zoom'])
+    if points is not None:
+        temple_features = build_feature_collection(
+            points,
+            properties=['name', 'deity', 'architectural_style', 'built_year', 'contributor_name']
+        )
+        GeoJsonMarkerCluster(
+            temple_features,
+            title_field='name',
+            popup_fields=[
+                ('Deity', 'deity', 'Not specified'),
+                ('Style', 'architectural_style', 'Not specified'),
+                ('Built', 'built_year', 'Unknown'),
+                ('Contributor', 'contributor_name', 'Anonymous')
+            ],
+            tooltip_field='name'
+        ).add_to(m)
+    elif not clusters.empty:
+        add_cluster_counts(m, clusters)
+    
+    st_folium(m, key="browse_map", width=MAP_WIDTH, height=MAP_HEIGHT, returned_objects=["bounds", "zoom"])
+    
+    if points is not None:
+        st.info(f"Showing {len(points)} temples in and around the current view.")
+    else:
+        total = int(clusters['count'].sum()) if not clusters.empty else 0
+        st.info(f"Showing {total} temples grouped by area. Zoom in to see individual temples.")
 
 # Display results
-st.subheader(f"📋 Results ({len(temples_df)} temples found)")
+st.subheader(f"📋 Results ({temple_summary['total']} temples found)")
 
-if temples_df.empty:
+if temple_summary['total'] == 0:
     st.info("No temples found matching your criteria. Try adjusting your search or filters.")
 else:
     # Display options
     view_mode = st.radio("View Mode", ["Cards", "Table", "Map"], horizontal=True)
     
+    if view_mode == "Cards":
+        # Cards render one keyset page at a time
+        temples_df, render_page_controls = windowed_rows(
+            "temples_pager",
+            (search_term, selected_style, sort_by),
+            lambda after, limit: search_temples(search_term, style_filter, sort_by, limit=limit, after=after),
+            lambda row: page_cursor(row, TEMPLE_SORTS[sort_by]),
+            page_size=10
+        )
+    elif view_mode == "Table":
+        temples_df = search_temples(search_term, style_filter, sort_by)
+    else:
+        temples_df = pd.DataFrame()
+    temples_df = with_expected_columns(temples_df)
+    
     if view_mode == "Cards":
         cols_per_row = 2
         for i in range(0, len(temples_df), cols_per_row):
@@ -66,31 +182,31 @@ else:
             for j, (_, temple) in enumerate(temples_df.iloc[i:i+cols_per_row].iterrows()):
                 with cols[j]:
                     with st.container():
-                        st.markdown(f"### {temple.get('name', 'Unknown')}")
+                        st.markdown(f"### {field(temple, 'name') or 'Unknown'}")
                         
                         col_left, col_right = st.columns([2, 1])
                         
                         with col_left:
-                            if temple.get('deity'):
-                                st.write(f"🕉️ **Deity:** {temple.get('deity')}")
-                            if temple.get('architectural_style'):
-                                st.write(f"🏛️ **Style:** {temple.get('architectural_style')}")
-                            if temple.get('built_year'):
-                                st.write(f"📅 **Built:** {temple.get('built_year')}")
-                            if temple.get('location_address'):
-                                st.write(f"📍 **Location:** {temple.get('location_address')}")
+                            if field(temple, 'deity'):
+                                st.write(f"🕉️ **Deity:** {field(temple, 'deity')}")
+                            if field(temple, 'architectural_style'):
+                                st.write(f"🏛️ **Style:** {field(temple, 'architectural_style')}")
+                            if built_year_text(temple):
+                                st.write(f"📅 **Built:** {built_year_text(temple)}")
+                            if field(temple, 'location_address'):
+                                st.write(f"📍 **Location:** {field(temple, 'location_address')}")
                         
                         with col_right:
-                            if temple.get('latitude') and temple.get('longitude'):
+                            if field(temple, 'latitude') is not None and field(temple, 'longitude') is not None:
                                 st.write(f"**Coordinates:**")
-                                st.write(f"{temple.get('latitude'):.4f}, {temple.get('longitude'):.4f}")
+                                st.write(f"{field(temple, 'latitude'):.4f}, {field(temple, 'longitude'):.4f}")
                         
-                        if temple.get('history'):
+                        if field(temple, 'history'):
                             with st.expander("📜 History & Significance"):
-                                st.write(temple.get('history'))
+                                st.write(field(temple, 'history'))
                         
-                        if temple.get('contributor_name'):
-                            st.caption(f"Contributed by: {temple.get('contributor_name')}")
+                        if field(temple, 'contributor_name'):
+                            st.caption(f"Contributed by: {field(temple, 'contributor_name')}")
                         else:
                             st.caption("Contributed anonymously")
                         
@@ -98,6 +214,8 @@ else:
                         if pd.notna(created_at):
                             st.caption(f"Added: {created_at.strftime('%Y-%m-%d')}")
                         st.markdown("---")
+        
+        render_page_controls()
     
     elif view_mode == "Table":
         display_df = temples_df[['name', 'deity', 'architectural_style', 'built_year', 'location_address', 'contributor_name', 'created_at']].copy()
@@ -119,81 +237,45 @@ else:
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    st.write(f"**Name:** {selected_temple.get('name', 'Unknown')}")
-                    st.write(f"**Deity:** {selected_temple.get('deity') or 'Not specified'}")
-                    st.write(f"**Architectural Style:** {selected_temple.get('architectural_style') or 'Not specified'}")
-                    st.write(f"**Built Year:** {selected_temple.get('built_year') or 'Unknown'}")
+                    st.write(f"**Name:** {field(selected_temple, 'name') or 'Unknown'}")
+                    st.write(f"**Deity:** {field(selected_temple, 'deity') or 'Not specified'}")
+                    st.write(f"**Architectural Style:** {field(selected_temple, 'architectural_style') or 'Not specified'}")
+                    st.write(f"**Built Year:** {built_year_text(selected_temple, 'Unknown')}")
                 
                 with col2:
-                    st.write(f"**Location:** {selected_temple.get('location_address') or 'Not specified'}")
-                    if selected_temple.get('latitude') and selected_temple.get('longitude'):
-                        st.write(f"**Coordinates:** {selected_temple.get('latitude'):.6f}, {selected_temple.get('longitude'):.6f}")
-                    st.write(f"**Contributor:** {selected_temple.get('contributor_name') or 'Anonymous'}")
+                    st.write(f"**Location:** {field(selected_temple, 'location_address') or 'Not specified'}")
+                    if field(selected_temple, 'latitude') is not None and field(selected_temple, 'longitude') is not None:
+                        st.write(f"**Coordinates:** {field(selected_temple, 'latitude'):.6f}, {field(selected_temple, 'longitude'):.6f}")
+                    st.write(f"**Contributor:** {field(selected_temple, 'contributor_name') or 'Anonymous'}")
                     if pd.notna(selected_temple.get('created_at')):
                         st.write(f"**Added:** {selected_temple.get('created_at').strftime('%Y-%m-%d %H:%M')}")
                 
-                if selected_temple.get('history'):
+                if field(selected_temple, 'history'):
                     st.write("**History & Significance:**")
-                    st.write(selected_temple.get('history'))
+                    st.write(field(selected_temple, 'history'))
     
     elif view_mode == "Map":
-        temples_with_coords = temples_df.dropna(subset=['latitude', 'longitude'])
-        
-        if temples_with_coords.empty:
-            st.warning("No temples with coordinates found for map display.")
-        else:
-            center_lat = temples_with_coords['latitude'].mean()
-            center_lon = temples_with_coords['longitude'].mean()
-            
-            m = folium.Map(location=[center_lat, center_lon], zoom_start=10)
-            
-            for _, temple in temples_with_coords.iterrows():
-                popup_content = f"""
-                <b>{temple.get('name', 'Unknown')}</b><br>
-                Deity: {temple.get('deity') or 'Not specified'}<br>
-                Style: {temple.get('architectural_style') or 'Not specified'}<br>
-                Built: {temple.get('built_year') or 'Unknown'}<br>
-                Contributor: {temple.get('contributor_name') or 'Anonymous'}
-                """
-                
-                folium.Marker(
-                    location=[temple.get('latitude'), temple.get('longitude')],
-                    popup=folium.Popup(popup_content, max_width=300),
-                    tooltip=temple.get('name', 'Unknown'),
-                    icon=folium.Icon(color='red', icon='home')
-                ).add_to(m)
-            
-            st_folium(m, width=700, height=500)
-            st.info(f"Showing {len(temples_with_coords)} temples with location data on the map.")
+        # The map only loads what is inside its (padded) viewport; see load_map_view
+        render_viewport_map(search_term, style_filter, selected_style)
 
 # Statistics
-if not temples_df.empty:
+if temple_summary['total'] > 0:
     st.markdown("---")
     st.subheader("📊 Browse Statistics")
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Temples", len(temples_df))
+        st.metric("Total Temples", temple_summary['total'])
     
     with col2:
-        temples_with_coords = temples_df.dropna(subset=['latitude', 'longitude'])
-        st.metric("With Coordinates", len(temples_with_coords))
+        st.metric("With Coordinates", temple_summary['with_coordinates'])
     
     with col3:
-        temples_with_year = temples_df.dropna(subset=['built_year'])
-        if not temples_with_year.empty:
-            avg_year = int(temples_with_year['built_year'].mean())
-            st.metric("Avg Built Year", avg_year)
-        else:
-            st.metric("Avg Built Year", "N/A")
+        st.metric("Avg Built Year", temple_summary['avg_built_year'] or "N/A")
     
     with col4:
-        style_counts = temples_df['architectural_style'].value_counts()
-        if not style_counts.empty:
-            st.metric("Most Common Style", style_counts.index[0])
-        else:
-            st.metric("Most Common Style", "N/A")
+        st.metric("Most Common Style", temple_summary['most_common_style'] or "N/A")
 
 # Navigation
 st.markdown("---")
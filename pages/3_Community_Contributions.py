@@ -1,33 +1,48 @@
 import streamlit as st
 import pandas as pd
-from database import get_all_contributions
+from database import (
+    query_contributions,
+    count_contributions,
+    page_cursor,
+    CONTRIBUTION_SORTS,
+    get_contribution_filter_options,
+    get_contribution_summary,
+    get_recent_contributions
+)
 from datetime import datetime, timedelta
+from utils.pagination import windowed_rows
+from utils.rendering import render_contribution_list, render_recent_activity
 
 st.set_page_config(page_title="Community Contributions", page_icon="🌟", layout="wide")
 
 st.title("🌟 Community Contributions")
 st.markdown("Explore all community uploads and contributions to the temple heritage platform.")
 
-# Get contributions data
-contributions_df = get_all_contributions()
+# Aggregates and dropdown values come from small cached queries, not the full table;
+# the query cache keys them on the table's data version, so a new contribution refreshes both
+summary = get_contribution_summary()
 
-if contributions_df.empty:
+if summary['total'] == 0:
     st.info("No contributions yet. Be the first to contribute!")
     if st.button("📤 Upload Content"):
         st.switch_page("pages/1_Upload_Content.py")
 else:
+    filter_options = get_contribution_filter_options()
+    
     # Filters section
     st.subheader("🔍 Filter Contributions")
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         # Content type filter
-        content_types = ["All Types"] + list(contributions_df['content_type'].unique())
+        content_types = ["All Types"] + filter_options['content_types']
         selected_content_type = st.selectbox("Content Type", content_types)
     
     with col2:
         # Contributor filter
-        contributors = ["All Contributors"] + [c for c in contributions_df['contributor_name'].unique() if c is not None] + ["Anonymous"]
+        contributors = ["All Contributors"] + filter_options['contributors']
+        if filter_options['has_anonymous']:
+            contributors.append("Anonymous")
         selected_contributor = st.selectbox("Contributor", contributors)
     
     with col3:
@@ -40,21 +55,8 @@ else:
         sort_options = ["Newest First", "Oldest First", "Alphabetical"]
         selected_sort = st.selectbox("Sort By", sort_options)
     
-    # Apply filters
-    filtered_df = contributions_df.copy()
-    
-    # Content type filter
-    if selected_content_type != "All Types":
-        filtered_df = filtered_df[filtered_df['content_type'] == selected_content_type]
-    
-    # Contributor filter
-    if selected_contributor != "All Contributors":
-        if selected_contributor == "Anonymous":
-            filtered_df = filtered_df[filtered_df['contributor_name'].isna()]
-        else:
-            filtered_df = filtered_df[filtered_df['contributor_name'] == selected_contributor]
-    
     # Date range filter
+    cutoff_date = None
     if selected_date_range != "All Time":
         now = datetime.now()
         if selected_date_range == "Last 7 days":
@@ -63,26 +65,37 @@ else:
             cutoff_date = now - timedelta(days=30)
         elif selected_date_range == "Last 90 days":
             cutoff_date = now - timedelta(days=90)
-        
-        filtered_df = filtered_df[pd.to_datetime(filtered_df['created_at']) >= cutoff_date]
     
-    # Apply sorting
-    if selected_sort == "Newest First":
-        filtered_df = filtered_df.sort_values('created_at', ascending=False)
-    elif selected_sort == "Oldest First":
-        filtered_df = filtered_df.sort_values('created_at', ascending=True)
-    elif selected_sort == "Alphabetical":
-        filtered_df = filtered_df.sort_values('title')
+    # Filters and sorting run in SQL against the composite indexes
+    contribution_filters = {
+        "content_type": None if selected_content_type == "All Types" else selected_content_type,
+        "contributor_name": None if selected_contributor in ("All Contributors", "Anonymous") else selected_contributor,
+        "anonymous": selected_contributor == "Anonymous",
+        "since": cutoff_date
+    }
+    matching_count = count_contributions(**contribution_filters)
     
     # Display results
-    st.subheader(f"📋 Contributions ({len(filtered_df)} found)")
+    st.subheader(f"📋 Contributions ({matching_count} found)")
     
-    if filtered_df.empty:
+    if matching_count == 0:
         st.info("No contributions match your filter criteria.")
     else:
         # Display mode selection
         display_mode = st.radio("Display Mode", ["Detailed Cards", "Compact List", "Data Table"], horizontal=True)
         
+        if display_mode in ("Detailed Cards", "Compact List"):
+            # Cards and list rows render one keyset page at a time
+            filtered_df, render_page_controls = windowed_rows(
+                "contributions_pager",
+                (selected_content_type, selected_contributor, selected_date_range, selected_sort, display_mode),
+                lambda after, limit: query_contributions(**contribution_filters, sort_by=selected_sort,
+                                                         limit=limit, after=after),
+                lambda row: page_cursor(row, CONTRIBUTION_SORTS[selected_sort])
+            )
+        else:
+            filtered_df = query_contributions(**contribution_filters, sort_by=selected_sort)
+        
         if display_mode == "Detailed Cards":
             # Card layout with detailed information
             for _, contribution in filtered_df.iterrows():
@@ -132,30 +145,14 @@ else:
                                     st.write("🎵 Audio file (preview not available)")
                     
                     st.markdown("---")
+            
+            render_page_controls()
         
         elif display_mode == "Compact List":
-            # Compact list format
-            for _, contribution in filtered_df.iterrows():
-                col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
-                
-                with col1:
-                    st.write(f"**{contribution['title']}**")
-                    if contribution['description']:
-                        description_preview = contribution['description'][:100] + "..." if len(contribution['description']) > 100 else contribution['description']
-                        st.caption(description_preview)
-                
-                with col2:
-                    st.write(contribution['content_type'])
-                
-                with col3:
-                    contributor = contribution['contributor_name'] if contribution['contributor_name'] else "Anonymous"
-                    st.write(contributor)
-                
-                with col4:
-                    created_date = pd.to_datetime(contribution['created_at']).strftime('%Y-%m-%d')
-                    st.write(created_date)
-                
-                st.markdown("---")
+            # Compact list format, rendered as one HTML block for the whole page
+            render_contribution_list(filtered_df)
+            
+            render_page_controls()
         
         elif display_mode == "Data Table":
             # Table format
@@ -200,31 +197,27 @@ else:
                     st.write(selected_contribution['description'])
 
 # Statistics section
-if not contributions_df.empty:
+if summary['total'] > 0:
     st.markdown("---")
     st.subheader("📊 Contribution Statistics")
     
+    content_type_counts = summary['content_type_counts']
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Contributions", len(contributions_df))
+        st.metric("Total Contributions", summary['total'])
     
     with col2:
-        unique_contributors = contributions_df['contributor_name'].nunique()
-        # Add anonymous contributions
-        anonymous_count = contributions_df['contributor_name'].isna().sum()
-        if anonymous_count > 0:
-            unique_contributors += 1  # Count anonymous as one contributor type
-        st.metric("Contributors", unique_contributors)
+        # Anonymous contributions count as one contributor type
+        st.metric("Contributors", summary['contributors'])
     
     with col3:
-        content_type_counts = contributions_df['content_type'].value_counts()
         most_common_type = content_type_counts.index[0] if not content_type_counts.empty else "N/A"
         st.metric("Most Common Type", most_common_type)
     
     with col4:
-        contributions_with_coords = contributions_df.dropna(subset=['latitude', 'longitude'])
-        st.metric("With Location", len(contributions_with_coords))
+        st.metric("With Location", summary['with_location'])
     
     # Content type breakdown
     if not content_type_counts.empty:
@@ -233,21 +226,9 @@ if not contributions_df.empty:
     
     # Recent activity timeline
     st.subheader("📅 Recent Activity")
-    recent_contributions = contributions_df.head(10)
+    recent_contributions = get_recent_contributions(limit=10)
     
-    for _, contribution in recent_contributions.iterrows():
-        col1, col2, col3 = st.columns([2, 1, 1])
-        
-        with col1:
-            st.write(f"**{contribution['title']}** ({contribution['content_type']})")
-        
-        with col2:
-            contributor = contribution['contributor_name'] if contribution['contributor_name'] else "Anonymous"
-            st.write(contributor)
-        
-        with col3:
-            time_ago = pd.to_datetime(contribution['created_at']).strftime('%Y-%m-%d')
-            st.write(time_ago)
+    render_recent_activity(recent_contributions)
 
 # Navigation
 st.markdown("---")
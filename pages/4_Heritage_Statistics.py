@@ -2,30 +2,84 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime
-from database import get_all_temples, get_all_contributions
+from datetime import datetime, timezone
+from io import BytesIO
+from database import (
+    get_all_temples,
+    get_all_contributions,
+    get_geo_distribution_summary,
+    get_daily_contribution_totals,
+    get_contribution_breakdown
+)
+from utils.data_loader import load_parallel
+from utils.diagnostics import render_diagnostics
+from utils import analytics
+from utils.csv_export import export_file_name, publish_export, write_export
+from utils.storage_backend import get_export_backend
 
 st.set_page_config(page_title="Heritage Statistics", page_icon="📈", layout="wide")
 
+def prepare_export(name, compress):
+    """
+    Stream an export from the database. With a private exports bucket (EXPORTS_BUCKET)
+    it is uploaded and linked through an expiring signed URL, so the file never sits in
+    server memory; otherwise the bytes are returned for a st.download_button in the
+    same run and are not kept in the session.
+    """
+    try:
+        if get_export_backend() is not None:
+            return publish_export(name, compress)
+        buffer = BytesIO()
+        write_export(name, buffer, compress)
+        return {'data': buffer.getvalue(), 'file_name': export_file_name(name, compress)}
+    except Exception as e:
+        st.error(f"Export failed: {e}")
+        return None
+
 st.title("📈 Heritage Statistics")
 st.markdown("Analytics and insights about temple heritage documentation activity")
 
-# Load data
-temples_df = get_all_temples()
-contributions_df = get_all_contributions()
+# Temple and overview statistics come from the Parquet export when one is published
+# (python -m utils.analytics --export); otherwise they are computed from the full tables
+overview = analytics.get_platform_overview() if analytics.analytics_available() else None
+use_analytics = overview is not None
+
+# Load data; the reads are independent, so they run concurrently
+loaders = {
+    # Per-day and per-type/contributor counts from the materialized rollup
+    'daily_totals': get_daily_contribution_totals,
+    'breakdown': get_contribution_breakdown,
+    'geo_summary': get_geo_distribution_summary
+}
+if not use_analytics:
+    loaders['temples'] = get_all_temples
+    loaders['contributions'] = get_all_contributions
+data, load_timings = load_parallel(loaders)
+temples_df = data.get('temples', pd.DataFrame())
+contributions_df = data.get('contributions', pd.DataFrame())
+daily_totals = data['daily_totals']
+contribution_breakdown = data['breakdown']
+
+if use_analytics:
+    manifest = analytics.get_export_manifest()
+    if manifest:
+        exported_at = datetime.fromisoformat(manifest['exported_at']).astimezone()
+        st.caption(f"Overview, temple and data quality statistics as of {exported_at.strftime('%Y-%m-%d %H:%M')}")
 
 # Summary metrics
 st.subheader("📊 Platform Overview")
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    st.metric(label="Total Temples", value=len(temples_df))
+    st.metric(label="Total Temples", value=overview['temples'] if use_analytics else len(temples_df))
 
 with col2:
-    st.metric(label="Total Contributions", value=len(contributions_df))
+    st.metric(label="Total Contributions", value=overview['contributions'] if use_analytics else len(contributions_df))
 
 with col3:
-    if not contributions_df.empty and 'contributor_name' in contributions_df.columns:
+    if use_analytics:
+        st.metric(label="Active Contributors", value=overview['contributors'])
+    elif not contributions_df.empty and 'contributor_name' in contributions_df.columns:
         unique_contributors = contributions_df['contributor_name'].nunique()
         anonymous_count = contributions_df['contributor_name'].isna().sum()
         if anonymous_count > 0:
@@ -35,10 +89,10 @@ with col3:
         st.metric(label="Active Contributors", value=0)
 
 with col4:
-    total_with_location = 0
-    if not temples_df.empty and all(c in temples_df.columns for c in ['latitude', 'longitude']):
+    total_with_location = overview['located'] if use_analytics else 0
+    if not use_analytics and not temples_df.empty and all(c in temples_df.columns for c in ['latitude', 'longitude']):
         total_with_location += len(temples_df.dropna(subset=['latitude', 'longitude']))
-    if not contributions_df.empty and all(c in contributions_df.columns for c in ['latitude', 'longitude']):
+    if not use_analytics and not contributions_df.empty and all(c in contributions_df.columns for c in ['latitude', 'longitude']):
         total_with_location += len(contributions_df.dropna(subset=['latitude', 'longitude']))
     st.metric(label="Items with Location", value=total_with_location)
 
@@ -46,12 +100,13 @@ with col4:
 st.markdown("---")
 st.subheader("📋 Content Analysis")
 
-if not contributions_df.empty:
+if not contribution_breakdown.empty:
     col1, col2 = st.columns(2)
     with col1:
-        if 'content_type' in contributions_df.columns:
+        content_type_counts = (contribution_breakdown.dropna(subset=['content_type'])
+                               .groupby('content_type')['count'].sum().sort_values(ascending=False))
+        if not content_type_counts.empty:
             st.markdown("#### Content Type Distribution")
-            content_type_counts = contributions_df['content_type'].value_counts()
             fig_pie = px.pie(values=content_type_counts.values, names=content_type_counts.index,
                              title="Distribution of Content Types")
             st.plotly_chart(fig_pie, use_container_width=True)
@@ -59,9 +114,11 @@ if not contributions_df.empty:
             st.info("No content type data available.")
 
     with col2:
-        if 'contributor_name' in contributions_df.columns:
+        contributor_counts = (contribution_breakdown['count']
+                              .groupby(contribution_breakdown['contributor_name'].fillna('Anonymous')).sum()
+                              .sort_values(ascending=False).head(10))
+        if not contributor_counts.empty:
             st.markdown("#### Contributor Activity")
-            contributor_counts = contributions_df['contributor_name'].fillna('Anonymous').value_counts().head(10)
             fig_bar = px.bar(x=contributor_counts.values, y=contributor_counts.index, orientation='h',
                              title="Top 10 Contributors",
                              labels={'x': 'Number of Contributions', 'y': 'Contributor'})
@@ -76,12 +133,26 @@ else:
 st.markdown("---")
 st.subheader("🏛️ Temple Analysis")
 
-if not temples_df.empty:
+if use_analytics:
+    style_df = analytics.get_style_counts()
+    style_counts = (style_df.set_index('architectural_style')['count'] if not style_df.empty
+                    else pd.Series(dtype='int64'))
+    century_df = analytics.get_century_counts()
+    century_counts = century_df.set_index('century')['count'] if not century_df.empty else pd.Series(dtype='int64')
+    has_temples = overview['temples'] > 0
+else:
+    style_counts = century_counts = None
+    has_temples = not temples_df.empty
+
+if has_temples:
     col1, col2 = st.columns(2)
     with col1:
         st.markdown("#### Architectural Styles")
-        if 'architectural_style' in temples_df.columns:
-            style_counts = temples_df['architectural_style'].dropna().value_counts()
+        if use_analytics or 'architectural_style' in temples_df.columns:
+            if style_counts is None:
+                # Categorical value_counts also lists styles with no temples
+                style_counts = temples_df['architectural_style'].value_counts()
+                style_counts = style_counts[style_counts > 0]
             if not style_counts.empty:
                 fig_arch = px.bar(x=style_counts.index, y=style_counts.values,
                                   title="Temples by Architectural Style",
@@ -95,12 +166,12 @@ if not temples_df.empty:
 
     with col2:
         st.markdown("#### Historical Distribution")
-        if 'built_year' in temples_df.columns:
-            temples_with_year = temples_df.dropna(subset=['built_year'])
-            if not temples_with_year.empty:
-                temples_with_year = temples_with_year.copy()
+        if use_analytics or 'built_year' in temples_df.columns:
+            if century_counts is None:
+                temples_with_year = temples_df.dropna(subset=['built_year']).copy()
                 temples_with_year['century'] = ((temples_with_year['built_year'] - 1) // 100 + 1).astype(int)
                 century_counts = temples_with_year['century'].value_counts().sort_index()
+            if not century_counts.empty:
                 fig_hist = px.bar(x=[f"{c}th Century" for c in century_counts.index],
                                   y=century_counts.values,
                                   title="Temples by Century Built",
@@ -117,16 +188,12 @@ else:
 st.markdown("---")
 st.subheader("📅 Activity Timeline")
 
-if not contributions_df.empty and 'created_at' in contributions_df.columns:
-    contributions_df['created_at'] = pd.to_datetime(contributions_df['created_at'], errors='coerce')
-    contributions_df['date'] = contributions_df['created_at'].dt.date
-    daily_counts = contributions_df.groupby('date').size().reset_index(name='count')
-    fig_timeline = px.line(daily_counts, x='date', y='count', title="Daily Contribution Activity",
-                           labels={'date': 'Date', 'count': 'Number of Contributions'})
+if not daily_totals.empty:
+    fig_timeline = px.line(daily_totals, x='day', y='count', title="Daily Contribution Activity",
+                           labels={'day': 'Date', 'count': 'Number of Contributions'})
     st.plotly_chart(fig_timeline, use_container_width=True)
 
-    contributions_df['month_year'] = contributions_df['created_at'].dt.to_period('M')
-    monthly_counts = contributions_df.groupby('month_year').size()
+    monthly_counts = daily_totals.groupby(daily_totals['day'].dt.to_period('M'))['count'].sum()
     if len(monthly_counts) > 1:
         st.markdown("#### Monthly Activity Summary")
         col1, col2, col3 = st.columns(3)
@@ -147,44 +214,25 @@ else:
 st.markdown("---")
 st.subheader("🌍 Geographic Distribution")
 
-location_data = []
-
-if not temples_df.empty and all(c in temples_df.columns for c in ['latitude', 'longitude']):
-    temples_with_coords = temples_df.dropna(subset=['latitude', 'longitude'])
-    for _, temple in temples_with_coords.iterrows():
-        location_data.append({
-            'latitude': temple['latitude'],
-            'longitude': temple['longitude'],
-            'type': 'Temple',
-            'name': temple.get('name', 'Unknown')
-        })
-
-if not contributions_df.empty and all(c in contributions_df.columns for c in ['latitude', 'longitude']):
-    contributions_with_coords = contributions_df.dropna(subset=['latitude', 'longitude'])
-    for _, contrib in contributions_with_coords.iterrows():
-        location_data.append({
-            'latitude': contrib['latitude'],
-            'longitude': contrib['longitude'],
-            'type': 'Contribution',
-            'name': contrib.get('title', 'Untitled')
-        })
-
-if location_data:
-    location_df = pd.DataFrame(location_data)
+geo_summary = data['geo_summary']
+
+if not geo_summary.empty:
+    geo_summary['type'] = geo_summary['layer'].map({'temples': 'Temple', 'content_contributions': 'Contribution'})
+    counts = geo_summary['count'].astype(float)
     col1, col2 = st.columns(2)
     with col1:
-        st.metric("Items with Coordinates", len(location_df))
-        type_counts = location_df['type'].value_counts()
-        fig_geo_types = px.pie(values=type_counts.values, names=type_counts.index,
+        st.metric("Items with Coordinates", int(counts.sum()))
+        fig_geo_types = px.pie(values=counts, names=geo_summary['type'],
                                title="Geographic Data by Type")
         st.plotly_chart(fig_geo_types, use_container_width=True)
     with col2:
-        lat_range = location_df['latitude'].max() - location_df['latitude'].min()
-        lon_range = location_df['longitude'].max() - location_df['longitude'].min()
+        # Spread of the finest grid cells' centroids, within a few km of the point extent
+        lat_range = geo_summary['max_latitude'].max() - geo_summary['min_latitude'].min()
+        lon_range = geo_summary['max_longitude'].max() - geo_summary['min_longitude'].min()
         st.metric("Latitude Spread", f"{lat_range:.4f}°")
         st.metric("Longitude Spread", f"{lon_range:.4f}°")
-        center_lat = location_df['latitude'].mean()
-        center_lon = location_df['longitude'].mean()
+        center_lat = (geo_summary['center_latitude'] * counts).sum() / counts.sum()
+        center_lon = (geo_summary['center_longitude'] * counts).sum() / counts.sum()
         st.write(f"**Geographic Center:**")
         st.write(f"Lat: {center_lat:.4f}°, Lon: {center_lon:.4f}°")
 else:
@@ -198,12 +246,12 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.markdown("#### Data Quality Metrics")
-    temple_completeness = {}
-    if not temples_df.empty:
+    temple_completeness = analytics.get_temple_completeness() if use_analytics else {}
+    if not use_analytics and not temples_df.empty:
         if 'name' in temples_df.columns:
             temple_completeness['Name'] = (temples_df['name'].notna().sum() / len(temples_df)) * 100
-        if 'location_address' in temples_df.columns:
-            temple_completeness['Location'] = (temples_df['location_address'].notna().sum() / len(temples_df)) * 100
+        if 'location' in temples_df.columns:
+            temple_completeness['Location'] = (temples_df['location'].notna().sum() / len(temples_df)) * 100
         if all(c in temples_df.columns for c in ['latitude', 'longitude']):
             temple_completeness['Coordinates'] = (temples_df[['latitude', 'longitude']].notna().all(axis=1).sum() / len(temples_df)) * 100
         if 'deity' in temples_df.columns:
@@ -221,17 +269,16 @@ with col1:
 
 with col2:
     st.markdown("#### Platform Growth")
-    if not contributions_df.empty and 'created_at' in contributions_df.columns:
-        contributions_df_sorted = contributions_df.sort_values('created_at')
-        contributions_df_sorted['cumulative'] = range(1, len(contributions_df_sorted) + 1)
-        fig_growth = px.line(contributions_df_sorted, x='created_at', y='cumulative',
+    if not daily_totals.empty:
+        fig_growth = px.line(daily_totals, x='day', y='running_total',
                              title="Cumulative Contributions Over Time",
-                             labels={'created_at': 'Date', 'cumulative': 'Total Contributions'})
+                             labels={'day': 'Date', 'running_total': 'Total Contributions'})
         st.plotly_chart(fig_growth, use_container_width=True)
-        if len(contributions_df) > 1:
-            days_active = (contributions_df['created_at'].max() - contributions_df['created_at'].min()).days
+        total_contributions = int(daily_totals['running_total'].iloc[-1])
+        if total_contributions > 1:
+            days_active = (daily_totals['day'].iloc[-1] - daily_totals['day'].iloc[0]).days
             if days_active > 0:
-                daily_rate = len(contributions_df) / days_active
+                daily_rate = total_contributions / days_active
                 st.metric("Daily Growth Rate", f"{daily_rate:.2f} contributions/day")
             else:
                 st.metric("Daily Growth Rate", "N/A (single day)")
@@ -241,26 +288,36 @@ with col2:
 # Export data option
 st.markdown("---")
 st.subheader("📥 Data Export")
+st.markdown("Exports are built from the live database when requested.")
+compress_exports = st.checkbox("Gzip-compress exports", value=False)
 
-col1, col2, col3 = st.columns(3)
-with col1:
-    if not temples_df.empty:
-        csv_temples = temples_df.to_csv(index=False)
-        st.download_button(label="Download Temple Data (CSV)", data=csv_temples,
-                           file_name=f"temple_data_{datetime.now().strftime('%Y%m%d')}.csv",
-                           mime="text/csv")
-with col2:
-    if not contributions_df.empty:
-        csv_contributions = contributions_df.to_csv(index=False)
-        st.download_button(label="Download Contributions (CSV)", data=csv_contributions,
-                           file_name=f"contributions_{datetime.now().strftime('%Y%m%d')}.csv",
-                           mime="text/csv")
-with col3:
-    if location_data:
-        csv_locations = pd.DataFrame(location_data).to_csv(index=False)
-        st.download_button(label="Download Location Data (CSV)", data=csv_locations,
-                           file_name=f"locations_{datetime.now().strftime('%Y%m%d')}.csv",
-                           mime="text/csv")
+exports = [("temples", "Temple Data"), ("contributions", "Contributions"), ("locations", "Location Data")]
+for column, (name, label) in zip(st.columns(3), exports):
+    with column:
+        export_key = f"export_{name}_{'gz' if compress_exports else 'csv'}"
+        prepared = None
+        if st.button(f"Prepare {label} (CSV)", key=f"prepare_{export_key}"):
+            with st.spinner(f"Exporting {label.lower()}..."):
+                prepared = prepare_export(name, compress_exports)
+            if prepared and 'url' in prepared:
+                # Only the link is remembered, so it survives later reruns
+                st.session_state[export_key] = prepared
+        prepared = prepared or st.session_state.get(export_key)
+        if prepared and 'url' in prepared and prepared['expires_at'] <= datetime.now(timezone.utc):
+            # The signed link has expired; prepare the export again
+            st.session_state.pop(export_key, None)
+            prepared = None
+        if prepared and 'url' in prepared:
+            st.link_button(f"Download {prepared['file_name']}", prepared['url'])
+        elif prepared:
+            # Shown for this run only; downloading does not rerun the page, and the
+            # bytes are released on the next rerun instead of staying in the session
+            st.download_button(label=f"Download {prepared['file_name']}", data=prepared['data'],
+                               file_name=prepared['file_name'],
+                               mime="application/gzip" if compress_exports else "text/csv",
+                               key=f"download_{export_key}", on_click="ignore")
+
+render_diagnostics(load_timings)
 
 # Navigation
 st.markdown("---")
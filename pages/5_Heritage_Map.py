@@ -3,7 +3,16 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-from database import get_all_temples, get_all_contributions
+from database import get_all_temples, get_all_contributions, get_density_cells, DENSITY_LAYERS
+from utils.data_loader import load_parallel
+from utils.diagnostics import render_diagnostics
+from utils.geo_grid import GRID_ZOOMS
+from utils.map_rendering import GeoJsonTileLayer
+from utils.storage_backend import get_storage_backend
+from utils.tile_builder import POINT_TILE_ZOOM, tile_url_template
+import folium
+from folium.plugins import HeatMap
+from streamlit_folium import st_folium
 
 # Streamlit page setup
 st.set_page_config(page_title="Heritage Statistics", page_icon="📈", layout="wide")
@@ -11,9 +20,61 @@ st.set_page_config(page_title="Heritage Statistics", page_icon="📈", layout="w
 st.title("📈 Heritage Statistics")
 st.markdown("Analytics and insights about temple heritage documentation activity")
 
+# Density heatmap, rendered from the precomputed grid instead of individual points
+st.subheader("🔥 Heritage Density")
+col1, col2, col3 = st.columns(3)
+with col1:
+    layer_labels = {"temples": "Temples", "content_contributions": "Contributions"}
+    density_layer = st.selectbox("Layer", DENSITY_LAYERS, format_func=layer_labels.get)
+with col2:
+    grid_zoom = st.select_slider("Grid detail", options=list(GRID_ZOOMS), value=6)
+with col3:
+    show_tiles = st.checkbox("Show sites from map tiles", value=True,
+                             help="Markers load straight from pre-generated tiles as you pan and zoom")
+
+# Popup layout for the markers in each tile layer
+TILE_POPUPS = {
+    "temples": dict(title_field='name', tooltip_field='name', count_label='temples', popup_fields=[
+        ('Deity', 'deity', 'Not specified'),
+        ('Style', 'architectural_style', 'Not specified'),
+        ('Built', 'built_year', 'Unknown'),
+        ('Contributor', 'contributor_name', 'Anonymous')
+    ]),
+    "content_contributions": dict(title_field='title', tooltip_field='title', count_label='contributions',
+                                  icon_color='blue', icon='info-sign', color='#2c7fb8', popup_fields=[
+        ('Type', 'content_type', 'Unknown'),
+        ('Contributor', 'contributor_name', 'Anonymous')
+    ])
+}
+
+# The heatmap cells (a few thousand rows at most, cached per data version) and the
+# chart data below are fetched together
+data, load_timings = load_parallel({
+    'cells': lambda: get_density_cells(grid_zoom, layer=density_layer),
+    'temples': get_all_temples,
+    'contributions': get_all_contributions
+})
+cells = data['cells']
+if cells.empty:
+    st.info("No located items to show on the density map yet.")
+else:
+    heat_data = [[float(lat), float(lon), float(count)]
+                 for lat, lon, count in zip(cells['latitude'], cells['longitude'], cells['count'])]
+    weights = cells['count'].astype(float)
+    center = [(cells['latitude'] * weights).sum() / weights.sum(),
+              (cells['longitude'] * weights).sum() / weights.sum()]
+    m = folium.Map(location=center, zoom_start=4)
+    HeatMap(heat_data, radius=18, blur=15, max_zoom=grid_zoom).add_to(m)
+    backend = get_storage_backend()
+    if show_tiles and backend is not None:
+        GeoJsonTileLayer(tile_url_template(backend, density_layer), GRID_ZOOMS, POINT_TILE_ZOOM,
+                         **TILE_POPUPS[density_layer]).add_to(m)
+    st_folium(m, width=700, height=500, returned_objects=[])
+    st.caption(f"{int(cells['count'].sum())} items in {len(cells)} grid cells")
+
 # Load data
-temples = get_all_temples()
-contributions = get_all_contributions()
+temples = data['temples']
+contributions = data['contributions']
 
 # Convert to DataFrame
 df_temples = pd.DataFrame(temples)
@@ -91,3 +152,5 @@ if not df_contribs.empty and not df_temples.empty:
     st.plotly_chart(fig_leaderboard, use_container_width=True)
 else:
     st.info("No contribution data available for temple leaderboard.")
+
+render_diagnostics(load_timings)
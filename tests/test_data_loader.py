@@ -0,0 +1,29 @@
+import threading
+from types import SimpleNamespace
+
+import utils.data_loader as data_loader
+
+def test_context_is_detached_from_the_thread_after_each_task():
+    ctx = SimpleNamespace(pages_manager=SimpleNamespace(main_script_hash="main"))
+    seen = []
+
+    def loader():
+        seen.append(getattr(threading.current_thread(), data_loader._SCRIPT_RUN_CTX_ATTR, None))
+        return 1
+
+    def run():
+        assert data_loader._timed(loader, ctx)[0] == 1
+        # A later task without a context must not inherit the previous one
+        data_loader._timed(loader, None)
+
+    worker = threading.Thread(target=run)
+    worker.start()
+    worker.join()
+    assert seen == [ctx, None]
+
+def test_timings_are_returned_per_loader_and_recorded(monkeypatch):
+    monkeypatch.setattr(data_loader, "_metrics", {})
+    results, timings = data_loader.load_parallel({'a': lambda: 1, 'b': lambda: 2})
+    assert results == {'a': 1, 'b': 2}
+    assert set(timings) == {'a', 'b', 'total'}
+    assert data_loader.get_load_metrics()['a']['calls'] == 1
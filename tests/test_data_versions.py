@@ -0,0 +1,45 @@
+import pytest
+
+import utils.change_feed as change_feed
+import utils.data_versions as data_versions
+
+@pytest.fixture(autouse=True)
+def isolated_state(monkeypatch):
+    monkeypatch.setattr(change_feed, "start_change_feed", lambda: None)
+    monkeypatch.setattr(data_versions, "_versions", {})
+    monkeypatch.setattr(data_versions, "_checked_at", None)
+    monkeypatch.setattr(data_versions, "_failed_at", None)
+    monkeypatch.setattr(data_versions, "_feed_active", False)
+    monkeypatch.setattr(data_versions, "VERSION_CHECK_INTERVAL", 0.0)
+
+def _fetch_returning(monkeypatch, *answers):
+    answers = list(answers)
+
+    def fetch():
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    monkeypatch.setattr(data_versions, "_fetch_versions", fetch)
+    return answers
+
+def test_failed_fetch_keeps_previous_versions_and_is_not_fresh(monkeypatch):
+    remaining = _fetch_returning(monkeypatch, {'temples': 5}, RuntimeError("timeout"), {'temples': 6})
+    monkeypatch.setattr(data_versions, "_feed_active", True)
+
+    assert data_versions.get_data_versions() == {'temples': 5}
+    data_versions.expire_data_versions()
+    assert data_versions.get_data_versions() == {'temples': 5}
+    assert data_versions._checked_at is None
+    # With the feed connected a fresh answer would be trusted indefinitely; a failure must retry
+    assert data_versions.get_data_versions() == {'temples': 6}
+    assert remaining == []
+
+def test_failures_back_off_before_retrying(monkeypatch):
+    remaining = _fetch_returning(monkeypatch, RuntimeError("down"), {'temples': 1})
+    monkeypatch.setattr(data_versions, "VERSION_CHECK_INTERVAL", 60.0)
+
+    assert data_versions.get_data_versions() == {}
+    assert data_versions.get_data_versions() == {}
+    assert remaining == [{'temples': 1}]
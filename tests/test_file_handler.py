@@ -0,0 +1,45 @@
+import struct
+from io import BytesIO
+
+import utils.file_handler as file_handler
+from utils.file_handler import sniff_file_format, validate_file, get_upload_mime_type
+
+class Upload(BytesIO):
+    def __init__(self, name: str, data: bytes):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+        self.type = None
+
+def _ftyp(major: bytes, *compatible: bytes) -> bytes:
+    body = major + b'\x00\x00\x02\x00' + b''.join(compatible)
+    return struct.pack('>I', 8 + len(body)) + b'ftyp' + body + b'\x00\x00\x00\x08free'
+
+def test_m4a_brands_are_audio():
+    assert sniff_file_format(_ftyp(b'M4A ', b'M4A ', b'mp42', b'isom')) == 'mp4_audio'
+    assert sniff_file_format(_ftyp(b'mp42', b'isom', b'M4A ')) == 'mp4_audio'
+
+def test_generic_mp4_video_is_rejected():
+    assert sniff_file_format(_ftyp(b'isom', b'isom', b'iso2', b'avc1', b'mp41')) is None
+    assert sniff_file_format(_ftyp(b'mp42', b'mp42', b'isom')) is None
+
+def test_bmp_needs_a_dib_header():
+    bmp = b'BM' + struct.pack('<IHHI', 70, 0, 0, 54) + struct.pack('<I', 40) + b'\x00' * 36
+    assert sniff_file_format(bmp) == 'bmp'
+    assert sniff_file_format(b'BMI readings for the temple volunteers\n') == 'text'
+
+def test_mp3_renamed_to_flac_is_rejected(monkeypatch):
+    monkeypatch.setattr(file_handler.st, "error", lambda message: None)
+    mp3 = b'ID3\x04\x00\x00\x00\x00\x00\x00' + b'\x00' * 64
+    assert validate_file(Upload("chant.flac", mp3), "Audio Recording") is None
+    assert validate_file(Upload("chant.mp3", mp3), "Audio Recording") == 'mpeg_audio'
+    assert validate_file(Upload("chant.flac", b'fLaC' + b'\x00' * 64), "Audio Recording") == 'flac'
+
+def test_validated_format_is_reused_for_the_mime_type(monkeypatch):
+    upload = Upload("chant.flac", b'fLaC' + b'\x00' * 64)
+    reads = []
+    real_read = file_handler.read_file_header
+    monkeypatch.setattr(file_handler, "read_file_header", lambda f, *args: reads.append(f) or real_read(f, *args))
+    file_format = validate_file(upload, "Audio Recording")
+    assert get_upload_mime_type(upload, file_format) == 'audio/flac'
+    assert len(reads) == 1
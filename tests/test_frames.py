@@ -0,0 +1,27 @@
+import pandas as pd
+
+from utils.frames import TABLE_SCHEMAS, frame_from_result
+from utils.map_rendering import build_feature_collection
+
+class FakeResult:
+    def __init__(self, columns, rows):
+        self.columns = columns
+        self.rows = list(rows)
+
+    def keys(self):
+        return self.columns
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+def test_missing_built_year_keeps_the_column_integer():
+    result = FakeResult(["name", "built_year", "latitude", "longitude"],
+                        [("Old Temple", 1850, 12.9, 77.5), ("New Temple", None, 13.0, 77.6)])
+    frame = frame_from_result(result, TABLE_SCHEMAS["temples"])
+    assert str(frame["built_year"].dtype) == "Int32"
+    assert frame["built_year"].iloc[0] == 1850
+    assert pd.isna(frame["built_year"].iloc[1])
+
+    features = build_feature_collection(frame, properties=["name", "built_year"])["features"]
+    assert [feature["properties"]["built_year"] for feature in features] == [1850, None]
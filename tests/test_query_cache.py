@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import utils.query_cache as query_cache
+from utils.query_cache import QueryCache, cached_query
+
+@pytest.fixture(autouse=True)
+def fixed_versions(monkeypatch):
+    versions = {'value': (1,)}
+    monkeypatch.setattr(query_cache, "versions_for", lambda tables: versions['value'])
+    monkeypatch.setattr(query_cache, "get_shared_cache", lambda: None)
+    return versions
+
+def test_concurrent_misses_share_one_load():
+    cache = QueryCache("single_flight", ttl=60, max_stale=0)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def loader(versions):
+        calls.append(versions)
+        started.set()
+        release.wait(5)
+        return "rows"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("key", loader))) for _ in range(5)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    while cache.snapshot()['coalesced'] < 4:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [(1,)]
+    assert results == ["rows"] * 5
+    assert cache.snapshot()['misses'] == 1
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    cache = QueryCache("stale_while_revalidate", ttl=0.05, max_stale=60)
+    refreshed = threading.Event()
+    values = iter(["old", "new"])
+
+    def loader(versions):
+        value = next(values)
+        if value == "new":
+            refreshed.set()
+        return value
+
+    assert cache.get("key", loader) == "old"
+    time.sleep(0.1)
+    assert cache.get("key", loader) == "old"
+    assert refreshed.wait(5)
+    for _ in range(100):
+        if cache.get("key", loader) == "new":
+            break
+        time.sleep(0.01)
+    assert cache.get("key", loader) == "new"
+    assert cache.snapshot()['background_refreshes'] == 1
+
+def test_invalidate_discards_loads_that_started_earlier():
+    cache = QueryCache("generation", ttl=60, max_stale=0)
+    loading = threading.Event()
+    release = threading.Event()
+
+    def slow_loader(versions):
+        loading.set()
+        release.wait(5)
+        return "before invalidation"
+
+    thread = threading.Thread(target=cache.get, args=("key", slow_loader))
+    thread.start()
+    loading.wait(5)
+    cache.invalidate()
+    release.set()
+    thread.join(5)
+
+    assert cache.snapshot()['entries'] == 0
+    assert cache.get("key", lambda versions: "after invalidation") == "after invalidation"
+
+def test_changed_data_version_reloads(fixed_versions):
+    cache = QueryCache("versions", ttl=60, max_stale=60)
+    assert cache.get("key", lambda versions: versions) == (1,)
+    fixed_versions['value'] = (2,)
+    assert cache.get("key", lambda versions: versions) == (2,)
+    assert cache.snapshot()['version_misses'] == 1
+
+def test_failed_load_returns_fallback_without_caching_it():
+    attempts = []
+
+    @cached_query(tables=("temples",))
+    def flaky_query():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("connection reset")
+        return pd.DataFrame({'id': [1]})
+
+    assert flaky_query().empty
+    assert len(flaky_query()) == 1
+    assert len(attempts) == 2
+    assert flaky_query.cache.snapshot()['errors'] == 1
@@ -0,0 +1,27 @@
+import pandas as pd
+
+import utils.rendering as rendering
+
+def _rendered(monkeypatch, render, frame):
+    calls = []
+    monkeypatch.setattr(rendering.st, "markdown", lambda body, **kwargs: calls.append(body))
+    render(frame)
+    assert len(calls) == 1
+    return calls[0]
+
+def test_multi_paragraph_text_stays_inside_the_html_block(monkeypatch):
+    frame = pd.DataFrame([{
+        'title': "Temple\n\nfestival",
+        'description': "First paragraph.\n\nSecond paragraph <b>bold</b>.\r\n\r\nThird.",
+        'content_type': "story",
+        'contributor_name': None,
+        'created_at': pd.Timestamp("2025-01-02")
+    }])
+    body = _rendered(monkeypatch, rendering.render_contribution_list, frame)
+    assert "\n\n" not in body.split("</style>", 1)[1]
+    assert "Temple festival" in body
+    assert "First paragraph. Second paragraph &lt;b&gt;bold&lt;/b&gt;. Third." in body
+    assert "Anonymous" in body
+
+    body = _rendered(monkeypatch, rendering.render_recent_activity, frame)
+    assert "\n" not in body.split("</style>", 1)[1].strip()
@@ -0,0 +1,57 @@
+import pytest
+
+import utils.replicas as replicas
+
+class FakeRouter:
+    def __init__(self):
+        self.requests = []
+
+    def choose(self, required=None):
+        self.requests.append(required)
+        return "replica"
+
+class FakeConnection:
+    def __init__(self, version):
+        self.version = version
+
+    def execute(self, query, params):
+        return self
+
+    def scalar(self):
+        return self.version
+
+@pytest.fixture
+def router(monkeypatch):
+    router = FakeRouter()
+    monkeypatch.setattr(replicas, "get_replica_router", lambda: router)
+    return router
+
+def _session(monkeypatch, state):
+    monkeypatch.setattr(replicas, "_session_state", lambda: state)
+
+def test_writing_session_needs_a_replica_with_its_write(monkeypatch, router):
+    state = {}
+    _session(monkeypatch, state)
+    replicas.remember_write(FakeConnection(7), "temples")
+    replicas.remember_write(FakeConnection(5), "temples")
+    assert replicas.get_read_client() == "replica"
+    assert router.requests == [{'temples': 7}]
+
+def test_other_sessions_are_not_pinned_by_a_write(monkeypatch, router):
+    _session(monkeypatch, {})
+    replicas.remember_write(FakeConnection(7), "temples")
+    _session(monkeypatch, {})
+    replicas.get_read_client()
+    assert router.requests == [None]
+
+def test_cached_reads_combine_their_versions_with_the_session_writes(monkeypatch, router):
+    _session(monkeypatch, {replicas.SESSION_WRITES_KEY: {'temples': 7}})
+    with replicas.read_at_least(("temples", "content_contributions"), (9, 3)):
+        replicas.get_read_client()
+    assert router.requests == [{'temples': 9, 'content_contributions': 3}]
+
+def test_writes_outside_a_session_are_not_remembered(monkeypatch, router):
+    _session(monkeypatch, None)
+    replicas.remember_write(FakeConnection(7), "temples")
+    replicas.get_read_client()
+    assert router.requests == [None]
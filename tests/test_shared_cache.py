@@ -0,0 +1,28 @@
+import pandas as pd
+import pytest
+
+from utils.shared_cache import SharedCache, SharedCacheBackend, SQLiteCacheBackend
+
+def test_incomplete_backend_fails_at_construction():
+    class ReadOnly(SharedCacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        ReadOnly()
+
+def test_frames_are_shared_per_data_version(tmp_path):
+    shared = SharedCache(SQLiteCacheBackend(str(tmp_path / "cache.db")))
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return pd.DataFrame({'name': ["Brihadeeswarar"]})
+
+    first = shared.load("get_all_temples", (3,), ((), ()), loader, ttl=60)
+    again = shared.load("get_all_temples", (3,), ((), ()), loader, ttl=60)
+    changed = shared.load("get_all_temples", (4,), ((), ()), loader, ttl=60)
+
+    assert len(calls) == 2
+    pd.testing.assert_frame_equal(first, again)
+    pd.testing.assert_frame_equal(first, changed)
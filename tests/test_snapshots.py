@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+import utils.snapshots as snapshots
+from utils.frames import TABLE_SCHEMAS, apply_schema
+from utils.shared_cache import SharedCache, SQLiteCacheBackend
+
+def _temples():
+    frame = pd.DataFrame({
+        'id': ["b", "a"],
+        'name': ["Brihadeeswarar", "Meenakshi"],
+        'deity': ["Shiva", None],
+        'built_year': [1010, None],
+        'created_at': pd.to_datetime(["2025-01-02", "2025-01-01"], utc=True)
+    })
+    return apply_schema(frame, TABLE_SCHEMAS["temples"])
+
+@pytest.fixture
+def versions(monkeypatch):
+    versions = {'temples': 3}
+    monkeypatch.setattr(snapshots, "get_data_version", lambda table: versions[table])
+    return versions
+
+def _snapshot(monkeypatch, queries):
+    snapshot = snapshots.TableSnapshot("temples")
+
+    def query_full():
+        queries.append(1)
+        return _temples()
+
+    monkeypatch.setattr(snapshot, "_query_full", query_full)
+    return snapshot
+
+def test_full_loads_are_shared_between_processes_per_data_version(monkeypatch, tmp_path, versions):
+    shared = SharedCache(SQLiteCacheBackend(str(tmp_path / "cache.db")))
+    monkeypatch.setattr(snapshots, "get_shared_cache", lambda: shared)
+    queries = []
+
+    first = _snapshot(monkeypatch, queries).frame()
+    second = _snapshot(monkeypatch, queries).frame()
+    assert len(queries) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+    versions['temples'] = 4
+    _snapshot(monkeypatch, queries).frame()
+    assert len(queries) == 2
+
+def test_mutating_a_returned_frame_leaves_the_snapshot_unchanged(monkeypatch, versions):
+    monkeypatch.setattr(snapshots, "get_shared_cache", lambda: None)
+    snapshot = _snapshot(monkeypatch, [])
+
+    frame = snapshot.frame()
+    frame.loc[0, 'name'] = "Changed"
+    frame.loc[1, 'built_year'] = 1600
+    frame['deity'] = frame['deity'].cat.add_categories(["Unknown"])
+    frame.fillna({'deity': "Unknown"}, inplace=True)
+    frame.iloc[0, 0] = "z"
+
+    pd.testing.assert_frame_equal(snapshot.frame(), _temples())
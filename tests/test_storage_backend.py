@@ -0,0 +1,55 @@
+import pytest
+
+import utils.storage_backend as storage_backend
+from utils.storage_backend import LocalStorageBackend, StorageBackend, get_export_backend
+
+def test_incomplete_backend_fails_at_construction():
+    class NoListing(StorageBackend):
+        def upload(self, data, path, content_type, overwrite=False):
+            return path
+
+    with pytest.raises(TypeError):
+        NoListing()
+
+def test_local_info_and_listing_report_the_same_created_at(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path), "http://localhost/files")
+    url = backend.upload(b"gopuram", "photo_image/gopuram.jpg", "image/jpeg")
+
+    listed = list(backend.list_objects("photo_image/"))
+    assert [obj['path'] for obj in listed] == ["photo_image/gopuram.jpg"]
+    assert backend.path_from_url(url) == "photo_image/gopuram.jpg"
+    assert backend.info("photo_image/gopuram.jpg")['created_at'] == listed[0]['created_at'].isoformat()
+
+def test_exports_need_a_private_bucket(monkeypatch):
+    monkeypatch.setattr(storage_backend, "get_supabase_storage_client",
+                        lambda: {'url': "https://project.supabase.co", 'key': "service-key"})
+    monkeypatch.delenv("EXPORTS_BUCKET", raising=False)
+    assert get_export_backend() is None
+
+    monkeypatch.setenv("EXPORTS_BUCKET", storage_backend.DEFAULT_BUCKET)
+    with pytest.raises(ValueError):
+        get_export_backend()
+
+    monkeypatch.setenv("EXPORTS_BUCKET", "heritage-exports")
+    assert get_export_backend().bucket == "heritage-exports"
+
+def test_exports_are_linked_through_signed_urls(monkeypatch):
+    backend = storage_backend.SupabaseStorageBackend("https://project.supabase.co", "service-key", "heritage-exports")
+    requests_made = []
+
+    class Response:
+        status_code = 200
+
+        def json(self):
+            return {'signedURL': "/object/sign/heritage-exports/exports/a/temples.csv?token=abc"}
+
+    def post(url, json=None, headers=None):
+        requests_made.append((url, json))
+        return Response()
+
+    monkeypatch.setattr(backend._session, "post", post)
+    url = backend.signed_url("exports/a/temples.csv", 600)
+    assert url == "https://project.supabase.co/storage/v1/object/sign/heritage-exports/exports/a/temples.csv?token=abc"
+    assert requests_made == [("https://project.supabase.co/storage/v1/object/sign/heritage-exports/exports/a/temples.csv",
+                              {'expiresIn': 600})]
+    assert "/public/" not in url
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta, timezone
+
+import utils.storage_gc as storage_gc
+
+OLD = datetime.now(timezone.utc) - timedelta(days=7)
+
+class PagedBackend:
+    """Lists by offset over name order, like the Supabase storage API"""
+
+    def __init__(self, paths, page_size=2):
+        self.objects = sorted(paths)
+        self.page_size = page_size
+
+    def path_from_url(self, file_url):
+        return file_url
+
+    def list_objects(self, prefix=""):
+        offset = 0
+        while True:
+            page = self.objects[offset:offset + self.page_size]
+            for path in page:
+                yield {'path': path, 'size': 1, 'created_at': OLD}
+            if len(page) < self.page_size:
+                return
+            offset += self.page_size
+
+    def delete_many(self, paths):
+        before = len(self.objects)
+        self.objects = [path for path in self.objects if path not in paths]
+        return before - len(self.objects)
+
+def _run(monkeypatch, backend, referenced, **kwargs):
+    monkeypatch.setattr(storage_gc, "get_storage_backend", lambda: backend)
+    monkeypatch.setattr(storage_gc, "iter_referenced_file_urls", lambda batch_size: iter(referenced))
+    return storage_gc.collect_garbage(**kwargs)
+
+def test_deletes_every_orphan_despite_offset_paging(monkeypatch):
+    orphans = [f"photo_image/orphan_{i}.jpg" for i in range(7)]
+    backend = PagedBackend(orphans + ["photo_image/kept.jpg"])
+
+    summary = _run(monkeypatch, backend, ["photo_image/kept.jpg"], dry_run=False, batch_size=2)
+
+    assert summary['scanned'] == 8
+    assert summary['orphaned'] == 7
+    assert summary['deleted'] == 7
+    assert backend.objects == ["photo_image/kept.jpg"]
+
+def test_dry_run_is_the_default_and_deletes_nothing(monkeypatch):
+    backend = PagedBackend(["photo_image/a.jpg", "tiles/temples/2/1/1.geojson"])
+
+    summary = _run(monkeypatch, backend, [])
+
+    assert summary['dry_run'] is True
+    assert summary['orphans'] == ["photo_image/a.jpg"]
+    assert len(backend.objects) == 2
@@ -0,0 +1,291 @@
+import argparse
+import json
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:  # the statistics page computes everything in pandas without duckdb
+    duckdb = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # exports need pyarrow
+    pa = None
+    pq = None
+
+from utils.frames import STRING_DTYPE, TABLE_SCHEMAS, empty_frame, iter_frames
+from utils.replicas import get_read_client
+from utils.statements import cached_statement, statement
+
+# Parquet exports answer the statistics queries with DuckDB, so dashboards never
+# scan the production tables. Each export is written as a new generation next to
+# the previous one and published by replacing the CURRENT file, so readers never
+# see a half-written export.
+
+ANALYTICS_DIR = os.getenv("ANALYTICS_DIR", "analytics")
+ANALYTICS_TABLES = ("temples", "content_contributions", "historical_events")
+EXPORT_BATCH_SIZE = 50000
+# Older generations are kept briefly for queries that started before a publish
+KEEP_GENERATIONS = 2
+
+_EXPORT_VERSIONS_SQL = statement("analytics_export_versions",
+                                 "SELECT table_name, version FROM data_versions WHERE table_name = ANY(:tables)")
+
+# ----------------------- EXPORT ------------------------
+
+def _current_path(directory: str) -> str:
+    return os.path.join(directory, "CURRENT")
+
+def _generation_dir(directory: str, generation: str) -> str:
+    return os.path.join(directory, "generations", generation)
+
+def _to_arrow(frame: pd.DataFrame):
+    # Categories differ from chunk to chunk; Parquet dictionary-encodes strings anyway
+    frame = frame.copy(deep=False)
+    for column in frame.columns:
+        if isinstance(frame[column].dtype, pd.CategoricalDtype):
+            frame[column] = frame[column].astype(STRING_DTYPE)
+    if 'created_at' in frame.columns:
+        created = pd.to_datetime(frame['created_at'], utc=True, errors="coerce")
+        frame['month'] = created.dt.strftime("%Y-%m").fillna("none")
+    else:
+        frame['month'] = "none"
+    return pa.Table.from_pandas(frame, preserve_index=False)
+
+def _export_table(conn, table: str, target: str, batch_size: int) -> int:
+    """Stream one table into month=YYYY-MM partitions under target; returns rows written"""
+    result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(
+        cached_statement("analytics_export", f"SELECT * FROM {table}")
+    )
+    schema = TABLE_SCHEMAS.get(table, {})
+    rows = 0
+    for batch, frame in enumerate(iter_frames(result, schema, batch_size)):
+        pq.write_to_dataset(_to_arrow(frame), target, partition_cols=['month'],
+                            basename_template=f"part-{batch}-{{i}}.parquet")
+        rows += len(frame)
+    if rows == 0:
+        # Keep the column list so the table's view still resolves
+        partition = os.path.join(target, "month=none")
+        os.makedirs(partition, exist_ok=True)
+        table_data = pa.Table.from_pandas(empty_frame(result.keys(), schema), preserve_index=False)
+        pq.write_table(table_data, os.path.join(partition, "part-0-0.parquet"))
+    return rows
+
+def _prune_generations(directory: str, current: str, keep: int):
+    root = os.path.join(directory, "generations")
+    generations = sorted(name for name in os.listdir(root) if name != current)
+    for name in generations[:max(len(generations) - (keep - 1), 0)]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+def export_tables(directory: str = ANALYTICS_DIR, tables: tuple = ANALYTICS_TABLES,
+                  batch_size: int = EXPORT_BATCH_SIZE, if_changed: bool = False) -> dict:
+    """
+    Export tables to Parquet, partitioned by the month of created_at, and publish them
+    as the current generation. All tables are read in one REPEATABLE READ transaction
+    (from a read replica when configured), streamed batch_size rows at a time.
+    With if_changed, nothing is written while the tables' data versions match the
+    current generation's.
+    Returns: Dictionary with the generation, rows per table and whether it was skipped
+    """
+    if pq is None:
+        raise RuntimeError("pyarrow is required for analytics exports")
+    engine = get_read_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    generation = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    target = _generation_dir(directory, generation)
+    rows = {}
+    try:
+        with engine.connect().execution_options(isolation_level="REPEATABLE READ") as conn:
+            versions = dict(conn.execute(_EXPORT_VERSIONS_SQL, {"tables": list(tables)}).fetchall())
+            current = get_export_manifest(directory)
+            if if_changed and current and current.get('data_versions') == versions \
+                    and set(current.get('rows', {})) == set(tables):
+                return {'generation': current['generation'], 'rows': current['rows'], 'skipped': True}
+            for table in tables:
+                rows[table] = _export_table(conn, table, os.path.join(target, table), batch_size)
+    except Exception:
+        shutil.rmtree(target, ignore_errors=True)
+        raise
+
+    manifest = {
+        'generation': generation,
+        'exported_at': datetime.now(timezone.utc).isoformat(),
+        'rows': rows,
+        'data_versions': versions
+    }
+    with open(os.path.join(target, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+    pending = _current_path(directory) + ".tmp"
+    with open(pending, "w") as f:
+        f.write(generation)
+    os.replace(pending, _current_path(directory))
+    _prune_generations(directory, generation, KEEP_GENERATIONS)
+    return {'generation': generation, 'rows': rows, 'skipped': False}
+
+# ----------------------- QUERIES ------------------------
+
+def current_generation(directory: str = ANALYTICS_DIR):
+    """Name of the published export generation, or None if nothing was exported yet"""
+    try:
+        with open(_current_path(directory)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def get_export_manifest(directory: str = ANALYTICS_DIR):
+    """
+    Manifest of the current generation
+    Returns: Dictionary with generation, exported_at, rows and data_versions, or None
+    """
+    generation = current_generation(directory)
+    if generation is None:
+        return None
+    try:
+        with open(os.path.join(_generation_dir(directory, generation), "manifest.json")) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def analytics_available(directory: str = ANALYTICS_DIR) -> bool:
+    """True if DuckDB is installed and an export has been published"""
+    return duckdb is not None and current_generation(directory) is not None
+
+_local = threading.local()
+
+def _connection(directory: str = ANALYTICS_DIR):
+    """
+    This thread's DuckDB connection with one view per exported table; the views are
+    re-pointed when a newer generation is published
+    """
+    generation = current_generation(directory)
+    if generation is None:
+        raise RuntimeError("No analytics export has been published")
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = duckdb.connect()
+        _local.generation = None
+    if _local.generation != (directory, generation):
+        base = _generation_dir(directory, generation)
+        for table in os.listdir(base):
+            path = os.path.join(base, table)
+            if not os.path.isdir(path):
+                continue
+            pattern = os.path.join(path, "**", "*.parquet").replace("'", "''")
+            conn.execute(f"""
+                CREATE OR REPLACE VIEW {table} AS
+                SELECT * FROM read_parquet('{pattern}', hive_partitioning = true, union_by_name = true)
+            """)
+        _local.generation = (directory, generation)
+    return conn
+
+def _query(sql: str) -> pd.DataFrame:
+    return _connection().execute(sql).df()
+
+def get_platform_overview():
+    """
+    Headline counts for the statistics page from the current export
+    Returns: Dictionary with temples, contributions, contributors and located items, or None if failed
+    """
+    try:
+        row = _query("""
+            SELECT
+                (SELECT COUNT(*) FROM temples) AS temples,
+                (SELECT COUNT(*) FROM content_contributions) AS contributions,
+                -- anonymous contributions count as one contributor
+                (SELECT COUNT(DISTINCT contributor_name) + MAX(CASE WHEN contributor_name IS NULL THEN 1 ELSE 0 END)
+                 FROM content_contributions) AS contributors,
+                (SELECT COUNT(*) FROM temples WHERE latitude IS NOT NULL AND longitude IS NOT NULL)
+                + (SELECT COUNT(*) FROM content_contributions WHERE latitude IS NOT NULL AND longitude IS NOT NULL)
+                    AS located
+        """).iloc[0]
+        return {key: int(value) if pd.notna(value) else 0 for key, value in row.items()}
+    except Exception as e:
+        print(f"Error querying analytics overview: {e}")
+        return None
+
+def get_style_counts() -> pd.DataFrame:
+    """Temples per architectural style, most common first (columns: architectural_style, count)"""
+    try:
+        return _query("""
+            SELECT architectural_style, COUNT(*) AS count
+            FROM temples
+            WHERE architectural_style IS NOT NULL
+            GROUP BY architectural_style
+            ORDER BY count DESC, architectural_style
+        """)
+    except Exception as e:
+        print(f"Error querying analytics style counts: {e}")
+        return pd.DataFrame()
+
+def get_century_counts() -> pd.DataFrame:
+    """Temples per century built, oldest first (columns: century, count)"""
+    try:
+        return _query("""
+            SELECT CAST(floor((built_year - 1) / 100) + 1 AS INTEGER) AS century, COUNT(*) AS count
+            FROM temples
+            WHERE built_year IS NOT NULL
+            GROUP BY century
+            ORDER BY century
+        """)
+    except Exception as e:
+        print(f"Error querying analytics century counts: {e}")
+        return pd.DataFrame()
+
+def get_temple_completeness() -> dict:
+    """
+    Share of temples with each descriptive field filled in
+    Returns: Dictionary of field label to percentage, empty if there are no temples or the query failed
+    """
+    try:
+        row = _query("""
+            SELECT COUNT(*) AS total,
+                   COUNT(name) AS "Name",
+                   COUNT(location) AS "Location",
+                   COUNT(*) FILTER (WHERE latitude IS NOT NULL AND longitude IS NOT NULL) AS "Coordinates",
+                   COUNT(deity) AS "Deity",
+                   COUNT(history) AS "History"
+            FROM temples
+        """).iloc[0]
+    except Exception as e:
+        print(f"Error querying analytics completeness: {e}")
+        return {}
+    total = int(row['total'])
+    if total == 0:
+        return {}
+    return {field: int(row[field]) / total * 100 for field in row.index if field != 'total'}
+
+def main():
+    parser = argparse.ArgumentParser(description="Export heritage tables to Parquet for the statistics page")
+    parser.add_argument("--export", action="store_true", help="Write and publish a new export")
+    parser.add_argument("--if-changed", action="store_true",
+                        help="With --export, skip the export if no table changed since the current one")
+    parser.add_argument("--dir", default=ANALYTICS_DIR, help=f"Export directory (default: {ANALYTICS_DIR})")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE,
+                        help=f"Rows fetched and written per Parquet file (default: {EXPORT_BATCH_SIZE})")
+    args = parser.parse_args()
+
+    if args.export:
+        summary = export_tables(args.dir, batch_size=args.batch_size, if_changed=args.if_changed)
+        if summary['skipped']:
+            print(f"No changes since generation {summary['generation']}; nothing exported")
+        else:
+            counts = ", ".join(f"{table}: {rows}" for table, rows in summary['rows'].items())
+            print(f"Published generation {summary['generation']} ({counts})")
+    else:
+        manifest = get_export_manifest(args.dir)
+        if manifest is None:
+            print("No export published yet; run with --export")
+        else:
+            print(f"Current generation {manifest['generation']}, exported at {manifest['exported_at']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import json
+import os
+import select
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+
+from utils.data_versions import set_change_feed_active
+from utils.query_cache import invalidate_tables
+
+CHANNEL = "heritage_changes"
+POLL_SECONDS = 5.0
+MAX_BACKOFF_SECONDS = 60.0
+
+_subscribers = []
+_subscribers_lock = threading.Lock()
+_feed = None
+_feed_lock = threading.Lock()
+
+def subscribe(callback):
+    """
+    Call callback(event) for every change, where event is a dict with 'table',
+    'op' and 'version' (or 'table': None after a reconnect, when events may have
+    been missed and subscribers should resynchronize everything)
+    """
+    with _subscribers_lock:
+        _subscribers.append(callback)
+
+def _publish(event: dict):
+    with _subscribers_lock:
+        callbacks = list(_subscribers)
+    for callback in callbacks:
+        try:
+            callback(event)
+        except Exception as e:
+            print(f"Error in change feed subscriber: {e}")
+
+class ChangeFeed(threading.Thread):
+    """
+    Background LISTEN on the heritage_changes channel (migrations/009_change_feed.sql).
+    Each notification drops this process's cached results for the changed table; the
+    shared tier needs nothing, since its keys already carry the table's data version.
+    While connected, data-version lookups are trusted until a notification arrives.
+    """
+
+    def __init__(self, database_url: str):
+        super().__init__(name="heritage-change-feed", daemon=True)
+        self.database_url = database_url
+        self.metrics = {'events': 0, 'reconnects': 0, 'errors': 0}
+
+    def _listen(self):
+        conn = psycopg2.connect(self.database_url)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        if self.metrics['reconnects']:
+            # Anything may have changed while we were not listening
+            invalidate_tables()
+            _publish({'table': None, 'op': 'RESYNC', 'version': None})
+        set_change_feed_active(True)
+        return conn
+
+    def _dispatch(self, payload: str):
+        event = json.loads(payload)
+        self.metrics['events'] += 1
+        invalidate_tables(event['table'])
+        _publish(event)
+
+    def run(self):
+        backoff = 1.0
+        while True:
+            conn = None
+            try:
+                conn = self._listen()
+                backoff = 1.0
+                while True:
+                    ready, _, _ = select.select([conn], [], [], POLL_SECONDS)
+                    if not ready:
+                        # Surfaces a dropped connection even when no events arrive
+                        with conn.cursor() as cursor:
+                            cursor.execute("SELECT 1")
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._dispatch(conn.notifies.pop(0).payload)
+            except Exception as e:
+                self.metrics['errors'] += 1
+                print(f"Change feed disconnected: {e}")
+            finally:
+                set_change_feed_active(False)
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            self.metrics['reconnects'] += 1
+            time.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+
+def start_change_feed():
+    """
+    Start this process's change-feed listener once. Disabled with CHANGE_FEED_ENABLED=0
+    or when DATABASE_URL is unset; caches then fall back to polling data versions.
+    Returns: The running ChangeFeed or None
+    """
+    global _feed
+    database_url = os.getenv("DATABASE_URL")
+    if os.getenv("CHANGE_FEED_ENABLED", "1") == "0" or not database_url:
+        return None
+
+    with _feed_lock:
+        if _feed is None:
+            _feed = ChangeFeed(database_url)
+            _feed.start()
+        return _feed
@@ -0,0 +1,52 @@
+import argparse
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from database import COUNTED_TABLES
+from utils.supabase_client import get_supabase_client
+
+def reconcile_counters(tables=COUNTED_TABLES) -> list:
+    """
+    Reset each table_counters row to the table's real COUNT(*).
+    The counter row is locked before counting, so inserts racing with the scan
+    either finish before it (and are counted) or wait and apply their increment after.
+    Returns: List of (table, counter value, actual count) tuples
+    """
+    engine = get_supabase_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    results = []
+    for table_name in tables:
+        if table_name not in COUNTED_TABLES:
+            raise ValueError(f"Unknown counted table: {table_name}")
+        with engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO table_counters (table_name, row_count) VALUES (:table_name, 0)
+                ON CONFLICT (table_name) DO NOTHING
+            """), {"table_name": table_name})
+            counter = conn.execute(text(
+                "SELECT row_count FROM table_counters WHERE table_name = :table_name FOR UPDATE"
+            ), {"table_name": table_name}).scalar()
+            actual = conn.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+            conn.execute(text("""
+                UPDATE table_counters SET row_count = :actual, reconciled_at = :now
+                WHERE table_name = :table_name
+            """), {"actual": actual, "now": datetime.now(timezone.utc), "table_name": table_name})
+        results.append((table_name, counter, actual))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile trigger-maintained row counters with COUNT(*)")
+    parser.add_argument("tables", nargs="*", default=list(COUNTED_TABLES),
+                        help="Tables to reconcile (default: all counted tables)")
+    args = parser.parse_args()
+
+    for table_name, counter, actual in reconcile_counters(args.tables):
+        drift = actual - counter
+        status = "ok" if drift == 0 else f"corrected drift of {drift:+d}"
+        print(f"{table_name}: {actual} rows ({status})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import argparse
+import os
+import tempfile
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
+
+from utils.frames import iter_frames
+from utils.replicas import get_read_client
+from utils.statements import statement
+from utils.storage_backend import EXPORTS_PREFIX, get_export_backend
+
+# Rows fetched from the server-side cursor and formatted per CSV chunk
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "5000"))
+# Published exports older than this are removed by `python -m utils.csv_export --prune`
+EXPORT_RETENTION_HOURS = float(os.getenv("EXPORT_RETENTION_HOURS", "24"))
+# Lifetime of the signed download link handed out for a published export
+EXPORT_LINK_SECONDS = int(os.getenv("EXPORT_LINK_SECONDS", "3600"))
+
+EXPORTS = {
+    "temples": statement("export_temples", "SELECT * FROM temples ORDER BY created_at DESC, id DESC"),
+    "contributions": statement("export_contributions",
+                               "SELECT * FROM content_contributions ORDER BY created_at DESC, id DESC"),
+    "locations": statement("export_locations", """
+        SELECT latitude, longitude, 'Temple' AS type, COALESCE(name, 'Unknown') AS name
+        FROM temples
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+        UNION ALL
+        SELECT latitude, longitude, 'Contribution' AS type, COALESCE(title, 'Untitled') AS name
+        FROM content_contributions
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+    """)
+}
+
+# ----------------------- GENERATORS ------------------------
+
+def iter_csv(query, params: dict = None, chunk_size: int = EXPORT_CHUNK_ROWS):
+    """
+    Yield a query's rows as UTF-8 CSV, header first, chunk_size rows per chunk.
+    Rows come from a server-side cursor, so only one chunk is held at a time.
+    The connection stays open until the generator is exhausted or closed.
+    """
+    engine = get_read_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(query, params or {})
+        header = True
+        for frame in iter_frames(result, chunk_size=chunk_size):
+            yield frame.to_csv(index=False, header=header).encode("utf-8")
+            header = False
+        if header:
+            yield (",".join(result.keys()) + "\n").encode("utf-8")
+
+def gzip_chunks(chunks, level: int = 6):
+    """Gzip-compress a stream of byte chunks without joining them"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def stream_export(name: str, compress: bool = False, chunk_size: int = EXPORT_CHUNK_ROWS):
+    """Byte chunks of the named export (a key of EXPORTS) as CSV, gzipped if compress"""
+    chunks = iter_csv(EXPORTS[name], chunk_size=chunk_size)
+    return gzip_chunks(chunks) if compress else chunks
+
+def write_export(name: str, out, compress: bool = False, chunk_size: int = EXPORT_CHUNK_ROWS) -> int:
+    """
+    Write the named export to a binary file object
+    Returns: Number of bytes written
+    """
+    written = 0
+    for chunk in stream_export(name, compress, chunk_size):
+        out.write(chunk)
+        written += len(chunk)
+    return written
+
+# ----------------------- PUBLISHING ------------------------
+
+def export_file_name(name: str, compress: bool = False) -> str:
+    """Download file name for an export, e.g. temples_20250101.csv.gz"""
+    return f"{name}_{datetime.now().strftime('%Y%m%d')}.csv" + (".gz" if compress else "")
+
+def publish_export(name: str, compress: bool = False) -> dict:
+    """
+    Build the named export in a temporary file and upload it under EXPORTS_PREFIX in
+    the private exports bucket
+    Returns: Dictionary with a signed url, its expires_at (UTC), file_name and size in bytes
+    """
+    backend = get_export_backend()
+    if backend is None:
+        raise RuntimeError("Exports bucket not configured (EXPORTS_BUCKET)")
+    file_name = export_file_name(name, compress)
+    path = f"{EXPORTS_PREFIX}{uuid.uuid4().hex[:12]}/{file_name}"
+    with tempfile.TemporaryFile() as spool:
+        size = write_export(name, spool, compress)
+        spool.seek(0)
+        backend.upload(spool, path, "application/gzip" if compress else "text/csv")
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=EXPORT_LINK_SECONDS)
+    return {'url': backend.signed_url(path, EXPORT_LINK_SECONDS), 'expires_at': expires_at,
+            'file_name': file_name, 'size': size}
+
+def prune_exports(max_age: timedelta = None) -> int:
+    """
+    Delete published exports older than max_age (EXPORT_RETENTION_HOURS by default)
+    Returns: Number of objects deleted
+    """
+    backend = get_export_backend()
+    if backend is None:
+        raise RuntimeError("Exports bucket not configured (EXPORTS_BUCKET)")
+    cutoff = datetime.now(timezone.utc) - (max_age or timedelta(hours=EXPORT_RETENTION_HOURS))
+    expired = [obj['path'] for obj in backend.list_objects(EXPORTS_PREFIX)
+               if obj['created_at'] is not None and obj['created_at'] < cutoff]
+    return backend.delete_many(expired) if expired else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Write heritage CSV exports or prune published ones")
+    parser.add_argument("export", nargs="?", choices=sorted(EXPORTS), help="Export to write")
+    parser.add_argument("--output", help="File to write (default: the dated export file name)")
+    parser.add_argument("--gzip", action="store_true", help="Gzip-compress the output")
+    parser.add_argument("--prune", action="store_true",
+                        help="Delete published exports older than --retention-hours")
+    parser.add_argument("--retention-hours", type=float, default=EXPORT_RETENTION_HOURS,
+                        help=f"Age after which published exports are pruned (default: {EXPORT_RETENTION_HOURS:g})")
+    args = parser.parse_args()
+
+    if args.export:
+        output = args.output or export_file_name(args.export, args.gzip)
+        with open(output, "wb") as out:
+            size = write_export(args.export, out, args.gzip)
+        print(f"Wrote {output} ({size} bytes)")
+    if args.prune:
+        deleted = prune_exports(timedelta(hours=args.retention_hours))
+        print(f"Deleted {deleted} published exports")
+    if not args.export and not args.prune:
+        parser.error("name an export or pass --prune")
+
+if __name__ == "__main__":
+    main()
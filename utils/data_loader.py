@@ -0,0 +1,71 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# Shared by every session, so concurrent page loads never hold more than this many
+# extra database connections between them
+LOADER_WORKERS = int(os.getenv("DATA_LOADER_WORKERS", "8"))
+
+# Thread attribute add_script_run_ctx stores the context in; Streamlit has no public
+# call to detach it again
+_SCRIPT_RUN_CTX_ATTR = "streamlit_script_run_ctx"
+
+_pool = ThreadPoolExecutor(max_workers=LOADER_WORKERS, thread_name_prefix="data-loader")
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+def _timed(loader, ctx):
+    # Loaders may call st.* (connection errors, st.cache_data), which needs the calling
+    # session's context; pool threads are reused, so it is attached for this task only
+    thread = threading.current_thread()
+    if ctx is not None:
+        add_script_run_ctx(thread, ctx)
+    started = time.perf_counter()
+    try:
+        return loader(), time.perf_counter() - started, None
+    except Exception as e:
+        return None, time.perf_counter() - started, e
+    finally:
+        # Otherwise the next task on this thread could render into this session
+        setattr(thread, _SCRIPT_RUN_CTX_ATTR, None)
+
+def _record(name, seconds, failed):
+    with _metrics_lock:
+        stats = _metrics.setdefault(name, {'calls': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+        stats['calls'] += 1
+        stats['errors'] += int(failed)
+        stats['total_seconds'] += seconds
+        stats['max_seconds'] = max(stats['max_seconds'], seconds)
+
+def load_parallel(loaders: dict) -> tuple:
+    """
+    Run independent zero-argument loaders (e.g. database.py reads) at the same time
+    on the shared pool, so a page waits for the slowest instead of the sum.
+    Loaders must not call load_parallel themselves.
+    Returns: (results, timings), both keyed like `loaders`; timings are in seconds.
+    Raises the first loader's exception after all have finished.
+    """
+    started = time.perf_counter()
+    ctx = get_script_run_ctx()
+    futures = {name: _pool.submit(_timed, loader, ctx) for name, loader in loaders.items()}
+
+    results, timings, error = {}, {}, None
+    for name, future in futures.items():
+        value, seconds, exc = future.result()
+        _record(name, seconds, exc is not None)
+        results[name] = value
+        timings[name] = seconds
+        if exc is not None and error is None:
+            error = exc
+    if error is not None:
+        raise error
+    timings['total'] = time.perf_counter() - started
+    return results, timings
+
+def get_load_metrics() -> dict:
+    """Per-loader call counts and timings for this process"""
+    with _metrics_lock:
+        return {name: dict(stats) for name, stats in _metrics.items()}
@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+
+from utils.statements import statement
+from utils.supabase_client import get_supabase_client
+
+# How long a version lookup is reused before asking the database again
+VERSION_CHECK_INTERVAL = float(os.getenv("DATA_VERSION_CHECK_INTERVAL", "1.0"))
+
+_versions = {}
+_checked_at = None
+_failed_at = None
+_feed_active = False
+_expirations = 0
+_state_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+
+_VERSIONS_SQL = statement("get_data_versions", "SELECT table_name, version FROM data_versions")
+
+def _fetch_versions() -> dict:
+    engine = get_supabase_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+    with engine.connect() as conn:
+        return {row[0]: row[1] for row in conn.execute(_VERSIONS_SQL)}
+
+def get_data_versions() -> dict:
+    """
+    Current data version of every versioned table (migrations/008_data_versions.sql).
+    Lookups are reused for VERSION_CHECK_INTERVAL seconds, or until the change feed
+    reports a change while it is connected; while one thread refreshes, others keep
+    the previous answer. A failed lookup is never treated as fresh: the previous
+    answer is kept and the database is asked again after VERSION_CHECK_INTERVAL.
+    Returns an empty dict if versions were never available.
+    """
+    global _versions, _checked_at, _failed_at
+    # Imported here: change_feed builds on this module
+    from utils.change_feed import start_change_feed
+    start_change_feed()
+
+    with _state_lock:
+        if _is_fresh() or _backing_off() or (_checked_at is not None and _refresh_lock.locked()):
+            return _versions
+
+    with _refresh_lock:
+        with _state_lock:
+            if _is_fresh() or _backing_off():
+                return _versions
+            expirations = _expirations
+        started = time.monotonic()
+        try:
+            versions = _fetch_versions()
+        except Exception as e:
+            print(f"Error fetching data versions: {e}")
+            with _state_lock:
+                _failed_at = time.monotonic()
+                return _versions
+        with _state_lock:
+            _versions = versions
+            _failed_at = None
+            # A change reported mid-fetch may not be in this answer; leave it expired
+            if expirations == _expirations:
+                _checked_at = started
+            return _versions
+
+def _is_fresh() -> bool:
+    if _checked_at is None:
+        return False
+    return _feed_active or time.monotonic() - _checked_at < VERSION_CHECK_INTERVAL
+
+def _backing_off() -> bool:
+    return _failed_at is not None and time.monotonic() - _failed_at < VERSION_CHECK_INTERVAL
+
+def get_data_version(table_name: str):
+    """Current data version of one table, or None if unknown"""
+    return get_data_versions().get(table_name)
+
+def versions_for(tables: tuple) -> tuple:
+    """Version stamp for a result read from `tables`, usable as (part of) a cache key"""
+    versions = get_data_versions()
+    return tuple(versions.get(table) for table in tables)
+
+def expire_data_versions():
+    """Make the next lookup go to the database, e.g. right after this process wrote"""
+    global _checked_at, _failed_at, _expirations
+    with _state_lock:
+        _checked_at = None
+        _failed_at = None
+        _expirations += 1
+
+def set_change_feed_active(active: bool):
+    """Called by the change feed as it connects and disconnects"""
+    global _feed_active, _checked_at, _expirations
+    with _state_lock:
+        _feed_active = active
+        _checked_at = None
+        _expirations += 1
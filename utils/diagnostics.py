@@ -0,0 +1,33 @@
+import os
+
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import get_load_metrics
+from utils.query_cache import get_cache_metrics
+
+# Operators can turn on a per-page panel with this process's cache and load metrics
+SHOW_DIAGNOSTICS = os.getenv("SHOW_DIAGNOSTICS", "0").lower() in ("1", "true", "yes")
+
+def render_diagnostics(load_timings: dict = None):
+    """
+    Collapsed panel with this render's per-query load times (from load_parallel) and
+    the server process's loader and query cache metrics, if SHOW_DIAGNOSTICS is set
+    """
+    if not SHOW_DIAGNOSTICS:
+        return
+    with st.expander("⚙️ Diagnostics"):
+        if load_timings:
+            st.markdown("**Data loads for this page**")
+            st.dataframe(pd.DataFrame({'seconds': load_timings}).round(4), use_container_width=True)
+        load_metrics = get_load_metrics()
+        if load_metrics:
+            st.markdown("**Data loads** (this server process)")
+            st.dataframe(pd.DataFrame.from_dict(load_metrics, orient='index'), use_container_width=True)
+        metrics = get_cache_metrics()
+        shared = metrics.pop('shared', None)
+        st.markdown("**Query cache** (this server process)")
+        if metrics:
+            st.dataframe(pd.DataFrame.from_dict(metrics, orient='index'), use_container_width=True)
+        if shared:
+            st.caption("Shared tier: " + ", ".join(f"{name} {value}" for name, value in shared.items()))
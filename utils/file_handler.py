@@ -5,8 +5,8 @@ from datetime import datetime
 import mimetypes
 from typing import Optional
 from io import BytesIO
-from utils.supabase_client import get_supabase_storage_client, upload_file_to_storage
-import requests
+from utils.supabase_client import upload_file_to_storage
+from utils.storage_backend import get_storage_backend
 
 def get_file_type(filename: str) -> str:
     """
@@ -27,35 +27,190 @@ def get_file_type(filename: str) -> str:
     else:
         return 'unknown'
 
-def validate_file(uploaded_file, content_type: str) -> bool:
+# Bytes read from the start of a file for content sniffing
+SNIFF_BYTES = 8192
+
+# Detected format -> (file type, MIME type)
+SNIFFED_FORMATS = {
+    'jpeg': ('image', 'image/jpeg'),
+    'png': ('image', 'image/png'),
+    'gif': ('image', 'image/gif'),
+    'bmp': ('image', 'image/bmp'),
+    'webp': ('image', 'image/webp'),
+    'svg': ('image', 'image/svg+xml'),
+    'mpeg_audio': ('audio', 'audio/mpeg'),
+    'aac': ('audio', 'audio/aac'),
+    'wav': ('audio', 'audio/wav'),
+    'mp4_audio': ('audio', 'audio/mp4'),
+    'ogg': ('audio', 'audio/ogg'),
+    'flac': ('audio', 'audio/flac'),
+    'pdf': ('document', 'application/pdf'),
+    'ole': ('document', 'application/msword'),
+    'docx': ('document', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+    'odt': ('document', 'application/vnd.oasis.opendocument.text'),
+    'rtf': ('document', 'application/rtf'),
+    'text': ('document', 'text/plain'),
+}
+
+# Extension -> detected formats that may legitimately carry it
+EXTENSION_FORMATS = {
+    'jpg': {'jpeg'},
+    'jpeg': {'jpeg'},
+    'png': {'png'},
+    'gif': {'gif'},
+    'bmp': {'bmp'},
+    'webp': {'webp'},
+    'svg': {'svg'},
+    'mp3': {'mpeg_audio'},
+    'aac': {'aac', 'mpeg_audio'},
+    'wav': {'wav'},
+    'm4a': {'mp4_audio'},
+    'ogg': {'ogg'},
+    'flac': {'flac'},
+    'pdf': {'pdf'},
+    'doc': {'ole'},
+    'docx': {'docx'},
+    'odt': {'odt'},
+    'rtf': {'rtf'},
+    'txt': {'text'},
+}
+
+# Sizes of the BITMAPCOREHEADER / BITMAPINFOHEADER family that follows a BMP file header
+BMP_DIB_HEADER_SIZES = {12, 40, 52, 56, 108, 124}
+
+# ftyp brands used only by MPEG-4 audio (.m4a) and audiobook (.m4b) files
+MP4_AUDIO_BRANDS = {b'M4A ', b'M4B '}
+
+def read_file_header(uploaded_file, size: int = SNIFF_BYTES) -> bytes:
     """
-    Validate uploaded file based on content type and size
+    Read the first bytes of an uploaded file and rewind it
     """
-    if not uploaded_file:
+    uploaded_file.seek(0)
+    header = uploaded_file.read(size)
+    uploaded_file.seek(0)
+    return header
+
+def _looks_like_text(header: bytes) -> bool:
+    if not header or b'\x00' in header:
         return False
+    try:
+        header.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # A multi-byte character may be cut off at the end of the sniffed window
+        if e.start < len(header) - 3:
+            return False
+    return True
+
+def sniff_file_format(header: bytes) -> Optional[str]:
+    """
+    Identify a file format from its leading bytes (magic numbers)
+    Returns: Key into SNIFFED_FORMATS or None if unrecognised
+    """
+    if header.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if header[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    # 'BM' alone also starts plain text; require a known DIB header size after the file header
+    if header.startswith(b'BM') and int.from_bytes(header[14:18], 'little') in BMP_DIB_HEADER_SIZES:
+        return 'bmp'
+    if header.startswith(b'RIFF') and header[8:12] == b'WEBP':
+        return 'webp'
+    if header.startswith(b'RIFF') and header[8:12] == b'WAVE':
+        return 'wav'
+    if header.startswith(b'OggS'):
+        return 'ogg'
+    if header.startswith(b'fLaC'):
+        return 'flac'
+    if header.startswith(b'ID3'):
+        return 'mpeg_audio'
+    if len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0:
+        # Frame sync: layer bits 00 mark ADTS (AAC), anything else is MPEG audio
+        return 'aac' if header[1] & 0x06 == 0 else 'mpeg_audio'
+    if header[4:8] == b'ftyp':
+        # Generic brands (isom, mp42, ...) are shared with MP4 video; only the audio brands
+        # count, as the major brand or one of the compatible brands listed after it
+        box_size = min(int.from_bytes(header[:4], 'big'), len(header))
+        brands = [header[8:12]] + [header[i:i + 4] for i in range(16, box_size - 3, 4)]
+        return 'mp4_audio' if any(brand in MP4_AUDIO_BRANDS for brand in brands) else None
+    if b'%PDF-' in header[:1024]:
+        return 'pdf'
+    if header.startswith(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'):
+        return 'ole'
+    if header.startswith(b'PK\x03\x04'):
+        if header[30:38] == b'mimetype' and b'application/vnd.oasis.opendocument.text' in header[38:120]:
+            return 'odt'
+        if b'word/' in header or (b'[Content_Types].xml' in header and b'xl/' not in header and b'ppt/' not in header):
+            return 'docx'
+        return None
+    if header.startswith(b'{\\rtf'):
+        return 'rtf'
+    if _looks_like_text(header):
+        return 'svg' if b'<svg' in header.lower() else 'text'
+    return None
+
+def detect_file_type(uploaded_file) -> Optional[str]:
+    """
+    Determine file type ('image', 'audio' or 'document') from the file's contents
+    Returns: File type or None if the contents are not a supported format
+    """
+    file_format = sniff_file_format(read_file_header(uploaded_file))
+    return SNIFFED_FORMATS[file_format][0] if file_format else None
+
+def validate_file(uploaded_file, content_type: str) -> Optional[str]:
+    """
+    Validate uploaded file based on content type, size and leading bytes.
+    Only the first SNIFF_BYTES are read, so mislabeled files are rejected before upload.
+    Returns: Detected format (key into SNIFFED_FORMATS) if valid, otherwise None;
+    pass it on to get_upload_mime_type instead of sniffing the file again
+    """
+    if not uploaded_file:
+        return None
     
     # Check file size (max 50MB)
     max_size = 50 * 1024 * 1024  # 50MB in bytes
     if uploaded_file.size > max_size:
         st.error(f"File size ({uploaded_file.size / 1024 / 1024:.1f}MB) exceeds maximum allowed size (50MB)")
-        return False
+        return None
     
     # Check file type
     file_type = get_file_type(uploaded_file.name)
     
+    # Accept both the display label and the folder form used by the upload page
     expected_types = {
-        'Photo/Image': 'image',
-        'Audio Recording': 'audio',
-        'Document': 'document'
+        'photo_image': 'image',
+        'audio_recording': 'audio',
+        'document': 'document'
     }
     
-    expected_type = expected_types.get(content_type, 'unknown')
+    content_key = content_type.lower().replace('/', '_').replace(' ', '_')
+    expected_type = expected_types.get(content_key, 'unknown')
     
     if expected_type != 'unknown' and file_type != expected_type:
         st.error(f"File type mismatch. Expected {expected_type} file for {content_type}")
-        return False
+        return None
     
-    return True
+    # Check the contents actually match the extension
+    extension = uploaded_file.name.lower().rsplit('.', 1)[-1] if '.' in uploaded_file.name else ''
+    file_format = sniff_file_format(read_file_header(uploaded_file))
+    
+    if file_format is None or file_format not in EXTENSION_FORMATS.get(extension, set()):
+        st.error(f"File contents do not match a valid .{extension or '?'} file")
+        return None
+    
+    return file_format
+
+def get_upload_mime_type(uploaded_file, file_format: Optional[str] = None) -> str:
+    """
+    MIME type for storage, preferring the sniffed format over the browser-supplied type.
+    The file is only sniffed if file_format (as returned by validate_file) is not given.
+    """
+    if file_format is None:
+        file_format = sniff_file_format(read_file_header(uploaded_file))
+    if file_format:
+        return SNIFFED_FORMATS[file_format][1]
+    return uploaded_file.type or mimetypes.guess_type(uploaded_file.name)[0] or 'application/octet-stream'
 
 def generate_unique_filename(original_filename: str, content_type: str) -> str:
     """
@@ -89,20 +244,19 @@ def upload_file_to_supabase(uploaded_file, content_type: str) -> Optional[str]:
     """
     try:
         # Validate file
-        if not validate_file(uploaded_file, content_type):
+        file_format = validate_file(uploaded_file, content_type)
+        if not file_format:
             return None
         
         # Generate unique filename
         file_path = generate_unique_filename(uploaded_file.name, content_type)
         
-        # Get file content
-        file_content = uploaded_file.read()
-        
         # Get content type
-        content_type_mime = uploaded_file.type or mimetypes.guess_type(uploaded_file.name)[0] or 'application/octet-stream'
+        content_type_mime = get_upload_mime_type(uploaded_file, file_format)
         
-        # Upload to Supabase storage
-        file_url = upload_file_to_storage(file_content, file_path, content_type_mime)
+        # Stream the file object to storage instead of reading it into memory
+        uploaded_file.seek(0)
+        file_url = upload_file_to_storage(uploaded_file, file_path, content_type_mime)
         
         if file_url:
             st.success(f"✅ File uploaded successfully!")
@@ -117,23 +271,15 @@ def upload_file_to_supabase(uploaded_file, content_type: str) -> Optional[str]:
 
 def delete_file_from_supabase(file_path: str) -> bool:
     """
-    Delete file from Supabase storage
+    Delete file from the configured storage backend
     Returns: True if successful, False otherwise
     """
     try:
-        config = get_supabase_storage_client()
-        if not config:
+        backend = get_storage_backend()
+        if not backend:
             return False
         
-        bucket = "heritage-files"
-        delete_url = f"{config['url']}/storage/v1/object/{bucket}/{file_path}"
-        
-        headers = {
-            "Authorization": f"Bearer {config['key']}"
-        }
-        
-        response = requests.delete(delete_url, headers=headers)
-        return response.status_code == 200
+        return backend.delete(file_path)
     
     except Exception as e:
         st.error(f"File deletion error: {str(e)}")
@@ -141,32 +287,15 @@ def delete_file_from_supabase(file_path: str) -> bool:
 
 def get_file_info(file_path: str) -> Optional[dict]:
     """
-    Get file information from Supabase storage
+    Get file information from the configured storage backend
     Returns: Dictionary with file info or None if failed
     """
     try:
-        config = get_supabase_storage_client()
-        if not config:
+        backend = get_storage_backend()
+        if not backend:
             return None
         
-        bucket = "heritage-files"
-        info_url = f"{config['url']}/storage/v1/object/info/{bucket}/{file_path}"
-        
-        headers = {
-            "Authorization": f"Bearer {config['key']}"
-        }
-        
-        response = requests.get(info_url, headers=headers)
-        
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                'name': data.get('name'),
-                'size': data.get('metadata', {}).get('size'),
-                'content_type': data.get('metadata', {}).get('mimetype'),
-                'created_at': data.get('created_at'),
-                'updated_at': data.get('updated_at')
-            }
+        return backend.info(file_path)
     
     except Exception as e:
         st.error(f"Error getting file info: {str(e)}")
@@ -175,28 +304,15 @@ def get_file_info(file_path: str) -> Optional[dict]:
 
 def list_files_in_bucket(prefix: str = "") -> list:
     """
-    List files in Supabase storage bucket
+    List files in the configured storage backend
     Returns: List of file objects
     """
     try:
-        config = get_supabase_storage_client()
-        if not config:
+        backend = get_storage_backend()
+        if not backend:
             return []
         
-        bucket = "heritage-files"
-        list_url = f"{config['url']}/storage/v1/object/list/{bucket}"
-        
-        headers = {
-            "Authorization": f"Bearer {config['key']}"
-        }
-        
-        params = {"prefix": prefix} if prefix else {}
-        response = requests.get(list_url, headers=headers, params=params)
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return []
+        return list(backend.list_objects(prefix))
     
     except Exception as e:
         st.error(f"Error listing files: {str(e)}")
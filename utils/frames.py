@@ -0,0 +1,116 @@
+import pandas as pd
+
+# Snapshot and query cache frames are handed to every session as shallow copies that
+# share the cached column data. Copy-on-Write makes an in-place edit of such a copy
+# (df.loc[...] = ..., fillna(inplace=True)) copy the column first instead of changing
+# the cached frame; it is always on from pandas 3.
+if int(pd.__version__.split(".", 1)[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = "string[pyarrow]"
+except ImportError:  # pandas' own string array is larger but behaves the same
+    STRING_DTYPE = "string"
+
+# Column dtypes for frames built from whole tables. Columns not listed keep pandas'
+# inferred dtype (ids, timestamps). Missing values become NA/NaN rather than None.
+TABLE_SCHEMAS = {
+    "temples": {
+        "name": "string",
+        "description": "string",
+        "location": "string",
+        "image_url": "string",
+        "audio_url": "string",
+        "contributor_name": "category",
+        "deity": "category",
+        "architectural_style": "category",
+        "built_year": "Int32",
+        "history": "string",
+        "latitude": "float32",
+        "longitude": "float32"
+    },
+    "content_contributions": {
+        "title": "string",
+        "content_type": "category",
+        "description": "string",
+        "file_url": "string",
+        "latitude": "float32",
+        "longitude": "float32",
+        "location_address": "string",
+        "contributor_name": "category"
+    },
+    "historical_events": {
+        "event_title": "string",
+        "event_description": "string",
+        "latitude": "float32",
+        "longitude": "float32",
+        "contributor_name": "category"
+    }
+}
+
+def _typed_column(values, dtype) -> pd.Series:
+    values = list(values)
+    if dtype is None:
+        return pd.Series(values, dtype=None if values else object)
+    if dtype == "float32":
+        # numeric columns arrive as Decimal
+        return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").astype("float32")
+    if dtype == "category":
+        return pd.Series(pd.Categorical(values))
+    if dtype == "string":
+        return pd.Series(values, dtype=STRING_DTYPE)
+    return pd.Series(pd.array(values, dtype=dtype))
+
+def empty_frame(columns, schema: dict = None) -> pd.DataFrame:
+    """Zero-row DataFrame with the given columns, typed per schema"""
+    schema = schema or {}
+    return pd.DataFrame({column: _typed_column([], schema.get(column)) for column in columns})
+
+def iter_frames(result, schema: dict = None, chunk_size: int = 5000):
+    """
+    Yield a SQLAlchemy result as typed DataFrames of up to chunk_size rows each,
+    so only one chunk of Row objects exists at a time
+    """
+    schema = schema or {}
+    columns = list(result.keys())
+    while True:
+        rows = result.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield pd.DataFrame({
+            column: _typed_column(values, schema.get(column))
+            for column, values in zip(columns, zip(*rows))
+        })
+
+def frame_from_result(result, schema: dict = None, chunk_size: int = 5000) -> pd.DataFrame:
+    """
+    Build a DataFrame from a SQLAlchemy result, converting chunk_size rows at a time
+    into typed columns instead of materializing every Row first
+    Returns: DataFrame with the result's columns, typed per schema
+    """
+    chunks = list(iter_frames(result, schema, chunk_size))
+    if not chunks:
+        return empty_frame(result.keys(), schema)
+    if len(chunks) == 1:
+        return chunks[0]
+    return apply_schema(pd.concat(chunks, ignore_index=True), schema or {})
+
+def apply_schema(frame: pd.DataFrame, schema: dict) -> pd.DataFrame:
+    """
+    Cast frame's columns to the schema's dtypes, e.g. after concat, which turns
+    categoricals with different categories back into object columns, or after an
+    Arrow round trip, which restores strings with pandas' default storage
+    """
+    casts = {}
+    for column, dtype in schema.items():
+        if column not in frame.columns:
+            continue
+        target = STRING_DTYPE if dtype == "string" else dtype
+        current = frame[column].dtype
+        # Compared as dtypes: str() names both string storages "string" in pandas 2
+        matches = isinstance(current, pd.CategoricalDtype) if target == "category" \
+            else current == pd.api.types.pandas_dtype(target)
+        if not matches:
+            casts[column] = target
+    return frame.astype(casts) if casts else frame
@@ -0,0 +1,81 @@
+import argparse
+import math
+from typing import Tuple
+
+# Grid levels maintained in geo_density_cells; must match heritage_density_zooms()
+# in migrations/004_geo_density_grid.sql
+GRID_ZOOMS = (2, 4, 6, 8, 10, 12)
+
+MAX_LATITUDE = 85.05112878
+
+def tile_xy(latitude: float, longitude: float, zoom: int) -> Tuple[int, int]:
+    """
+    Web Mercator tile containing a point (same formula as heritage_tile_x/heritage_tile_y)
+    Returns: (x, y) tile indices at the given zoom
+    """
+    n = 1 << zoom
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, latitude))
+    lat_rad = math.radians(lat)
+    x = int(math.floor((longitude + 180.0) / 360.0 * n))
+    y = int(math.floor((1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi) / 2.0 * n))
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+def tile_bounds(x: int, y: int, zoom: int) -> Tuple[float, float, float, float]:
+    """
+    Geographic bounds of a tile
+    Returns: (south, west, north, east)
+    """
+    n = 1 << zoom
+
+    def latitude_at(tile_y):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return latitude_at(y + 1), x / n * 360.0 - 180.0, latitude_at(y), (x + 1) / n * 360.0 - 180.0
+
+def quadkey(x: int, y: int, zoom: int) -> str:
+    """Bing-style quadkey for a tile, handy as a compact cell identifier"""
+    digits = []
+    for level in range(zoom, 0, -1):
+        mask = 1 << (level - 1)
+        digits.append(str((1 if x & mask else 0) + (2 if y & mask else 0)))
+    return "".join(digits)
+
+def tile_ranges(bounds: Tuple[float, float, float, float], zoom: int) -> Tuple[int, int, int, int]:
+    """
+    Tile index ranges covering a (south, west, north, east) box
+    Returns: (min_x, max_x, min_y, max_y); min_x > max_x means the box crosses the antimeridian
+    """
+    south, west, north, east = bounds
+    if east - west >= 360:
+        west, east = -180.0, 180.0
+    else:
+        west = (west + 180) % 360 - 180
+        east = (east + 180) % 360 - 180
+    min_x, min_y = tile_xy(north, west, zoom)
+    max_x, max_y = tile_xy(south, east, zoom)
+    return min_x, max_x, min_y, max_y
+
+def grid_zoom_for(map_zoom: int, detail: int = 3) -> int:
+    """
+    Finest grid level no more than `detail` levels below the map zoom,
+    so a viewport covers at most a few thousand cells
+    """
+    candidates = [zoom for zoom in GRID_ZOOMS if zoom <= map_zoom + detail]
+    return candidates[-1] if candidates else GRID_ZOOMS[0]
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the geo_density_cells grid")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute every cell from the point tables")
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.print_help()
+        return
+
+    # database imports this module, so import it only when running as a job
+    from database import rebuild_density_grid
+    rebuild_density_grid()
+    print("Density grid rebuilt")
+
+if __name__ == "__main__":
+    main()
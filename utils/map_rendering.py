@@ -0,0 +1,316 @@
+import json
+import math
+from decimal import Decimal
+
+import folium
+import pandas as pd
+from branca.element import MacroElement
+from folium.elements import JSCSSMixin
+from folium.plugins import MarkerCluster
+from jinja2 import Template
+
+def _json_value(value):
+    """Convert a DataFrame cell into a JSON-safe value"""
+    if value is None:
+        return None
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return None if pd.isna(value) else value.isoformat()
+    if hasattr(value, "item"):
+        value = value.item()
+        return None if isinstance(value, float) and math.isnan(value) else value
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return None if pd.isna(value) else str(value)
+
+def build_feature_collection(df: pd.DataFrame, properties: list, lat_col: str = 'latitude',
+                             lon_col: str = 'longitude', precision: int = 5) -> dict:
+    """
+    Build a GeoJSON FeatureCollection of points from a DataFrame.
+    Coordinates are rounded to `precision` decimals (about a metre at 5) to keep the payload small.
+    """
+    points = df.dropna(subset=[lat_col, lon_col])
+    columns = [points[lat_col], points[lon_col]] + [points[name] for name in properties]
+
+    features = []
+    for values in zip(*columns):
+        features.append({
+            "type": "Feature",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [round(float(values[1]), precision), round(float(values[0]), precision)]
+            },
+            "properties": {name: _json_value(value) for name, value in zip(properties, values[2:])}
+        })
+
+    return {"type": "FeatureCollection", "features": features}
+
+def _script_json(value) -> str:
+    # Keep a stray "</script>" inside a property from closing the script tag
+    return json.dumps(value).replace("</", "<\\/")
+
+# Popup and tooltip binding shared by the GeoJSON point layers; expects
+# this.title_field_json, this.popup_fields_json and this.tooltip_field_json
+_FEATURE_POPUP_JS = """
+            var titleField = {{ this.title_field_json }};
+            var popupFields = {{ this.popup_fields_json }};
+            var tooltipField = {{ this.tooltip_field_json }};
+            var escapeHtml = function(value) {
+                return String(value).replace(/[&<>"']/g, function(c) {
+                    return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c];
+                });
+            };
+            var display = function(value, fallback) {
+                return (value === null || value === undefined || value === '') ? fallback : value;
+            };
+            var bindFeaturePopup = function(feature, marker) {
+                var props = feature.properties || {};
+                marker.bindPopup(function() {
+                    var html = titleField ? '<b>' + escapeHtml(display(props[titleField], 'Unknown')) + '</b><br>' : '';
+                    html += popupFields.map(function(field) {
+                        return escapeHtml(field[0]) + ': ' + escapeHtml(display(props[field[1]], field[2]));
+                    }).join('<br>');
+                    return html;
+                }, {maxWidth: 300});
+                if (tooltipField) {
+                    marker.bindTooltip(escapeHtml(display(props[tooltipField], 'Unknown')));
+                }
+            };
+"""
+
+class GeoJsonMarkerCluster(JSCSSMixin, MacroElement):
+    """
+    One GeoJSON layer of point features clustered client-side by Leaflet.markercluster.
+    Markers and popups are built in the browser from feature properties, so the
+    page ships a single FeatureCollection instead of one folium.Marker per row.
+
+    popup_fields is a list of (label, property, fallback) tuples shown under the
+    bold title_field; popups are built lazily when a marker is opened.
+    """
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = (function() {
+            """ + _FEATURE_POPUP_JS + """
+            var icon = L.AwesomeMarkers.icon({{ this.icon_options_json }});
+            var cluster = L.markerClusterGroup({{ this.cluster_options_json }});
+            var layer = L.geoJSON({{ this.data_json }}, {
+                pointToLayer: function(feature, latlng) {
+                    return L.marker(latlng, {icon: icon});
+                },
+                onEachFeature: bindFeaturePopup
+            });
+            cluster.addLayers(layer.getLayers());
+            {{ this._parent.get_name() }}.addLayer(cluster);
+            return cluster;
+        })();
+        {% endmacro %}
+    """)
+
+    default_js = MarkerCluster.default_js
+    default_css = MarkerCluster.default_css
+
+    def __init__(self, data: dict, title_field: str = None, popup_fields: list = None,
+                 tooltip_field: str = None, icon_color: str = 'red', icon: str = 'home',
+                 cluster_options: dict = None):
+        super().__init__()
+        self._name = "GeoJsonMarkerCluster"
+        self.data_json = _script_json(data)
+        self.title_field_json = _script_json(title_field)
+        self.popup_fields_json = _script_json([list(field) for field in (popup_fields or [])])
+        self.tooltip_field_json = _script_json(tooltip_field)
+        self.icon_options_json = _script_json({"icon": icon, "markerColor": icon_color, "prefix": "glyphicon"})
+        options = {"chunkedLoading": True, "showCoverageOnHover": False}
+        options.update(cluster_options or {})
+        self.cluster_options_json = _script_json(options)
+
+class GeoJsonTileLayer(JSCSSMixin, MacroElement):
+    """
+    Pre-generated GeoJSON tiles (see utils/tile_builder.py) fetched by the browser
+    for the tiles in view. The map zoom snaps down to the nearest generated level;
+    tiles below point_zoom carry 'count' clusters drawn as labelled circles, the
+    rest carry points that are clustered and given popups like GeoJsonMarkerCluster.
+    """
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = (function() {
+            """ + _FEATURE_POPUP_JS + """
+            var map = {{ this._parent.get_name() }};
+            var urlTemplate = {{ this.url_template_json }};
+            var zooms = {{ this.zooms_json }};
+            var pointZoom = {{ this.point_zoom_json }};
+            var countLabel = {{ this.count_label_json }};
+            var color = {{ this.color_json }};
+            var icon = L.AwesomeMarkers.icon({{ this.icon_options_json }});
+            var points = L.markerClusterGroup({{ this.cluster_options_json }}).addTo(map);
+            var counts = L.layerGroup().addTo(map);
+            var tiles = {};
+            var activeZoom = null;
+
+            var tileZoom = function(zoom) {
+                var best = zooms[0];
+                zooms.forEach(function(z) { if (z <= zoom) { best = z; } });
+                return best;
+            };
+            var countMarker = function(feature, latlng) {
+                var count = feature.properties.count;
+                var size = Math.round(24 + 8 * Math.log10(Math.max(count, 1)));
+                return L.marker(latlng, {
+                    icon: L.divIcon({
+                        iconSize: [size, size], iconAnchor: [size / 2, size / 2], className: '',
+                        html: '<div style="width:' + size + 'px;height:' + size + 'px;line-height:' + size +
+                              'px;border-radius:50%;background:' + color + ';opacity:0.85;color:white;' +
+                              'text-align:center;font-weight:bold;font-size:12px;">' + count + '</div>'
+                    })
+                }).bindTooltip(count + ' ' + countLabel);
+            };
+            var loadTile = function(z, x, y) {
+                var key = z + '/' + x + '/' + y;
+                if (tiles[key]) { return; }
+                tiles[key] = {layer: null};
+                var url = urlTemplate.replace('{z}', z).replace('{x}', x).replace('{y}', y);
+                fetch(url).then(function(response) {
+                    return response.ok ? response.json() : null;
+                }).then(function(data) {
+                    // Empty tiles are not stored; a missing tile is not an error
+                    if (!data || !tiles[key] || z !== activeZoom) { return; }
+                    if (z < pointZoom) {
+                        tiles[key].layer = L.geoJSON(data, {pointToLayer: countMarker});
+                        counts.addLayer(tiles[key].layer);
+                    } else {
+                        tiles[key].layer = L.geoJSON(data, {
+                            pointToLayer: function(feature, latlng) { return L.marker(latlng, {icon: icon}); },
+                            onEachFeature: bindFeaturePopup
+                        });
+                        points.addLayers(tiles[key].layer.getLayers());
+                    }
+                }).catch(function() { delete tiles[key]; });
+            };
+            var update = function() {
+                var z = tileZoom(map.getZoom());
+                if (z !== activeZoom) {
+                    points.clearLayers();
+                    counts.clearLayers();
+                    tiles = {};
+                    activeZoom = z;
+                }
+                var n = Math.pow(2, z);
+                var bounds = map.getBounds();
+                var tileY = function(lat) {
+                    lat = Math.max(-85.05112878, Math.min(85.05112878, lat));
+                    var rad = lat * Math.PI / 180;
+                    var y = Math.floor((1 - Math.log(Math.tan(rad) + 1 / Math.cos(rad)) / Math.PI) / 2 * n);
+                    return Math.max(0, Math.min(n - 1, y));
+                };
+                var west = Math.floor((bounds.getWest() + 180) / 360 * n);
+                var east = Math.floor((bounds.getEast() + 180) / 360 * n);
+                var north = tileY(bounds.getNorth());
+                var south = tileY(bounds.getSouth());
+                if (east - west >= n) { west = 0; east = n - 1; }
+                for (var x = west; x <= east; x++) {
+                    for (var y = north; y <= south; y++) {
+                        loadTile(z, ((x % n) + n) % n, y);
+                    }
+                }
+            };
+            map.on('moveend', update);
+            update();
+            return points;
+        })();
+        {% endmacro %}
+    """)
+
+    default_js = MarkerCluster.default_js
+    default_css = MarkerCluster.default_css
+
+    def __init__(self, url_template: str, zooms: list, point_zoom: int, title_field: str = None,
+                 popup_fields: list = None, tooltip_field: str = None, count_label: str = 'items',
+                 icon_color: str = 'red', icon: str = 'home', color: str = '#c0392b',
+                 cluster_options: dict = None):
+        super().__init__()
+        self._name = "GeoJsonTileLayer"
+        self.url_template_json = _script_json(url_template)
+        self.zooms_json = _script_json(sorted(zooms))
+        self.point_zoom_json = _script_json(point_zoom)
+        self.count_label_json = _script_json(count_label)
+        self.color_json = _script_json(color)
+        self.title_field_json = _script_json(title_field)
+        self.popup_fields_json = _script_json([list(field) for field in (popup_fields or [])])
+        self.tooltip_field_json = _script_json(tooltip_field)
+        self.icon_options_json = _script_json({"icon": icon, "markerColor": icon_color, "prefix": "glyphicon"})
+        options = {"chunkedLoading": True, "showCoverageOnHover": False}
+        options.update(cluster_options or {})
+        self.cluster_options_json = _script_json(options)
+
+# ----------------------- VIEWPORT ------------------------
+
+def viewport_from_map_state(map_state) -> tuple:
+    """
+    Read (south, west, north, east) bounds and zoom from a st_folium return value
+    Returns: (bounds, zoom), or (None, None) before the map has reported its view
+    """
+    if not map_state or not map_state.get('bounds') or map_state.get('zoom') is None:
+        return None, None
+    south_west = map_state['bounds'].get('_southWest') or {}
+    north_east = map_state['bounds'].get('_northEast') or {}
+    if south_west.get('lat') is None or north_east.get('lat') is None:
+        return None, None
+    bounds = (south_west['lat'], south_west['lng'], north_east['lat'], north_east['lng'])
+    return bounds, int(map_state['zoom'])
+
+def estimate_zoom(bounds: tuple, width: int = 700, height: int = 500) -> int:
+    """
+    Leaflet zoom level at which `bounds` fits a width x height pixel map
+    """
+    south, west, north, east = bounds
+    lat_span = max(north - south, 1e-6)
+    lon_span = max(east - west, 1e-6)
+    # The world is 256 * 2**zoom pixels wide
+    zoom_for_width = math.log2(width * 360 / (256 * lon_span))
+    zoom_for_height = math.log2(height * 180 / (256 * lat_span))
+    return max(1, min(16, int(math.floor(min(zoom_for_width, zoom_for_height)))))
+
+def grid_cell_size(zoom: int) -> float:
+    """Grid cell size in degrees for server-side clustering, about 64 px at this zoom"""
+    return 360 / 2 ** zoom / 4
+
+def padded_bounds(bounds: tuple, zoom: int) -> tuple:
+    """
+    Expand bounds outward and snap them to the zoom's grid, so small pans stay
+    inside the data already loaded instead of triggering a new query
+    """
+    south, west, north, east = bounds
+    cell = grid_cell_size(zoom) * 4
+    return (
+        max(-90.0, math.floor(south / cell) * cell - cell),
+        math.floor(west / cell) * cell - cell,
+        min(90.0, math.ceil(north / cell) * cell + cell),
+        math.ceil(east / cell) * cell + cell
+    )
+
+def bounds_contain(outer: tuple, inner: tuple) -> bool:
+    return (outer[0] <= inner[0] and outer[1] <= inner[1] and
+            outer[2] >= inner[2] and outer[3] >= inner[3])
+
+def add_cluster_counts(m, clusters_df: pd.DataFrame, color: str = '#c0392b'):
+    """
+    Draw server-side aggregated cluster counts as labelled circles
+    """
+    for count, latitude, longitude in zip(clusters_df['count'], clusters_df['latitude'],
+                                          clusters_df['longitude']):
+        size = int(24 + 8 * math.log10(max(int(count), 1)))
+        folium.Marker(
+            location=[float(latitude), float(longitude)],
+            tooltip=f"{int(count)} temples",
+            icon=folium.DivIcon(
+                icon_size=(size, size),
+                icon_anchor=(size // 2, size // 2),
+                html=(f'<div style="width:{size}px;height:{size}px;line-height:{size}px;'
+                      f'border-radius:50%;background:{color};opacity:0.85;color:white;'
+                      f'text-align:center;font-weight:bold;font-size:12px;">{int(count)}</div>')
+            )
+        ).add_to(m)
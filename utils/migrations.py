@@ -0,0 +1,74 @@
+import argparse
+import os
+
+from sqlalchemy import text
+
+from utils.supabase_client import get_supabase_client
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+def get_migration_files() -> list:
+    """
+    List migration files in the order they must be applied
+    Returns: List of (version, path) tuples sorted by version
+    """
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        if filename.endswith(".sql"):
+            migrations.append((filename[:-4], os.path.join(MIGRATIONS_DIR, filename)))
+    return migrations
+
+def get_applied_versions(conn) -> set:
+    """
+    Versions already recorded in schema_migrations
+    """
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version text PRIMARY KEY,
+            applied_at timestamp with time zone DEFAULT now()
+        )
+    """))
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+def apply_migrations(dry_run: bool = False) -> list:
+    """
+    Apply every pending migration, each in its own transaction
+    Returns: List of versions applied (or pending, for a dry run)
+    """
+    engine = get_supabase_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    with engine.begin() as conn:
+        applied = get_applied_versions(conn)
+
+    pending = [(version, path) for version, path in get_migration_files() if version not in applied]
+    if dry_run:
+        return [version for version, _ in pending]
+
+    for version, path in pending:
+        with open(path, encoding="utf-8") as handle:
+            sql = handle.read()
+        with engine.begin() as conn:
+            # no_parameters keeps the driver from treating '%' in the SQL as placeholders
+            conn.execution_options(no_parameters=True).exec_driver_sql(sql)
+            conn.execute(text("INSERT INTO schema_migrations (version) VALUES (:version)"),
+                         {"version": version})
+        print(f"Applied migration {version}")
+
+    return [version for version, _ in pending]
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending database migrations")
+    parser.add_argument("--dry-run", action="store_true", help="List pending migrations without applying them")
+    args = parser.parse_args()
+
+    versions = apply_migrations(dry_run=args.dry_run)
+    if not versions:
+        print("Database schema is up to date")
+    elif args.dry_run:
+        for version in versions:
+            print(f"pending: {version}")
+
+if __name__ == "__main__":
+    main()
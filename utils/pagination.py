@@ -0,0 +1,93 @@
+import streamlit as st
+import pandas as pd
+from typing import Callable, Tuple
+
+# fetch_page(after, limit) -> DataFrame, where `after` is None for the first page
+PageFetcher = Callable[[object, int], pd.DataFrame]
+
+def _get_pager(state_key: str, signature: tuple) -> dict:
+    """
+    Pagination state for one list, reset whenever its filters or sort change
+    """
+    pager = st.session_state.get(state_key)
+    if pager is None or pager['signature'] != signature:
+        pager = {'signature': signature, 'cursors': [None], 'loaded': None, 'has_more': False}
+        st.session_state[state_key] = pager
+    return pager
+
+def _fetch(fetch_page: PageFetcher, after, page_size: int) -> Tuple[pd.DataFrame, bool]:
+    # One extra row tells us whether another page exists without a COUNT
+    page_df = fetch_page(after, page_size + 1)
+    return page_df.head(page_size), len(page_df) > page_size
+
+def paged_window(state_key: str, signature: tuple, fetch_page: PageFetcher,
+                 cursor_of: Callable, page_size: int = 20) -> Tuple[pd.DataFrame, Callable]:
+    """
+    One page of rows with previous/next controls, fetched by keyset cursor
+    Returns: (page DataFrame, function that renders the controls)
+    """
+    pager = _get_pager(state_key, signature)
+    page_df, has_next = _fetch(fetch_page, pager['cursors'][-1], page_size)
+    page_number = len(pager['cursors'])
+
+    def go_next():
+        pager['cursors'].append(cursor_of(page_df.iloc[-1]))
+
+    def go_previous():
+        pager['cursors'].pop()
+
+    def render_controls():
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            st.button("⬅️ Previous", key=f"{state_key}_previous",
+                      disabled=page_number == 1, on_click=go_previous)
+        with col2:
+            first_row = (page_number - 1) * page_size + 1
+            st.caption(f"Page {page_number} · showing {first_row}–{first_row + len(page_df) - 1}")
+        with col3:
+            st.button("Next ➡️", key=f"{state_key}_next",
+                      disabled=not has_next or page_df.empty, on_click=go_next)
+
+    return page_df, render_controls
+
+def incremental_window(state_key: str, signature: tuple, fetch_page: PageFetcher,
+                       cursor_of: Callable, page_size: int = 20) -> Tuple[pd.DataFrame, Callable]:
+    """
+    Rows loaded so far, growing one keyset page per "Load more" click.
+    Loaded pages are kept in session state, so a rerun does not query again.
+    Returns: (loaded DataFrame, function that renders the load-more control)
+    """
+    pager = _get_pager(state_key, signature)
+    if pager['loaded'] is None:
+        pager['loaded'], pager['has_more'] = _fetch(fetch_page, None, page_size)
+
+    def load_more():
+        after = cursor_of(pager['loaded'].iloc[-1])
+        more_df, pager['has_more'] = _fetch(fetch_page, after, page_size)
+        pager['loaded'] = pd.concat([pager['loaded'], more_df], ignore_index=True)
+
+    def render_controls():
+        if pager['has_more']:
+            st.button("⬇️ Load more", key=f"{state_key}_load_more", on_click=load_more)
+        else:
+            st.caption(f"All {len(pager['loaded'])} results loaded")
+
+    return pager['loaded'], render_controls
+
+def windowed_rows(state_key: str, signature: tuple, fetch_page: PageFetcher,
+                  cursor_of: Callable, page_size: int = 20) -> Tuple[pd.DataFrame, Callable]:
+    """
+    Let the user pick page-by-page or load-more browsing and return that window
+    Returns: (rows to render, function that renders the window controls)
+    """
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        browse_mode = st.radio("Browse", ["Pages", "Load more"], horizontal=True, key=f"{state_key}_mode")
+    with col2:
+        page_size = st.selectbox("Per page", [10, 20, 50], index=[10, 20, 50].index(page_size)
+                                 if page_size in (10, 20, 50) else 1, key=f"{state_key}_page_size")
+
+    signature = signature + (browse_mode, page_size)
+    if browse_mode == "Pages":
+        return paged_window(state_key, signature, fetch_page, cursor_of, page_size)
+    return incremental_window(state_key, signature, fetch_page, cursor_of, page_size)
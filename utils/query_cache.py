@@ -0,0 +1,202 @@
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import pandas as pd
+
+import utils.frames  # noqa: F401  (turns on Copy-on-Write for the frames handed out)
+from utils.data_versions import expire_data_versions, versions_for
+from utils.replicas import read_at_least
+from utils.shared_cache import get_shared_cache
+
+DEFAULT_TTL = float(os.getenv("QUERY_CACHE_TTL", "60"))
+DEFAULT_MAX_STALE = float(os.getenv("QUERY_CACHE_MAX_STALE", "300"))
+DEFAULT_MAX_ENTRIES = 256
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+class QueryCache:
+    """
+    In-process result cache shared by every Streamlit session.
+    - Single flight: concurrent callers for a missing key wait on one load.
+    - Stale-while-revalidate: for max_stale seconds after the TTL an entry is
+      still served while one background thread reloads it.
+    - Entries are stamped with the data versions of the tables they read; an entry
+      whose tables have changed since it was loaded is reloaded, not served stale.
+    - invalidate() bumps a generation, so loads that started earlier are not stored.
+    """
+
+    def __init__(self, name: str, ttl: float = None, max_stale: float = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, tables: tuple = ()):
+        self.name = name
+        self.ttl = DEFAULT_TTL if ttl is None else ttl
+        self.max_stale = DEFAULT_MAX_STALE if max_stale is None else max_stale
+        self.max_entries = max_entries
+        self.tables = tuple(tables)
+        self._entries = OrderedDict()  # key -> (value, loaded_at, versions)
+        self._inflight = {}            # (key, versions) -> Future
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.metrics = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'background_refreshes': 0,
+            'version_misses': 0,
+            'loads': 0,
+            'errors': 0,
+            'load_seconds': 0.0
+        }
+
+    def get(self, key, loader):
+        """
+        Return the cached value for key, calling loader(versions) at most once at a time
+        per key and data version
+        """
+        versions = versions_for(self.tables)
+        flight = (key, versions)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] != versions:
+                self.metrics['version_misses'] += 1
+            elif entry is not None:
+                age = time.monotonic() - entry[1]
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.metrics['hits'] += 1
+                    return entry[0]
+                if age < self.ttl + self.max_stale:
+                    self.metrics['stale_hits'] += 1
+                    if flight not in self._inflight:
+                        future = Future()
+                        self._inflight[flight] = future
+                        self.metrics['background_refreshes'] += 1
+                        threading.Thread(target=self._load, args=(key, versions, loader, future),
+                                         name=f"query-cache-{self.name}", daemon=True).start()
+                    return entry[0]
+
+            future = self._inflight.get(flight)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[flight] = future
+                self.metrics['misses'] += 1
+            else:
+                self.metrics['coalesced'] += 1
+
+        if leader:
+            self._load(key, versions, loader, future)
+        return future.result()
+
+    def _load(self, key, versions, loader, future):
+        started = time.monotonic()
+        with self._lock:
+            generation = self._generation
+        try:
+            value = loader(versions)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop((key, versions), None)
+                self.metrics['errors'] += 1
+            future.set_exception(e)
+            return
+
+        with self._lock:
+            # The TTL counts from when the query started, not when it finished
+            if generation == self._generation:
+                self._entries[key] = (value, started, versions)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            self._inflight.pop((key, versions), None)
+            self.metrics['loads'] += 1
+            self.metrics['load_seconds'] += time.monotonic() - started
+        future.set_result(value)
+
+    def invalidate(self):
+        """Drop every entry; loads already running are not stored"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def snapshot(self) -> dict:
+        """Metrics plus current size and settings"""
+        with self._lock:
+            stats = dict(self.metrics)
+            stats.update({'entries': len(self._entries), 'inflight': len(self._inflight),
+                          'ttl': self.ttl, 'max_stale': self.max_stale})
+        return stats
+
+def _shallow_copy(value):
+    # Callers add columns to or edit the frames they get; Copy-on-Write (see utils.frames)
+    # keeps both off the shared copy
+    if isinstance(value, pd.DataFrame):
+        return value.copy(deep=False)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+def cached_query(ttl: float = None, max_stale: float = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 tables: tuple = (), fallback=pd.DataFrame):
+    """
+    Decorator caching a data-access function in a QueryCache keyed by its arguments.
+    `tables` names the tables the query reads, for invalidate_tables().
+    The function should raise on failure: errors are printed and fallback() is returned
+    to the caller, but nothing is cached, so the next call queries again.
+    """
+    def decorator(func):
+        cache = QueryCache(func.__name__, ttl=ttl, max_stale=max_stale,
+                           max_entries=max_entries, tables=tables)
+        with _caches_lock:
+            _caches[func.__name__] = cache
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+
+            def load(versions):
+                # A local miss checks the cross-process tier before querying the database;
+                # a replica may answer only once it has replayed these versions
+                with read_at_least(cache.tables, versions):
+                    shared = get_shared_cache()
+                    if shared is None:
+                        return func(*args, **kwargs)
+                    return shared.load(cache.name, versions, key, lambda: func(*args, **kwargs), cache.ttl)
+
+            try:
+                return _shallow_copy(cache.get(key, load))
+            except Exception as e:
+                print(f"Error loading {func.__name__}: {e}")
+                return fallback()
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+def invalidate_tables(*tables):
+    """
+    Invalidate every cache in this process that reads any of the given tables (all caches
+    if none given). Other processes and the shared tier see the change through the
+    tables' data versions, which this also rechecks on the next lookup.
+    """
+    expire_data_versions()
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        if not tables or set(tables) & set(cache.tables):
+            cache.invalidate()
+
+def get_cache_metrics() -> dict:
+    """Metrics for every registered cache, keyed by function name, plus the shared tier's"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    metrics = {cache.name: cache.snapshot() for cache in caches}
+    shared = get_shared_cache()
+    if shared is not None:
+        metrics['shared'] = dict(shared.metrics)
+    return metrics
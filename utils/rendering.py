@@ -0,0 +1,84 @@
+import html
+import streamlit as st
+import pandas as pd
+
+# Grid rows styled after st.columns / st.write / st.caption, so one markdown
+# element can replace several Streamlit elements per row.
+LIST_STYLE = """
+<style>
+.heritage-list-row {display: grid; gap: 1rem; align-items: start; padding: 0.5rem 0;
+                    border-bottom: 1px solid rgba(49, 51, 63, 0.2);}
+.heritage-list-row p {margin: 0;}
+.heritage-list-caption {font-size: 14px; color: rgba(49, 51, 63, 0.6); margin-top: 0.25rem;}
+.heritage-list-compact {border-bottom: none; padding: 0.25rem 0;}
+</style>
+"""
+
+def _text(value, default: str = "") -> str:
+    """
+    Escaped single-line display text for a possibly missing value. Whitespace runs,
+    newlines included, collapse to one space: a blank line would end the raw HTML
+    block and the rest of the list would render as markdown.
+    """
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return html.escape(default)
+    return html.escape(" ".join(str(value).split()))
+
+def _date(value, fmt: str) -> str:
+    if value is None or pd.isna(value):
+        return ""
+    return html.escape(pd.to_datetime(value).strftime(fmt))
+
+def _grid(widths: list) -> str:
+    return " ".join(f"{width}fr" for width in widths)
+
+def render_html_rows(rows: list, widths: list, compact: bool = False):
+    """
+    Render pre-escaped row cells as a single markdown element
+    """
+    row_class = "heritage-list-row heritage-list-compact" if compact else "heritage-list-row"
+    grid = _grid(widths)
+    body = "".join(
+        f'<div class="{row_class}" style="grid-template-columns: {grid};">'
+        + "".join(f"<div>{cell}</div>" for cell in cells)
+        + "</div>"
+        for cells in rows
+    )
+    st.markdown(LIST_STYLE + body, unsafe_allow_html=True)
+
+def render_contribution_list(contributions_df: pd.DataFrame):
+    """
+    Compact List view: title and description preview, type, contributor, date
+    """
+    rows = []
+    for contribution in contributions_df.itertuples(index=False):
+        title_cell = f"<p><strong>{_text(contribution.title)}</strong></p>"
+        description = contribution.description
+        if isinstance(description, str) and description.strip():
+            description = " ".join(description.split())
+            preview = description[:100] + "..." if len(description) > 100 else description
+            title_cell += f'<div class="heritage-list-caption">{_text(preview)}</div>'
+
+        rows.append([
+            title_cell,
+            f"<p>{_text(contribution.content_type)}</p>",
+            f"<p>{_text(contribution.contributor_name, 'Anonymous')}</p>",
+            f"<p>{_date(contribution.created_at, '%Y-%m-%d')}</p>"
+        ])
+
+    render_html_rows(rows, [3, 1, 1, 1])
+
+def render_recent_activity(contributions_df: pd.DataFrame):
+    """
+    Recent Activity timeline: title with type, contributor, date
+    """
+    rows = [
+        [
+            f"<p><strong>{_text(contribution.title)}</strong> ({_text(contribution.content_type)})</p>",
+            f"<p>{_text(contribution.contributor_name, 'Anonymous')}</p>",
+            f"<p>{_date(contribution.created_at, '%Y-%m-%d')}</p>"
+        ]
+        for contribution in contributions_df.itertuples(index=False)
+    ]
+
+    render_html_rows(rows, [2, 1, 1], compact=True)
@@ -0,0 +1,207 @@
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+from sqlalchemy import create_engine
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from utils.statements import instrument_engine, statement
+from utils.supabase_client import get_supabase_client
+
+# Replicas lagging further than this are skipped until a later check
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "15"))
+# Session state key holding the data versions a session's own writes reached
+SESSION_WRITES_KEY = "_replica_written_versions"
+
+# Zero while the standby has replayed everything it received, so an idle primary
+# does not look like lag
+_LAG_SQL = statement("replica_lag", """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() IS NULL OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+_REPLICA_VERSIONS_SQL = statement("replica_data_versions", """
+    SELECT table_name, version FROM data_versions WHERE table_name = ANY(:tables)
+""")
+
+_WRITTEN_VERSION_SQL = statement("written_data_version",
+                                 "SELECT version FROM data_versions WHERE table_name = :table")
+
+_required = threading.local()
+
+class Replica:
+    """One read replica and its last health check"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = create_engine(url, pool_pre_ping=True)
+        instrument_engine(self.engine)
+        self.healthy = True
+        self.lag = 0.0
+        self.checked_at = None
+        self._check_lock = threading.Lock()
+        self.metrics = {'reads': 0, 'stale_skips': 0, 'failures': 0}
+
+    def is_usable(self) -> bool:
+        """Health as of the last check, re-checked every REPLICA_CHECK_INTERVAL seconds"""
+        due = self.checked_at is None or time.monotonic() - self.checked_at >= REPLICA_CHECK_INTERVAL
+        # One thread re-checks; the others go by the previous result meanwhile
+        if due and self._check_lock.acquire(blocking=False):
+            try:
+                self.check()
+            finally:
+                self._check_lock.release()
+        return self.healthy
+
+    def check(self):
+        try:
+            with self.engine.connect() as conn:
+                self.lag = float(conn.execute(_LAG_SQL).scalar() or 0)
+            self.healthy = self.lag <= REPLICA_MAX_LAG_SECONDS
+        except Exception as e:
+            self.metrics['failures'] += 1
+            self.healthy = False
+            print(f"Read replica unavailable ({self.engine.url.host}): {e}")
+        self.checked_at = time.monotonic()
+
+    def has_versions(self, required: dict) -> bool:
+        """True if the replica has replayed at least these data versions"""
+        tables = [table for table, version in required.items() if version is not None]
+        if not tables:
+            return True
+        try:
+            with self.engine.connect() as conn:
+                versions = dict(conn.execute(_REPLICA_VERSIONS_SQL, {"tables": tables}).fetchall())
+        except Exception as e:
+            self.metrics['failures'] += 1
+            self.healthy = False
+            self.checked_at = time.monotonic()
+            print(f"Read replica unavailable ({self.engine.url.host}): {e}")
+            return False
+        return all(versions.get(table, 0) >= required[table] for table in tables)
+
+class ReplicaRouter:
+    """Round-robin over the configured replicas, skipping unhealthy or lagging ones"""
+
+    def __init__(self, urls: list):
+        self.replicas = [Replica(url) for url in urls]
+        self._order = itertools.cycle(range(len(self.replicas)))
+        self._order_lock = threading.Lock()
+        self.metrics = {'primary_reads': 0}
+
+    def choose(self, required: dict = None):
+        """
+        Engine of the next usable replica that has replayed `required` data versions
+        Returns: Engine, or None to read from the primary
+        """
+        with self._order_lock:
+            start = next(self._order)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if not replica.is_usable():
+                continue
+            if required and not replica.has_versions(required):
+                replica.metrics['stale_skips'] += 1
+                continue
+            replica.metrics['reads'] += 1
+            return replica.engine
+        self.metrics['primary_reads'] += 1
+        return None
+
+    def snapshot(self) -> dict:
+        replicas = {replica.engine.url.host: dict(replica.metrics, healthy=replica.healthy, lag=replica.lag)
+                    for replica in self.replicas}
+        return {'primary_reads': self.metrics['primary_reads'], 'replicas': replicas}
+
+_routers = {}
+_routers_lock = threading.Lock()
+
+def get_replica_router():
+    """Router for DATABASE_READ_URLS (comma-separated), or None when no replicas are configured"""
+    urls = os.getenv("DATABASE_READ_URLS", "")
+    if not urls.strip():
+        return None
+    with _routers_lock:
+        if urls not in _routers:
+            _routers[urls] = ReplicaRouter([url.strip() for url in urls.split(",") if url.strip()])
+        return _routers[urls]
+
+@contextmanager
+def read_at_least(tables, versions):
+    """
+    Within this block, get_read_client() only picks replicas that have replayed these
+    data versions, so a result cached under them is never older than they say
+    """
+    previous = getattr(_required, "versions", None)
+    _required.versions = {table: version for table, version in zip(tables, versions)}
+    try:
+        yield
+    finally:
+        _required.versions = previous
+
+def _session_state():
+    # None outside a Streamlit session, e.g. in maintenance jobs or cache refresh threads
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return None
+    return st.session_state
+
+def remember_write(conn, table: str):
+    """
+    Call after committing a write to `table` on the primary connection conn. The
+    table's data version is kept in the current session, and this session's later
+    reads only use replicas that have replayed it. Other sessions are unaffected.
+    """
+    if get_replica_router() is None:
+        return
+    state = _session_state()
+    if state is None:
+        return
+    try:
+        version = conn.execute(_WRITTEN_VERSION_SQL, {"table": table}).scalar()
+    except Exception as e:
+        # Without the version this session's reads may briefly miss its own write
+        print(f"Error reading data version of {table}: {e}")
+        return
+    if version is not None:
+        written = dict(state.get(SESSION_WRITES_KEY) or {})
+        written[table] = max(written.get(table, 0), version)
+        state[SESSION_WRITES_KEY] = written
+
+def _required_versions():
+    state = _session_state()
+    written = state.get(SESSION_WRITES_KEY) if state is not None else None
+    required = getattr(_required, "versions", None)
+    if not written:
+        return required
+    merged = dict(written)
+    for table, version in (required or {}).items():
+        if version is not None and version > merged.get(table, 0):
+            merged[table] = version
+    return merged
+
+def get_read_client():
+    """
+    Engine for a read-only query: a healthy replica when DATABASE_READ_URLS is set,
+    otherwise (or when none qualifies) the primary from get_supabase_client().
+    Reads made for a versioned cache need a replica that has caught up to those
+    versions, and a session that wrote (remember_write) needs one that has replayed
+    its writes.
+    Returns: SQLAlchemy engine or None if failed.
+    """
+    router = get_replica_router()
+    if router is not None:
+        engine = router.choose(_required_versions())
+        if engine is not None:
+            return engine
+    return get_supabase_client()
+
+def get_replica_metrics() -> dict:
+    """Per-replica read counts and health, or an empty dict without replicas"""
+    router = get_replica_router()
+    return router.snapshot() if router is not None else {}
@@ -0,0 +1,296 @@
+import argparse
+import hashlib
+import os
+import random
+import socket
+import socketserver
+import sqlite3
+import threading
+import time
+import urllib.parse
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # the shared tier is skipped without pyarrow
+    pa = None
+
+# Bump when the serialized layout changes so replicas on old code miss instead of misreading
+CACHE_FORMAT_VERSION = 1
+KEY_PREFIX = f"heritage:v{CACHE_FORMAT_VERSION}"
+
+# ----------------------- SERIALIZATION ------------------------
+
+def serialize_frame(df: pd.DataFrame) -> bytes:
+    """Arrow IPC stream bytes for a DataFrame"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def deserialize_frame(data: bytes) -> pd.DataFrame:
+    return pa.ipc.open_stream(pa.py_buffer(data)).read_all().to_pandas()
+
+# ----------------------- BACKENDS ------------------------
+
+class SharedCacheBackend(ABC):
+    """
+    Byte store shared by every server process. Values expire after `ttl` seconds.
+    Methods raise on failure.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Stored value, or None if missing or expired"""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float):
+        """Store a value for ttl seconds"""
+
+class SQLiteCacheBackend(SharedCacheBackend):
+    """
+    Single-host tier: a SQLite file in WAL mode that every process on the machine
+    opens, so concurrent readers never block each other or the writer.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB, expires_at REAL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._connection().execute(
+            "SELECT value FROM entries WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time())
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def set(self, key: str, value: bytes, ttl: float):
+        conn = self._connection()
+        conn.execute("INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)",
+                     (key, sqlite3.Binary(value), time.time() + ttl))
+        # Occasional sweep keeps expired frames from accumulating
+        if random.random() < 0.01:
+            conn.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+
+class RespCacheBackend(SharedCacheBackend):
+    """
+    Minimal Redis protocol (RESP2) client: GET and SET PX over one socket
+    per thread. Works against Redis, Valkey, KeyDB or the stand-in from serve().
+    """
+
+    def __init__(self, host: str, port: int = 6379, db: int = 0, password: str = None, timeout: float = 2.0):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._local.sock = sock
+        self._local.reader = sock.makefile("rb")
+        if self.password:
+            self._send("AUTH", self.password)
+        if self.db:
+            self._send("SELECT", str(self.db))
+
+    def _send(self, *parts):
+        payload = [f"*{len(parts)}\r\n".encode()]
+        for part in parts:
+            data = part if isinstance(part, bytes) else str(part).encode()
+            payload.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._local.sock.sendall(b"".join(payload))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._local.reader.readline()
+        if not line:
+            raise ConnectionError("Cache server closed the connection")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest
+        if kind == b"-":
+            raise RuntimeError(f"Cache server error: {rest.decode(errors='replace')}")
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._local.reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(rest)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise RuntimeError(f"Unexpected cache server reply: {line!r}")
+
+    def _command(self, *parts):
+        if getattr(self._local, "sock", None) is None:
+            self._connect()
+        try:
+            return self._send(*parts)
+        except (OSError, ConnectionError):
+            # Drop the broken socket; the next call reconnects
+            self._local.sock.close()
+            self._local.sock = None
+            raise
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._command("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self._command("SET", key, value, "PX", str(max(1, int(ttl * 1000))))
+
+# ----------------------- SHARED TIER ------------------------
+
+class SharedCache:
+    """
+    Query results shared between server processes.
+    Keys combine the cache format version, the query name, the data versions of the
+    tables it reads and a digest of its arguments; once a table changes, frames
+    keyed on its old version are never read again and simply expire.
+    """
+
+    def __init__(self, backend: SharedCacheBackend):
+        self.backend = backend
+        self.metrics = {'hits': 0, 'misses': 0, 'stores': 0, 'errors': 0}
+
+    @staticmethod
+    def frame_key(name: str, versions: tuple, args_key) -> str:
+        digest = hashlib.sha1(repr(args_key).encode()).hexdigest()
+        stamp = ".".join("-" if version is None else str(version) for version in versions)
+        return f"{KEY_PREFIX}:{name}:{stamp}:{digest}"
+
+    def load(self, name: str, versions: tuple, args_key, loader, ttl: float):
+        """
+        Return a shared frame for this query, or run loader() and publish its result.
+        Non-DataFrame results and backend errors fall through to loader().
+        """
+        try:
+            key = self.frame_key(name, versions, args_key)
+            data = self.backend.get(key)
+        except Exception as e:
+            self.metrics['errors'] += 1
+            print(f"Shared cache unavailable: {e}")
+            return loader()
+
+        if data is not None:
+            self.metrics['hits'] += 1
+            return deserialize_frame(data)
+
+        self.metrics['misses'] += 1
+        value = loader()
+        if isinstance(value, pd.DataFrame) and not value.empty:
+            try:
+                self.backend.set(key, serialize_frame(value), ttl)
+                self.metrics['stores'] += 1
+            except Exception as e:
+                self.metrics['errors'] += 1
+                print(f"Error storing shared cache entry: {e}")
+        return value
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+def get_shared_cache() -> Optional[SharedCache]:
+    """
+    Shared tier selected by SHARED_CACHE_URL: 'sqlite:///relative/cache.db',
+    'sqlite:////absolute/cache.db' (SQLAlchemy style) or 'redis://[:password@]host:port/db'. Returns None when unset or when pyarrow is missing.
+    """
+    url = os.getenv("SHARED_CACHE_URL")
+    if not url or pa is None:
+        return None
+
+    with _shared_lock:
+        if url not in _shared:
+            parsed = urllib.parse.urlparse(url)
+            if parsed.scheme == "sqlite":
+                backend = SQLiteCacheBackend(url[len("sqlite:///"):])
+            elif parsed.scheme == "redis":
+                backend = RespCacheBackend(parsed.hostname or "localhost", parsed.port or 6379,
+                                           db=int(parsed.path.lstrip("/") or 0), password=parsed.password)
+            else:
+                raise ValueError(f"Unknown SHARED_CACHE_URL scheme: {parsed.scheme}")
+            _shared[url] = SharedCache(backend)
+        return _shared[url]
+
+# ----------------------- LOCAL STAND-IN SERVER ------------------------
+
+class _StandInHandler(socketserver.StreamRequestHandler):
+    def _reply(self, value):
+        if value is None:
+            self.wfile.write(b"$-1\r\n")
+        else:
+            self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line or not line.startswith(b"*"):
+            return None
+        parts = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            parts.append(self.rfile.read(length + 2)[:-2])
+        return parts
+
+    def handle(self):
+        store, lock = self.server.store, self.server.lock
+        while True:
+            parts = self._read_command()
+            if parts is None:
+                return
+            command, args = parts[0].upper(), parts[1:]
+            now = time.monotonic()
+            with lock:
+                if command == b"GET":
+                    entry = store.get(args[0])
+                    self._reply(entry[0] if entry and (entry[1] is None or entry[1] > now) else None)
+                elif command == b"SET":
+                    expires = now + int(args[3]) / 1000 if len(args) >= 4 and args[2].upper() == b"PX" else None
+                    store[args[0]] = (args[1], expires)
+                    if random.random() < 0.01:
+                        for key in [k for k, (_, at) in store.items() if at is not None and at <= now]:
+                            del store[key]
+                    self.wfile.write(b"+OK\r\n")
+                elif command in (b"PING", b"AUTH", b"SELECT"):
+                    self.wfile.write(b"+OK\r\n" if command != b"PING" else b"+PONG\r\n")
+                else:
+                    self.wfile.write(b"-ERR unsupported command\r\n")
+
+def serve(host: str = "127.0.0.1", port: int = 6390):
+    """Run an in-memory RESP server with the commands RespCacheBackend uses (development only)"""
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    with socketserver.ThreadingTCPServer((host, port), _StandInHandler) as server:
+        server.daemon_threads = True
+        server.store = {}
+        server.lock = threading.Lock()
+        print(f"Shared cache stand-in listening on {host}:{port}")
+        server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Redis-protocol shared cache")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    serve(args.host, args.port)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import os
+import threading
+from datetime import timedelta
+
+import pandas as pd
+
+from utils.change_feed import subscribe
+from utils.data_versions import get_data_version
+from utils.frames import TABLE_SCHEMAS, apply_schema, frame_from_result
+from utils.statements import cached_statement, statement
+from utils.replicas import get_read_client, read_at_least
+from utils.shared_cache import get_shared_cache
+
+# Tables kept as in-memory snapshots; both are insert-only from the app
+SNAPSHOT_TABLES = ("temples", "content_contributions")
+
+# created_at defaults to the inserting transaction's start, so a row can commit after
+# a newer one was already synced; each delta re-reads this window and skips known ids
+SNAPSHOT_OVERLAP_SECONDS = float(os.getenv("SNAPSHOT_OVERLAP_SECONDS", "300"))
+# Full loads published to the shared tier are keyed by data version, so this only
+# bounds how long an unused table copy takes up space there
+SNAPSHOT_SHARED_TTL = float(os.getenv("SNAPSHOT_SHARED_TTL", "3600"))
+
+_ROW_COUNT_SQL = statement("snapshot_row_count",
+                           "SELECT row_count FROM table_counters WHERE table_name = :table_name")
+
+class TableSnapshot:
+    """
+    One table held in process memory, newest rows first (created_at DESC, id DESC).
+    sync() does nothing while the table's data version is unchanged; otherwise it
+    fetches only rows at or past the high-water mark on created_at. If the row count
+    no longer adds up, or the change feed reports an update or delete, the next sync
+    reloads the whole table. With a shared tier (SHARED_CACHE_URL), a full load of a
+    data version that another server process already loaded is read from there.
+    """
+
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+        self.schema = TABLE_SCHEMAS.get(table_name, {})
+        self._frame = None
+        self._high_water = None   # newest created_at in the snapshot
+        self._version = None
+        self._reload = True
+        self._lock = threading.Lock()
+        self.metrics = {'unchanged': 0, 'delta_loads': 0, 'full_loads': 0, 'rows_appended': 0, 'errors': 0}
+
+    def mark_for_reload(self):
+        with self._lock:
+            self._reload = True
+
+    def frame(self) -> pd.DataFrame:
+        """
+        Up-to-date view of the table. Views share the snapshot's column data until
+        edited; with Copy-on-Write (see utils.frames) neither added columns nor in-place
+        edits reach the snapshot.
+        Returns: DataFrame (empty if the table could not be read)
+        """
+        self.sync()
+        frame = self._frame
+        return pd.DataFrame() if frame is None else frame.copy(deep=False)
+
+    def sync(self):
+        with self._lock:
+            version = get_data_version(self.table_name)
+            if self._frame is not None and not self._reload and version is not None and version == self._version:
+                self.metrics['unchanged'] += 1
+                return
+
+            try:
+                with read_at_least((self.table_name,), (version,)):
+                    if self._frame is None or self._reload or self._high_water is None:
+                        self._load_full(version)
+                    elif not self._load_delta():
+                        self._load_full(version)
+            except Exception as e:
+                self.metrics['errors'] += 1
+                print(f"Error syncing {self.table_name} snapshot: {e}")
+                return
+            # Recorded before querying, so a change landing mid-sync is picked up next time
+            self._version = version
+
+    def _connect(self):
+        engine = get_read_client()
+        if not engine:
+            raise RuntimeError("Database connection unavailable")
+        # Rows and count from one database snapshot
+        return engine.connect().execution_options(isolation_level="REPEATABLE READ")
+
+    def _query_full(self) -> pd.DataFrame:
+        with self._connect() as conn:
+            result = conn.execute(cached_statement(
+                "snapshot_full", f"SELECT * FROM {self.table_name} ORDER BY created_at DESC, id DESC"
+            ))
+            return frame_from_result(result, self.schema)
+
+    def _load_full(self, version=None):
+        shared = get_shared_cache() if version is not None else None
+        if shared is None:
+            frame = self._query_full()
+        else:
+            # The table as of at least this version; later deltas pick up from there
+            frame = apply_schema(shared.load(f"snapshot_{self.table_name}", (version,), (),
+                                             self._query_full, SNAPSHOT_SHARED_TTL), self.schema)
+        self._install(frame)
+        self._reload = False
+        self.metrics['full_loads'] += 1
+
+    def _load_delta(self) -> bool:
+        """
+        Append rows newer than the high-water mark
+        Returns: False if the snapshot no longer matches the table and needs a full load
+        """
+        since = self._high_water.to_pydatetime() - timedelta(seconds=SNAPSHOT_OVERLAP_SECONDS)
+        with self._connect() as conn:
+            result = conn.execute(cached_statement("snapshot_delta", f"""
+                SELECT * FROM {self.table_name}
+                WHERE created_at >= :since
+                ORDER BY created_at DESC, id DESC
+            """), {"since": since})
+            rows = frame_from_result(result, self.schema)
+            total = conn.execute(_ROW_COUNT_SQL, {"table_name": self.table_name}).scalar()
+
+        frame = self._frame
+        known = set(frame.loc[frame['created_at'] >= since, 'id'])
+        new_rows = rows[~rows['id'].isin(known)]
+        if total is not None and len(frame) + len(new_rows) != total:
+            return False
+
+        self.metrics['delta_loads'] += 1
+        if new_rows.empty:
+            return True
+
+        merged = apply_schema(pd.concat([new_rows, frame], ignore_index=True), self.schema)
+        if new_rows['created_at'].min() < self._high_water:
+            # A late commit with an older timestamp; restore newest-first order
+            merged = merged.sort_values(['created_at', 'id'], ascending=False, ignore_index=True)
+        self._install(merged)
+        self.metrics['rows_appended'] += len(new_rows)
+        return True
+
+    def _install(self, frame: pd.DataFrame):
+        self._frame = frame
+        self._high_water = frame['created_at'].max() if 'created_at' in frame.columns and not frame.empty else None
+        if pd.isna(self._high_water):
+            self._high_water = None
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+def get_snapshot(table_name: str) -> TableSnapshot:
+    """Process-wide snapshot of a table in SNAPSHOT_TABLES"""
+    if table_name not in SNAPSHOT_TABLES:
+        raise ValueError(f"Unknown snapshot table: {table_name}")
+    with _snapshots_lock:
+        if table_name not in _snapshots:
+            _snapshots[table_name] = TableSnapshot(table_name)
+        return _snapshots[table_name]
+
+def get_snapshot_metrics() -> dict:
+    """Sync metrics for every snapshot created in this process"""
+    with _snapshots_lock:
+        snapshots = list(_snapshots.values())
+    metrics = {}
+    for snapshot in snapshots:
+        frame = snapshot._frame
+        metrics[snapshot.table_name] = dict(snapshot.metrics, rows=0 if frame is None else len(frame),
+                                            bytes=0 if frame is None else int(frame.memory_usage(deep=True).sum()))
+    return metrics
+
+def _on_change(event: dict):
+    # Deltas only see inserts; anything else (or missed events) forces a full reload
+    if event['op'] == 'INSERT':
+        return
+    with _snapshots_lock:
+        snapshots = list(_snapshots.values())
+    for snapshot in snapshots:
+        if event['table'] is None or event['table'] == snapshot.table_name:
+            snapshot.mark_for_reload()
+
+subscribe(_on_change)
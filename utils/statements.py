@@ -0,0 +1,57 @@
+import functools
+import threading
+import time
+
+from sqlalchemy import event, text
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+def statement(name: str, sql: str):
+    """
+    text() statement tagged with a name for get_statement_metrics().
+    Define these once at module level: SQLAlchemy then compiles each statement a
+    single time and reuses it from its compiled cache on every execution.
+    """
+    return text(sql).execution_options(statement_name=name)
+
+@functools.lru_cache(maxsize=512)
+def cached_statement(name: str, sql: str):
+    """statement() for SQL assembled per call (filters, sort orders); each distinct string is built once"""
+    return statement(name, sql)
+
+def _record(name, seconds, failed):
+    with _metrics_lock:
+        stats = _metrics.setdefault(name, {'calls': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+        stats['calls'] += 1
+        stats['errors'] += int(failed)
+        stats['total_seconds'] += seconds
+        stats['max_seconds'] = max(stats['max_seconds'], seconds)
+
+def instrument_engine(engine):
+    """Count executions and time spent per statement name on this engine"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, sql, parameters, context, executemany):
+        conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, sql, parameters, context, executemany):
+        started = conn.info["statement_started"].pop()
+        name = context.execution_options.get("statement_name", "unnamed")
+        _record(name, time.perf_counter() - started, False)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        context = exception_context.execution_context
+        if conn is None or context is None or not conn.info.get("statement_started"):
+            return
+        started = conn.info["statement_started"].pop()
+        name = context.execution_options.get("statement_name", "unnamed")
+        _record(name, time.perf_counter() - started, True)
+
+def get_statement_metrics() -> dict:
+    """Executions, errors and seconds spent per statement name in this process"""
+    with _metrics_lock:
+        return {name: dict(stats) for name, stats in _metrics.items()}
@@ -0,0 +1,76 @@
+import argparse
+
+from sqlalchemy import text
+
+from utils.supabase_client import get_supabase_client
+
+ROLLUP_NAME = "contribution_daily"
+
+def refresh_contribution_stats(full: bool = False) -> dict:
+    """
+    Recompute contribution_daily_stats and contribution_daily_totals from the watermark on.
+    Days from the watermark onwards are rebuilt and the watermark moves to yesterday,
+    so today (and rows committed just after midnight) are recomputed on the next run.
+    Returns: Dictionary with the first day refreshed, days written and the new watermark
+    """
+    engine = get_supabase_client()
+    if not engine:
+        raise RuntimeError("Database connection unavailable")
+
+    with engine.begin() as conn:
+        # Row lock serializes concurrent refreshes
+        conn.execute(text("""
+            INSERT INTO stats_rollup_state (rollup, watermark) VALUES (:rollup, '-infinity')
+            ON CONFLICT (rollup) DO NOTHING
+        """), {"rollup": ROLLUP_NAME})
+        watermark = conn.execute(text(
+            "SELECT watermark FROM stats_rollup_state WHERE rollup = :rollup FOR UPDATE"
+        ), {"rollup": ROLLUP_NAME}).scalar()
+        if full:
+            watermark = None
+
+        params = {"start": watermark if watermark is not None else "-infinity"}
+        conn.execute(text("DELETE FROM contribution_daily_stats WHERE day >= :start"), params)
+        conn.execute(text("DELETE FROM contribution_daily_totals WHERE day >= :start"), params)
+
+        conn.execute(text("""
+            INSERT INTO contribution_daily_stats (day, content_type, contributor_key, contribution_count)
+            SELECT created_at::date, COALESCE(content_type, ''), COALESCE(contributor_name, ''), COUNT(*)
+            FROM content_contributions
+            WHERE created_at >= CAST(:start AS date)
+            GROUP BY 1, 2, 3
+        """), params)
+
+        days = conn.execute(text("""
+            INSERT INTO contribution_daily_totals (day, contribution_count, running_total)
+            SELECT day, day_count,
+                   COALESCE((SELECT running_total FROM contribution_daily_totals
+                             WHERE day < :start ORDER BY day DESC LIMIT 1), 0)
+                   + SUM(day_count) OVER (ORDER BY day)
+            FROM (
+                SELECT day, SUM(contribution_count) AS day_count
+                FROM contribution_daily_stats
+                WHERE day >= :start
+                GROUP BY day
+            ) daily
+        """), params).rowcount
+
+        new_watermark = conn.execute(text("""
+            UPDATE stats_rollup_state
+            SET watermark = CURRENT_DATE - 1, refreshed_at = now()
+            WHERE rollup = :rollup
+            RETURNING watermark
+        """), {"rollup": ROLLUP_NAME}).scalar()
+
+    return {"start": params["start"], "days": days, "watermark": new_watermark}
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the daily contribution statistics rollup")
+    parser.add_argument("--full", action="store_true", help="Recompute every day instead of those after the watermark")
+    args = parser.parse_args()
+
+    summary = refresh_contribution_stats(full=args.full)
+    print(f"Refreshed {summary['days']} days from {summary['start']}; watermark is now {summary['watermark']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+import hashlib
+import mimetypes
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import urllib.parse
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import BinaryIO, Iterator, Optional, Union
+
+import requests
+
+from utils.supabase_client import get_supabase_storage_client
+
+DEFAULT_BUCKET = "heritage-files"
+LIST_PAGE_SIZE = 1000
+COPY_CHUNK_SIZE = 1024 * 1024
+
+FileData = Union[bytes, BinaryIO]
+
+# CSV downloads built on request; utils.csv_export prunes them, not the storage GC.
+# They go to the private bucket named by EXPORTS_BUCKET (see get_export_backend).
+EXPORTS_PREFIX = "exports/"
+
+# Generated objects that no table row references: map tiles, whose URLs clients
+# build from a template and which are regenerated in place, and CSV exports
+PUBLISHED_PREFIXES = ("tiles/", EXPORTS_PREFIX)
+
+# ----------------------- BACKEND INTERFACE ------------------------
+
+class StorageBackend(ABC):
+    """
+    Interface shared by every file storage tier.
+    Paths are logical object paths such as 'photo_image/20250101_120000_ab12cd34_gopuram.jpg';
+    each backend decides where the bytes physically live and what URL serves them.
+    Subclasses must implement every abstract method before they can be created.
+    Methods raise on failure; the module-level helpers in supabase_client and
+    file_handler turn errors into Streamlit messages.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def upload(self, data: FileData, path: str, content_type: str, overwrite: bool = False) -> str:
+        """Store bytes or a readable file object and return its public URL"""
+
+    @abstractmethod
+    def get_url(self, path: str) -> str:
+        """Public URL for an object path"""
+
+    @abstractmethod
+    def path_from_url(self, file_url: str) -> Optional[str]:
+        """Object path for a URL produced by get_url, or None if it belongs elsewhere"""
+
+    @abstractmethod
+    def delete(self, path: str) -> bool:
+        """Remove one object"""
+
+    def delete_many(self, paths: list) -> int:
+        """Remove a batch of objects and return how many were removed"""
+        return sum(1 for path in paths if self.delete(path))
+
+    @abstractmethod
+    def info(self, path: str) -> Optional[dict]:
+        """Name, size, content type and timestamps for an object"""
+
+    @abstractmethod
+    def list_objects(self, prefix: str = "") -> Iterator[dict]:
+        """Stream objects under a prefix as dictionaries with 'path', 'size' and 'created_at'"""
+
+    @abstractmethod
+    def open(self, path: str):
+        """Context manager yielding the object contents as a read-only buffer"""
+
+    def copy_to(self, path: str, out: BinaryIO) -> int:
+        """Write the object into a file or socket and return the byte count"""
+        with self.open(path) as buffer:
+            out.write(buffer)
+            return len(buffer)
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+# ----------------------- SUPABASE ------------------------
+
+class SupabaseStorageBackend(StorageBackend):
+    """Supabase Storage REST API (the production tier)"""
+
+    name = "supabase"
+
+    def __init__(self, url: str, key: str, bucket: str = DEFAULT_BUCKET):
+        self.url = url.rstrip('/')
+        self.key = key
+        self.bucket = bucket
+        self._session = requests.Session()
+
+    def _headers(self, **extra) -> dict:
+        headers = {"Authorization": f"Bearer {self.key}"}
+        headers.update(extra)
+        return headers
+
+    def upload(self, data: FileData, path: str, content_type: str, overwrite: bool = False) -> str:
+        upload_url = f"{self.url}/storage/v1/object/{self.bucket}/{path}"
+        headers = self._headers(**{"Content-Type": content_type, "x-upsert": "true" if overwrite else "false"})
+        # requests streams file objects in chunks instead of buffering them
+        response = self._session.post(upload_url, data=data, headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"Upload failed: {response.status_code} - {response.text}")
+        return self.get_url(path)
+
+    def get_url(self, path: str) -> str:
+        return f"{self.url}/storage/v1/object/public/{self.bucket}/{path}"
+
+    def signed_url(self, path: str, expires_in: int) -> str:
+        """URL that reads the object for expires_in seconds, also from a private bucket"""
+        sign_url = f"{self.url}/storage/v1/object/sign/{self.bucket}/{path}"
+        response = self._session.post(sign_url, json={"expiresIn": int(expires_in)}, headers=self._headers())
+        if response.status_code != 200:
+            raise RuntimeError(f"Signing failed: {response.status_code} - {response.text}")
+        return f"{self.url}/storage/v1{response.json()['signedURL']}"
+
+    def path_from_url(self, file_url: str) -> Optional[str]:
+        if not file_url:
+            return None
+        marker = f"/storage/v1/object/public/{self.bucket}/"
+        parsed = urllib.parse.urlparse(file_url)
+        if marker not in parsed.path:
+            return None
+        return urllib.parse.unquote(parsed.path.split(marker, 1)[1])
+
+    def delete(self, path: str) -> bool:
+        delete_url = f"{self.url}/storage/v1/object/{self.bucket}/{path}"
+        response = self._session.delete(delete_url, headers=self._headers())
+        return response.status_code == 200
+
+    def delete_many(self, paths: list) -> int:
+        response = self._session.delete(f"{self.url}/storage/v1/object/{self.bucket}",
+                                        json={"prefixes": paths}, headers=self._headers(), timeout=60)
+        response.raise_for_status()
+        return len(response.json())
+
+    def info(self, path: str) -> Optional[dict]:
+        info_url = f"{self.url}/storage/v1/object/info/{self.bucket}/{path}"
+        response = self._session.get(info_url, headers=self._headers())
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        return {
+            'name': data.get('name'),
+            'size': data.get('metadata', {}).get('size'),
+            'content_type': data.get('metadata', {}).get('mimetype'),
+            'created_at': data.get('created_at'),
+            'updated_at': data.get('updated_at')
+        }
+
+    def list_objects(self, prefix: str = "") -> Iterator[dict]:
+        list_url = f"{self.url}/storage/v1/object/list/{self.bucket}"
+        headers = self._headers(**{"Content-Type": "application/json"})
+
+        pending = [prefix.rstrip('/')]
+        while pending:
+            folder = pending.pop()
+            offset = 0
+            while True:
+                body = {
+                    "prefix": folder,
+                    "limit": LIST_PAGE_SIZE,
+                    "offset": offset,
+                    "sortBy": {"column": "name", "order": "asc"}
+                }
+                response = self._session.post(list_url, json=body, headers=headers, timeout=30)
+                response.raise_for_status()
+                entries = response.json()
+
+                for entry in entries:
+                    path = f"{folder}/{entry['name']}" if folder else entry['name']
+                    # Folders come back without an id and are walked separately
+                    if entry.get('id') is None:
+                        pending.append(path)
+                        continue
+                    yield {
+                        'path': path,
+                        'size': (entry.get('metadata') or {}).get('size'),
+                        'created_at': _parse_timestamp(entry.get('created_at'))
+                    }
+
+                if len(entries) < LIST_PAGE_SIZE:
+                    break
+                offset += LIST_PAGE_SIZE
+
+    @contextmanager
+    def open(self, path: str) -> Iterator[bytes]:
+        response = self._session.get(self.get_url(path), timeout=60)
+        response.raise_for_status()
+        yield response.content
+
+    def copy_to(self, path: str, out: BinaryIO) -> int:
+        written = 0
+        with self._session.get(self.get_url(path), stream=True, timeout=60) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(COPY_CHUNK_SIZE):
+                out.write(chunk)
+                written += len(chunk)
+        return written
+
+# ----------------------- LOCAL FILESYSTEM ------------------------
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Filesystem tier for offline runs, load tests and local or NFS mounts.
+    Objects are sharded into two levels of hash-named directories so no single
+    directory grows unbounded, and writes land in a temp file that is linked
+    into place, so readers never see a partial object. Published prefixes such
+    as map tiles keep their plain path so their URLs can be templated.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str, base_url: str):
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip('/')
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def _shard(path: str) -> str:
+        if path.startswith(PUBLISHED_PREFIXES):
+            return path
+        digest = hashlib.sha1(path.encode('utf-8')).hexdigest()
+        return f"{digest[:2]}/{digest[2:4]}/{path}"
+
+    def _physical_path(self, path: str) -> str:
+        normalized = os.path.normpath(path).replace(os.sep, '/')
+        if normalized.startswith(('../', '/')) or normalized in ('.', '..'):
+            raise ValueError(f"Invalid object path: {path}")
+        return os.path.join(self.root, *self._shard(normalized).split('/'))
+
+    def upload(self, data: FileData, path: str, content_type: str, overwrite: bool = False) -> str:
+        target = self._physical_path(path)
+        directory = os.path.dirname(target)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                if isinstance(data, (bytes, bytearray, memoryview)):
+                    handle.write(data)
+                else:
+                    shutil.copyfileobj(data, handle, COPY_CHUNK_SIZE)
+                handle.flush()
+                os.fsync(handle.fileno())
+            if overwrite:
+                os.replace(temp_path, target)
+            else:
+                # link() fails if the target exists, matching Supabase's x-upsert: false
+                os.link(temp_path, target)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+        return self.get_url(path)
+
+    def get_url(self, path: str) -> str:
+        return f"{self.base_url}/{urllib.parse.quote(self._shard(path))}"
+
+    def path_from_url(self, file_url: str) -> Optional[str]:
+        if not file_url or not file_url.startswith(self.base_url + '/'):
+            return None
+        sharded = urllib.parse.unquote(file_url[len(self.base_url) + 1:])
+        if sharded.startswith(PUBLISHED_PREFIXES):
+            return sharded
+        parts = sharded.split('/', 2)
+        return parts[2] if len(parts) == 3 else None
+
+    def delete(self, path: str) -> bool:
+        try:
+            os.unlink(self._physical_path(path))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def info(self, path: str) -> Optional[dict]:
+        try:
+            stat = os.stat(self._physical_path(path))
+        except FileNotFoundError:
+            return None
+        return {
+            'name': path,
+            'size': stat.st_size,
+            'content_type': mimetypes.guess_type(path)[0] or 'application/octet-stream',
+            # Objects are written once and linked into place, so mtime is their creation
+            # time too; list_objects() reports the same value
+            'created_at': datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(),
+            'updated_at': datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat()
+        }
+
+    def list_objects(self, prefix: str = "") -> Iterator[dict]:
+        for directory, _, files in os.walk(self.root):
+            for filename in files:
+                if filename.startswith(".upload-"):
+                    continue
+                full_path = os.path.join(directory, filename)
+                relative = os.path.relpath(full_path, self.root).replace(os.sep, '/')
+                if relative.startswith(PUBLISHED_PREFIXES):
+                    path = relative
+                else:
+                    parts = relative.split('/', 2)
+                    if len(parts) != 3:
+                        continue
+                    path = parts[2]
+                if not path.startswith(prefix):
+                    continue
+                stat = os.stat(full_path)
+                yield {
+                    'path': path,
+                    'size': stat.st_size,
+                    'created_at': datetime.fromtimestamp(stat.st_mtime, timezone.utc)
+                }
+
+    @contextmanager
+    def open(self, path: str) -> Iterator[bytes]:
+        with open(self._physical_path(path), 'rb') as handle:
+            if os.fstat(handle.fileno()).st_size == 0:
+                yield b""
+                return
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+    def copy_to(self, path: str, out: BinaryIO) -> int:
+        with open(self._physical_path(path), 'rb') as handle:
+            size = os.fstat(handle.fileno()).st_size
+            try:
+                out_fd = out.fileno()
+            except (AttributeError, OSError):
+                out_fd = None
+
+            if out_fd is None or not hasattr(os, 'sendfile'):
+                shutil.copyfileobj(handle, out, COPY_CHUNK_SIZE)
+                return size
+
+            # Zero-copy transfer straight from the page cache
+            out.flush()
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(out_fd, handle.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+            return offset
+
+# ----------------------- SELECTION ------------------------
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+def get_storage_backend() -> Optional[StorageBackend]:
+    """
+    Return the storage backend selected by STORAGE_BACKEND ('supabase' or 'local').
+    The local backend reads LOCAL_STORAGE_ROOT and LOCAL_STORAGE_BASE_URL.
+    Returns: Shared backend instance or None if the selected backend is not configured
+    """
+    backend_name = os.getenv("STORAGE_BACKEND", "supabase").lower()
+
+    if backend_name == "local":
+        config_key = (
+            "local",
+            os.getenv("LOCAL_STORAGE_ROOT", "static/heritage-files"),
+            os.getenv("LOCAL_STORAGE_BASE_URL", "http://localhost:5000/app/static/heritage-files")
+        )
+    elif backend_name == "supabase":
+        config = get_supabase_storage_client()
+        if not config:
+            return None
+        config_key = ("supabase", config['url'], config['key'])
+    else:
+        raise ValueError(f"Unknown STORAGE_BACKEND: {backend_name}")
+
+    with _backends_lock:
+        backend = _backends.get(config_key)
+        if backend is None:
+            if config_key[0] == "local":
+                backend = LocalStorageBackend(config_key[1], config_key[2])
+            else:
+                backend = SupabaseStorageBackend(config_key[1], config_key[2])
+            _backends[config_key] = backend
+        return backend
+
+def get_export_backend() -> Optional[SupabaseStorageBackend]:
+    """
+    Supabase Storage backend for the private bucket named by EXPORTS_BUCKET, where CSV
+    exports are uploaded and read through signed URLs only. The bucket must be created
+    as private; the public upload bucket is refused.
+    Returns: Shared backend instance, or None when EXPORTS_BUCKET is unset or Supabase
+    Storage is not configured (exports are then served through the page)
+    """
+    bucket = os.getenv("EXPORTS_BUCKET")
+    if not bucket:
+        return None
+    if bucket == DEFAULT_BUCKET:
+        raise ValueError(f"EXPORTS_BUCKET must be a private bucket, not the public {DEFAULT_BUCKET}")
+    config = get_supabase_storage_client()
+    if not config:
+        return None
+
+    config_key = ("supabase", config['url'], config['key'], bucket)
+    with _backends_lock:
+        backend = _backends.get(config_key)
+        if backend is None:
+            backend = SupabaseStorageBackend(config['url'], config['key'], bucket)
+            _backends[config_key] = backend
+        return backend
@@ -0,0 +1,130 @@
+import argparse
+import os
+import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+
+from database import iter_referenced_file_urls
+from utils.storage_backend import PUBLISHED_PREFIXES, StorageBackend, get_storage_backend
+
+def build_reference_index(backend: StorageBackend, index_path: str, batch_size: int = 5000) -> int:
+    """
+    Load every referenced object path into an on-disk SQLite hash set
+    Returns: Number of distinct referenced paths
+    """
+    conn = sqlite3.connect(index_path)
+    try:
+        conn.execute("CREATE TABLE IF NOT EXISTS refs (path TEXT PRIMARY KEY) WITHOUT ROWID")
+        batch = []
+        for file_url in iter_referenced_file_urls(batch_size=batch_size):
+            path = backend.path_from_url(file_url)
+            if path:
+                batch.append((path,))
+            if len(batch) >= batch_size:
+                conn.executemany("INSERT OR IGNORE INTO refs (path) VALUES (?)", batch)
+                batch = []
+        if batch:
+            conn.executemany("INSERT OR IGNORE INTO refs (path) VALUES (?)", batch)
+        conn.commit()
+        return conn.execute("SELECT COUNT(*) FROM refs").fetchone()[0]
+    finally:
+        conn.close()
+
+def collect_garbage(grace_period: timedelta = timedelta(hours=24), dry_run: bool = True,
+                    batch_size: int = 100, workers: int = 4) -> dict:
+    """
+    Delete bucket objects that no table references and that are older than the grace period.
+    References are indexed before the bucket is listed, so any object old enough to be
+    collected had its row committed before the scan started. The listing is walked to
+    the end before anything is deleted: deleting while it pages would shift the offsets
+    of later pages and skip objects.
+    Returns: Summary dictionary with scanned, referenced, orphaned and deleted counts
+    """
+    backend = get_storage_backend()
+    if not backend:
+        raise RuntimeError("Storage backend is not configured")
+
+    cutoff = datetime.now(timezone.utc) - grace_period
+    summary = {
+        'scanned': 0,
+        'referenced': 0,
+        'orphaned': 0,
+        'skipped_recent': 0,
+        'deleted': 0,
+        'failed_batches': 0,
+        'dry_run': dry_run,
+        'orphans': []
+    }
+
+    with tempfile.TemporaryDirectory(prefix="heritage_gc_") as workdir:
+        index_path = os.path.join(workdir, "refs.sqlite")
+        summary['referenced'] = build_reference_index(backend, index_path)
+
+        index = sqlite3.connect(index_path)
+        try:
+            index.execute("CREATE TABLE orphans (path TEXT PRIMARY KEY) WITHOUT ROWID")
+            for obj in backend.list_objects():
+                summary['scanned'] += 1
+                # Map tiles and other generated objects are never row-referenced
+                if obj['path'].startswith(PUBLISHED_PREFIXES):
+                    continue
+                if index.execute("SELECT 1 FROM refs WHERE path = ?", (obj['path'],)).fetchone():
+                    continue
+                if obj['created_at'] is None or obj['created_at'] > cutoff:
+                    summary['skipped_recent'] += 1
+                    continue
+                index.execute("INSERT OR IGNORE INTO orphans (path) VALUES (?)", (obj['path'],))
+            index.commit()
+
+            summary['orphaned'] = index.execute("SELECT COUNT(*) FROM orphans").fetchone()[0]
+            orphans = index.execute("SELECT path FROM orphans ORDER BY path")
+            if dry_run:
+                summary['orphans'] = [row[0] for row in orphans]
+                return summary
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = []
+                while True:
+                    batch = [row[0] for row in orphans.fetchmany(batch_size)]
+                    if not batch:
+                        break
+                    futures.append(pool.submit(backend.delete_many, batch))
+
+                for future in as_completed(futures):
+                    try:
+                        summary['deleted'] += future.result()
+                    except Exception as e:
+                        summary['failed_batches'] += 1
+                        print(f"Error deleting orphan batch: {e}")
+        finally:
+            index.close()
+
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove unreferenced objects from heritage file storage")
+    parser.add_argument("--grace-hours", type=float, default=24.0,
+                        help="Only collect objects older than this many hours (default: 24)")
+    parser.add_argument("--delete", action="store_true",
+                        help="Delete the orphans found (default: only report them)")
+    parser.add_argument("--batch-size", type=int, default=100,
+                        help="Objects per bulk delete request (default: 100)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Concurrent delete requests (default: 4)")
+    args = parser.parse_args()
+
+    summary = collect_garbage(grace_period=timedelta(hours=args.grace_hours), dry_run=not args.delete,
+                              batch_size=args.batch_size, workers=args.workers)
+
+    for path in summary['orphans']:
+        print(f"orphan: {path}")
+    print(f"Scanned {summary['scanned']} objects, {summary['referenced']} referenced paths, "
+          f"{summary['orphaned']} orphaned, {summary['skipped_recent']} within grace period")
+    if summary['dry_run']:
+        print("Dry run: nothing deleted (pass --delete to remove orphans)")
+    else:
+        print(f"Deleted {summary['deleted']} objects ({summary['failed_batches']} failed batches)")
+
+if __name__ == "__main__":
+    main()
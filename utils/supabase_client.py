@@ -1,10 +1,12 @@
 import os
+import threading
 import streamlit as st
 from sqlalchemy import create_engine, text
 from typing import Optional
 from dotenv import load_dotenv
 import urllib.parse
 import requests
+from utils.statements import instrument_engine
 
 # Load environment variables from .env file if present
 try:
@@ -14,9 +16,14 @@ except Exception as e:
 
 # ----------------------- DATABASE CONNECTION ------------------------
 
+_engines = {}
+_engines_lock = threading.Lock()
+
 def get_supabase_client():
     """
     Get Supabase database engine using SQLAlchemy.
+    One engine (and connection pool) per DATABASE_URL is created and tested on first
+    use, then shared by every caller; pooled connections are pinged on checkout.
     Returns: SQLAlchemy engine or None if failed.
     """
     try:
@@ -27,13 +34,23 @@ def get_supabase_client():
             st.error("DATABASE_URL environment variable not set.")
             return None
 
-        # Create SQLAlchemy engine
-        engine = create_engine(database_url)
-        
-        # Test connection
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        
+        engine = _engines.get(database_url)
+        if engine is not None:
+            return engine
+
+        with _engines_lock:
+            engine = _engines.get(database_url)
+            if engine is None:
+                engine = create_engine(database_url, pool_pre_ping=True)
+                try:
+                    # Test connection
+                    with engine.connect() as conn:
+                        conn.execute(text("SELECT 1"))
+                except Exception:
+                    engine.dispose()
+                    raise
+                instrument_engine(engine)
+                _engines[database_url] = engine
         return engine
     
     except Exception as e:
@@ -74,32 +91,19 @@ def get_supabase_storage_client():
 
 # ----------------------- FILE UPLOAD ------------------------
 
-def upload_file_to_storage(file_content: bytes, file_path: str, content_type: str) -> Optional[str]:
+def upload_file_to_storage(file_content, file_path: str, content_type: str) -> Optional[str]:
     """
-    Upload a file to Supabase Storage.
+    Upload a file (bytes or a readable file object) through the configured storage backend.
     Returns: Public URL of uploaded file or None.
     """
+    from utils.storage_backend import get_storage_backend
+
     try:
-        config = get_supabase_storage_client()
-        if not config:
+        backend = get_storage_backend()
+        if not backend:
             return None
 
-        bucket = "heritage-files"
-        upload_url = f"{config['url']}/storage/v1/object/{bucket}/{file_path}"
-
-        headers = {
-            "Authorization": f"Bearer {config['key']}",
-            "Content-Type": content_type,
-            "x-upsert": "false"
-        }
-
-        response = requests.post(upload_url, data=file_content, headers=headers)
-
-        if response.status_code == 200:
-            return f"{config['url']}/storage/v1/object/public/{bucket}/{file_path}"
-        else:
-            st.error(f"❌ Upload failed: {response.status_code} - {response.text}")
-            return None
+        return backend.upload(file_content, file_path, content_type)
 
     except Exception as e:
         st.error(f"❌ Upload error: {str(e)}")
@@ -107,13 +111,14 @@ def upload_file_to_storage(file_content: bytes, file_path: str, content_type: st
 
 def get_storage_file_url(file_path: str) -> Optional[str]:
     """
-    Get public URL for file in Supabase Storage.
+    Get public URL for file in the configured storage backend.
     """
+    from utils.storage_backend import get_storage_backend
+
     try:
-        config = get_supabase_storage_client()
-        if config:
-            bucket = "heritage-files"
-            return f"{config['url']}/storage/v1/object/public/{bucket}/{file_path}"
+        backend = get_storage_backend()
+        if backend:
+            return backend.get_url(file_path)
         return None
     
     except Exception as e:
@@ -158,12 +163,16 @@ def get_database_info() -> dict:
     """
     Return database and storage status for diagnostics.
     """
+    from utils.storage_backend import get_storage_backend
+
     try:
         engine = get_supabase_client()
+        backend = get_storage_backend()
         return {
             "connected": engine is not None,
             "database_url": os.getenv("DATABASE_URL", "").split("@")[-1] if os.getenv("DATABASE_URL") else "",
-            "storage_configured": get_supabase_storage_client() is not None
+            "storage_backend": backend.name if backend else None,
+            "storage_configured": backend is not None
         }
     except Exception as e:
         return {
@@ -0,0 +1,110 @@
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from database import (
+    TILE_POINT_COLUMNS,
+    claim_dirty_tiles,
+    get_tile_cells,
+    get_tile_points,
+    mark_all_tiles_dirty,
+    mark_tiles_dirty
+)
+from utils.map_rendering import build_feature_collection
+from utils.storage_backend import StorageBackend, get_storage_backend
+
+# Tiles below this zoom hold density cells two levels finer (up to 16 x 16 per tile);
+# tiles at or above it hold the individual points
+POINT_TILE_ZOOM = 8
+CELL_DETAIL = 2
+
+def tile_path(layer: str, zoom, x, y) -> str:
+    """Storage path of one tile"""
+    return f"tiles/{layer}/{zoom}/{x}/{y}.geojson"
+
+def tile_url_template(backend: StorageBackend, layer: str) -> str:
+    """Leaflet-style {z}/{x}/{y} URL template for a layer's tiles"""
+    url = backend.get_url(tile_path(layer, "ZZ", "XX", "YY"))
+    return url.replace("ZZ", "{z}").replace("XX", "{x}").replace("YY", "{y}")
+
+def build_tile(layer: str, zoom: int, x: int, y: int) -> dict:
+    """
+    GeoJSON FeatureCollection for one tile
+    Returns: cluster features with a 'count' property below POINT_TILE_ZOOM, point features otherwise
+    """
+    if zoom < POINT_TILE_ZOOM:
+        cells = get_tile_cells(layer, zoom, x, y, cell_zoom=zoom + CELL_DETAIL)
+        return build_feature_collection(cells, properties=['count'])
+
+    points = get_tile_points(layer, zoom, x, y)
+    return build_feature_collection(points, properties=TILE_POINT_COLUMNS[layer])
+
+def publish_tile(backend: StorageBackend, layer: str, zoom: int, x: int, y: int) -> bool:
+    """
+    Build one tile and write it over the stored copy; empty tiles are removed
+    Returns: True if a tile was written
+    """
+    collection = build_tile(layer, zoom, x, y)
+    path = tile_path(layer, zoom, x, y)
+    if not collection['features']:
+        backend.delete(path)
+        return False
+    payload = json.dumps(collection, separators=(',', ':')).encode('utf-8')
+    backend.upload(payload, path, 'application/geo+json', overwrite=True)
+    return True
+
+def retile(full: bool = False, batch_size: int = 500, workers: int = 4) -> dict:
+    """
+    Regenerate the tiles marked dirty by inserts (or every non-empty tile when `full`)
+    Returns: Summary dictionary with claimed, written, removed and failed counts
+    """
+    backend = get_storage_backend()
+    if backend is None:
+        raise RuntimeError("Storage backend is not configured")
+
+    summary = {'claimed': 0, 'written': 0, 'removed': 0, 'failed': 0}
+    if full:
+        mark_all_tiles_dirty()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            tiles = claim_dirty_tiles(limit=batch_size)
+            if not tiles:
+                break
+            summary['claimed'] += len(tiles)
+
+            futures = {pool.submit(publish_tile, backend, *tile): tile for tile in tiles}
+            failed = []
+            for future in as_completed(futures):
+                try:
+                    if future.result():
+                        summary['written'] += 1
+                    else:
+                        summary['removed'] += 1
+                except Exception as e:
+                    failed.append(futures[future])
+                    print(f"Error building tile {futures[future]}: {e}")
+
+            if failed:
+                # Requeue for the next run rather than retrying in this one
+                summary['failed'] += len(failed)
+                mark_tiles_dirty(failed)
+                break
+
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate GeoJSON map tiles for temples and contributions")
+    parser.add_argument("--full", action="store_true", help="Rebuild every non-empty tile, not only dirty ones")
+    parser.add_argument("--batch-size", type=int, default=500,
+                        help="Tiles claimed per batch (default: 500)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Concurrent tile builds (default: 4)")
+    args = parser.parse_args()
+
+    summary = retile(full=args.full, batch_size=args.batch_size, workers=args.workers)
+    print(f"Claimed {summary['claimed']} tiles: {summary['written']} written, "
+          f"{summary['removed']} removed, {summary['failed']} failed")
+
+if __name__ == "__main__":
+    main()